@@ -0,0 +1,101 @@
+"""Measure getList decode throughput against the number of processes.
+
+Usage, from the repository root:
+    python -m benchmarks.bench_decoding [--pages N] [--page-size N]
+                                        [--processes 1,2,4,8]
+
+Times a full get_list() sweep of synthetic pages, decoded in the
+calling threads (decode_processes unset) and then with process pools of
+growing size. The transport answers instantly, so the numbers show the
+decode stage alone; on a real sweep it overlaps with network waits.
+"""
+import argparse
+import os
+import time
+from urllib.parse import parse_qsl
+
+from namecheapapi.api.commands import DOMAINS_GET_LIST
+from namecheapapi.api.concurrency import AdaptiveLimiter
+from namecheapapi.api.domains import DomainAPI
+
+ENVELOPE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<ApiResponse Status="OK" xmlns="http://api.namecheap.com/xml.response">'
+    '<Errors /><Warnings /><RequestedCommand>{command}</RequestedCommand>'
+    '<CommandResponse Type="{command}">{body}</CommandResponse>'
+    '<Server>BENCH</Server><GMTTimeDifference>--4:00</GMTTimeDifference>'
+    '<ExecutionTime>0.01</ExecutionTime></ApiResponse>')
+
+
+def getlist_page(page: int, size: int, total: int) -> bytes:
+    rows = ''.join(
+        '<Domain ID="{0}" Name="domain{0}.com" User="peter" '
+        'Created="05/10/2016" Expires="05/{1:02d}/2018" IsExpired="false" '
+        'IsLocked="false" AutoRenew="false" WhoisGuard="ENABLED" '
+        'IsPremium="false" IsOurDNS="true" />'.format(i, i % 28 + 1)
+        for i in range((page - 1) * size, min(page * size, total)))
+    body = ('<DomainGetListResult>{}</DomainGetListResult><Paging>'
+            '<TotalItems>{}</TotalItems><CurrentPage>{}</CurrentPage>'
+            '<PageSize>{}</PageSize></Paging>').format(rows, total, page,
+                                                      size)
+    return ENVELOPE.format(command=DOMAINS_GET_LIST,
+                           body=body).encode('utf-8')
+
+
+class PageTransport:
+    """Answers getList with pre-built pages, whatever the page size asked.
+    """
+
+    def __init__(self, pages: list) -> None:
+        self.pages = pages
+
+    def request(self, query: str, post: bool = False) -> bytes:
+        return self.pages[int(dict(parse_qsl(query))['Page']) - 1]
+
+
+def sweep(transport: PageTransport, processes: int = None) -> tuple:
+    api = DomainAPI('user', 'key', 'user', '127.0.0.1',
+                    transport=transport,
+                    limiter=AdaptiveLimiter(initial=16, maximum=16),
+                    decode_processes=processes)
+    with api:
+        if processes:
+            # Start the workers outside the timed sweep.
+            api._decode(len, b'')
+        start = time.perf_counter()
+        count = sum(1 for _ in api.iter_list())
+        elapsed = time.perf_counter() - start
+    return count, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--processes', default='1,2,4,8')
+    args = parser.parse_args()
+
+    # DomainAPI asks for LIST_PAGE_SIZE rows per page; the synthetic
+    # pages are larger, so the page count follows the declared total.
+    from namecheapapi.api import domains
+    domains.LIST_PAGE_SIZE = args.page_size
+
+    total = args.pages * args.page_size
+    transport = PageTransport([getlist_page(page, args.page_size, total)
+                               for page in range(1, args.pages + 1)])
+    print('{} pages of {} domains, {} CPUs'.format(
+        args.pages, args.page_size, os.cpu_count()))
+
+    count, baseline = sweep(transport)
+    print('  {:<18} {:>8.2f} s {:>10.0f} rows/s'.format(
+        'in-thread', baseline, count / baseline))
+
+    for processes in map(int, args.processes.split(',')):
+        count, elapsed = sweep(transport, processes)
+        print('  {:<18} {:>8.2f} s {:>10.0f} rows/s  x{:.2f}'.format(
+            '{} processes'.format(processes), elapsed, count / elapsed,
+            baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Compare XML parser backends on large getlist and getTldlist responses.
+
+Usage, from the repository root:
+    python -m benchmarks.bench_parsers [--domains N] [--tlds N]
+
+Every backend that is importable is timed on raw parsing and on the
+full DomainAPI decode path (parsing plus building the result dicts).
+"""
+import argparse
+import timeit
+
+from namecheapapi.api.commands import DOMAINS_GET_LIST, DOMAINS_GET_TLD_LIST
+from namecheapapi.api.domains import DomainAPI
+from namecheapapi.api.parsers import PARSERS, get_parser
+
+ENVELOPE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<ApiResponse Status="OK" xmlns="http://api.namecheap.com/xml.response">'
+    '<Errors /><Warnings /><RequestedCommand>{command}</RequestedCommand>'
+    '<CommandResponse Type="{command}">{body}</CommandResponse>'
+    '<Server>BENCH</Server><GMTTimeDifference>--4:00</GMTTimeDifference>'
+    '<ExecutionTime>0.01</ExecutionTime></ApiResponse>')
+
+
+def getlist_response(count: int) -> bytes:
+    rows = ''.join(
+        '<Domain ID="{0}" Name="domain{0}.com" User="peter" '
+        'Created="05/10/2016" Expires="05/10/2018" IsExpired="false" '
+        'IsLocked="false" AutoRenew="false" WhoisGuard="ENABLED" '
+        'IsPremium="false" IsOurDNS="true" />'.format(i)
+        for i in range(count))
+    body = ('<DomainGetListResult>{}</DomainGetListResult><Paging>'
+            '<TotalItems>{}</TotalItems><CurrentPage>1</CurrentPage>'
+            '<PageSize>{}</PageSize></Paging>').format(rows, count, count)
+    return ENVELOPE.format(command=DOMAINS_GET_LIST,
+                           body=body).encode('utf-8')
+
+
+def tldlist_response(count: int) -> bytes:
+    body = '<Tlds>{}</Tlds>'.format(''.join(
+        '<Tld Name="tld{0}" NonRealTime="false" MinRegisterYears="1" '
+        'MaxRegisterYears="10" MinRenewYears="1" MaxRenewYears="10" '
+        'RenewalMinDays="0" RenewalMaxDays="4000" ReactivateMaxDays="27" '
+        'MinTransferYears="1" MaxTransferYears="1" IsApiRegisterable="true" '
+        'IsApiRenewable="true" IsApiTransferable="false" '
+        'IsEppRequired="false" IsDisableModContact="false" '
+        'IsDisableWGAllot="false" IsIncludeInExtendedSearchOnly="false" '
+        'SequenceNumber="{0}" Type="GTLD" SubType="" '
+        'IsSupportsIDN="false" Category="G">Description {0}</Tld>'.format(i)
+        for i in range(count)))
+    return ENVELOPE.format(command=DOMAINS_GET_TLD_LIST,
+                           body=body).encode('utf-8')
+
+
+class StaticTransport:
+
+    def __init__(self, response: bytes) -> None:
+        self.response = response
+
+    def request(self, query: str, post: bool = False) -> bytes:
+        return self.response
+
+
+def bench(label: str, function, number: int) -> None:
+    best = min(timeit.repeat(function, number=number, repeat=5)) / number
+    print('  {:<28} {:>9.2f} ms'.format(label, best * 1000))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--domains', type=int, default=5000)
+    parser.add_argument('--tlds', type=int, default=1500)
+    parser.add_argument('--number', type=int, default=5)
+    args = parser.parse_args()
+
+    getlist = getlist_response(args.domains)
+    tldlist = tldlist_response(args.tlds)
+
+    for name in PARSERS:
+        try:
+            backend = get_parser(name)
+        except ImportError:
+            print('{}: not installed, skipped'.format(name))
+            continue
+
+        print('{}:'.format(name))
+        bench('parse getlist ({} rows)'.format(args.domains),
+              lambda: backend.fromstring(getlist), args.number)
+        bench('parse getTldlist ({} rows)'.format(args.tlds),
+              lambda: backend.fromstring(tldlist), args.number)
+
+        list_api = DomainAPI('user', 'key', 'user', '127.0.0.1',
+                             transport=StaticTransport(getlist), parser=name)
+        tld_api = DomainAPI('user', 'key', 'user', '127.0.0.1',
+                            transport=StaticTransport(tldlist), parser=name)
+        page = list_api._call(DOMAINS_GET_LIST)
+        bench('decode getlist page',
+              lambda: [list_api._parse_list_domain(domain) for domain in
+                       page.find(list_api._tag('DomainGetListResult'))],
+              args.number)
+        # max_age=0: time a fresh parse, not a copy of the cached list.
+        bench('get_tld_list()', lambda: tld_api.get_tld_list(max_age=0),
+              args.number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Microbenchmark for API request construction.
+
+Usage, from the repository root:
+    python -m benchmarks.bench_requests [--number N]
+
+Compares building queries the way Session did before pre-encoding
+(urlencode of the merged base, command and contact dicts on every call)
+with the pre-encoded base parameters and memoized contact templates.
+"""
+import argparse
+import timeit
+from urllib.parse import urlencode
+
+from namecheapapi.api.commands import DOMAINS_GET_INFO, DOMAINS_SET_CONTACTS
+from namecheapapi.api.domains import DomainAPI
+
+ADDRESS = {
+    'FirstName': 'Peter',
+    'LastName': 'Griffin',
+    'Address1': '31 Spooner St.',
+    'City': 'Quahog',
+    'StateProvince': 'RI',
+    'PostalCode': '00093',
+    'Country': 'US',
+    'Phone': '+1.123456789',
+    'EmailAddress': 'peter@griffin.tv',
+    'OrganizationName': 'Pawtucket Brewery',
+}
+
+
+def bench(label: str, function, number: int) -> float:
+    best = min(timeit.repeat(function, number=number, repeat=5)) / number
+    print('  {:<34} {:>8.2f} us'.format(label, best * 1e6))
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    api = DomainAPI('api_user', 'a' * 32, 'username', '203.0.113.10')
+
+    def simple_before():
+        return urlencode({**api._base_params, 'Command': DOMAINS_GET_INFO,
+                          'DomainName': 'example.com'})
+
+    def simple_after():
+        return api._form_query(DOMAINS_GET_INFO,
+                               {'DomainName': 'example.com'})
+
+    def contacts_before():
+        return urlencode({**api._base_params,
+                          'Command': DOMAINS_SET_CONTACTS,
+                          'DomainName': 'example.com',
+                          **api._build_address_dict(ADDRESS)})
+
+    def contacts_after():
+        return api._form_query(
+            api._contact_template(DOMAINS_SET_CONTACTS, ADDRESS),
+            {'DomainName': 'example.com'})
+
+    print('getinfo query:')
+    before = bench('merged dict, urlencode per call', simple_before,
+                   args.number)
+    after = bench('pre-encoded base and command', simple_after, args.number)
+    print('  speed-up: {:.1f}x'.format(before / after))
+
+    print('setContacts query (4 x 10 contact fields):')
+    before = bench('expand and urlencode per call', contacts_before,
+                   args.number)
+    after = bench('memoized contact template', contacts_after, args.number)
+    print('  speed-up: {:.1f}x'.format(before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,11 @@
-from namecheapapi.api import DomainAPI
-from namecheapapi import tests
+__all__ = ['DomainAPI']
+
+
+def __getattr__(name: str):
+    # DomainAPI is imported on first use, so that short-lived jobs such
+    # as the command line tool do not pay for modules they never use.
+    if name == 'DomainAPI':
+        from namecheapapi.api.domains import DomainAPI
+        return DomainAPI
+    raise AttributeError(
+        "module 'namecheapapi' has no attribute '{}'".format(name))
@@ -0,0 +1,3 @@
+from namecheapapi.cli import main
+
+main()
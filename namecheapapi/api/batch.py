@@ -0,0 +1,166 @@
+"""Batched execution of heterogeneous API calls.
+
+A Batch queues calls of any session method (get_info, get_contacts,
+get_lock, ...) and hands out a Future for each right away. When the
+batch closes, identical read calls are sent once and the queue is
+worked off in priority order by a bounded number of the session's
+worker threads.
+
+Example:
+    with api.batch() as batch:
+        info = batch.get_info('domain.com')
+        lock = batch.submit('get_lock', 'domain.com', priority=1)
+    print(info.result(), lock.result())
+"""
+import heapq
+import itertools
+import threading
+import typing
+from concurrent.futures import Future
+from concurrent.futures import wait
+
+
+def is_read_method(method: str) -> bool:
+    """Tell whether a session method only reads, so identical calls
+    can share one result.
+    """
+    return method == 'check' or method.startswith('get_')
+
+
+class Batch:
+    """Queue of session method calls run together.
+
+    Calls are queued with submit(), or by calling the method on the
+    batch itself (batch.get_info(domain) is submit('get_info', domain)).
+    Nothing is sent until the batch is closed: leaving the with block
+    runs all calls and waits for them. If the block raises, the queued
+    calls are cancelled instead.
+
+    Each Future resolves to what the method would have returned, or
+    raises what it would have raised. Identical calls (same method and
+    arguments) of read methods share one Future, and so one result
+    object; calls that change something, e.g. renew(), are always sent
+    as many times as they were queued.
+    """
+
+    def __init__(self, session, concurrency: int) -> None:
+        """Batch initialization; see Session.batch().
+
+        Arguments:
+            session -- Session (e.g. DomainAPI) making the calls.
+            concurrency -- most calls in flight at once.
+        """
+        self.session = session
+        self.concurrency = concurrency
+        # key -> [priority, Future, method, args, kwargs]
+        self._calls = {}
+        self._order = itertools.count()
+        self._queue = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __getattr__(self, name: str) -> typing.Callable[..., Future]:
+        if name.startswith('_') or not callable(
+                getattr(self.session, name, None)):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs) -> Future:
+            return self.submit(name, *args, **kwargs)
+
+        return queue
+
+    def submit(self, method: str, *args, priority: int = 0,
+               dedupe: bool = None, **kwargs) -> Future:
+        """Queue a call of a session method.
+
+        Arguments:
+            method -- method name, e.g. 'get_info'
+            args, kwargs -- the method's arguments
+            priority -- calls with a higher priority are sent first;
+                calls of the same priority in the order they were
+                queued. An identical call queued again keeps the
+                higher of both priorities.
+            dedupe -- whether an identical call queued before is
+                reused. Defaults to True for read methods (check and
+                get_*) and False for all others.
+
+        Returns:
+            A concurrent.futures.Future of the call.
+        """
+        function = getattr(self.session, method)
+        if dedupe is None:
+            dedupe = is_read_method(method)
+        key = object()
+        if dedupe:
+            try:
+                key = (method, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                # Unhashable arguments: never deduplicated.
+                key = object()
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Batch is closed')
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = [priority, Future(), function,
+                                           args, kwargs]
+            else:
+                call[0] = max(call[0], priority)
+        return call[1]
+
+    def run(self) -> None:
+        """Send the queued calls and wait for all of them.
+        """
+        with self._lock:
+            self._closed = True
+            self._queue = [(-call[0], next(self._order), call)
+                           for call in self._calls.values()]
+        heapq.heapify(self._queue)
+        if not self._queue:
+            return
+
+        workers = min(len(self._queue), int(self.concurrency))
+        session = self.session
+        if workers < 2 or getattr(session._worker, 'active', False):
+            self._drain()
+        else:
+            executor = session._get_executor()
+            wait([executor.submit(session._work, lambda _: self._drain(),
+                                  None, False) for _ in range(workers)])
+
+        wait([call[1] for call in self._calls.values()])
+
+    def cancel(self) -> None:
+        """Cancel every queued call.
+        """
+        with self._lock:
+            self._closed = True
+        for call in self._calls.values():
+            call[1].cancel()
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._queue:
+                    return
+                _, _, (_, future, function, args,
+                       kwargs) = heapq.heappop(self._queue)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def __enter__(self) -> 'Batch':
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.run()
+        else:
+            self.cancel()
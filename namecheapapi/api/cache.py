@@ -0,0 +1,279 @@
+"""Availability caching for DomainAPI.check().
+
+Registered domains rarely become available within minutes, so repeated
+availability checks for popular names can be answered locally. Two
+layers are used:
+
+- AvailabilityCache keeps per-process results with separate TTLs for
+  available and taken names;
+- TakenFilter is a compact Bloom filter of known-taken names stored in
+  a memory-mapped file, so every process on a host shares it.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import typing
+from math import ceil
+from math import log
+
+
+class TakenFilter:
+    """Bloom filter of taken domain names.
+
+    Membership tests may return false positives (at roughly the
+    configured error_rate) but never false negatives. When a path is
+    given, the bit array lives in a memory-mapped file and is shared
+    by all processes that open the same path; otherwise it is private
+    to the current process.
+
+    Bit updates are not atomic across processes. A lost update only
+    means a later cache miss, never a wrong answer.
+    """
+
+    # magic, bit count, hash count, creation timestamp
+    _HEADER = struct.Struct('<4sQId')
+    _MAGIC = b'NCBF'
+
+    def __init__(self, path: str = None, capacity: int = 100000,
+                 error_rate: float = 0.000001, ttl: float = 3600) -> None:
+        """Filter initialization.
+
+        Arguments:
+            path -- file backing the filter. If the file already holds
+                a filter, its size parameters take precedence over
+                capacity and error_rate.
+            capacity -- expected number of taken names.
+            error_rate -- acceptable false positive rate at capacity.
+            ttl -- seconds after which the filter is wiped, so names
+                that were dropped are re-checked. None keeps entries
+                forever. AvailabilityCache lowers it to its taken_ttl.
+        """
+        self.path = path
+        self.ttl = ttl
+
+        bits = ceil(-capacity * log(error_rate) / log(2) ** 2)
+        hashes = max(1, round(bits / capacity * log(2)))
+
+        if path is None:
+            self._mmap = mmap.mmap(-1, self._size(bits))
+            self._write_header(bits, hashes)
+        else:
+            self._mmap = self._open(path, bits, hashes)
+
+        _, self.bits, self.hashes, _ = self._HEADER.unpack_from(self._mmap)
+
+    def __contains__(self, name: str) -> bool:
+        self._expire()
+        mm = self._mmap
+        offset = self._HEADER.size
+        for position in self._positions(name):
+            if not mm[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, name: str) -> None:
+        """Add a domain name to the filter.
+        """
+        self._expire()
+        mm = self._mmap
+        offset = self._HEADER.size
+        for position in self._positions(name):
+            mm[offset + (position >> 3)] |= 1 << (position & 7)
+
+    def clear(self) -> None:
+        """Remove all names from the filter.
+        """
+        self._mmap[self._HEADER.size:] = bytes(self._size(self.bits) -
+                                               self._HEADER.size)
+        self._write_header(self.bits, self.hashes)
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _positions(self, name: str) -> typing.Iterator[int]:
+        digest = hashlib.blake2b(name.lower().encode('utf-8'),
+                                 digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def _expire(self) -> None:
+        if self.ttl is None:
+            return
+        created = self._HEADER.unpack_from(self._mmap)[3]
+        if created + self.ttl < time.time():
+            self.clear()
+
+    def _size(self, bits: int) -> int:
+        return self._HEADER.size + ceil(bits / 8)
+
+    def _write_header(self, bits: int, hashes: int) -> None:
+        self._HEADER.pack_into(self._mmap, 0, self._MAGIC, bits, hashes,
+                               time.time())
+
+    def _open(self, path: str, bits: int, hashes: int) -> mmap.mmap:
+        if not os.path.exists(path):
+            # Build the file aside and link it into place, so other
+            # processes never map a half-initialized filter.
+            tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+            with open(tmp_path, 'wb') as f:
+                f.write(self._HEADER.pack(self._MAGIC, bits, hashes,
+                                          time.time()))
+                f.truncate(self._size(bits))
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(tmp_path)
+
+        with open(path, 'r+b') as f:
+            mm = mmap.mmap(f.fileno(), 0)
+
+        if (len(mm) < self._HEADER.size or
+                self._HEADER.unpack_from(mm)[0] != self._MAGIC):
+            mm.close()
+            raise ValueError('{} is not a taken-domain filter'.format(path))
+
+        return mm
+
+
+class AvailabilityCache:
+    """Caching front end for DomainAPI.check().
+
+    Results are kept for available_ttl seconds if the domain was
+    available and taken_ttl seconds if it was taken. Taken names are
+    also added to the optional TakenFilter, which answers for names
+    this process has no result for, e.g. names checked by other
+    processes. An expired local result is always checked again. Only
+    the domains that miss both layers are sent to the API, in one call.
+
+    A filter hit may be a false positive (see TakenFilter), reporting
+    an available name as taken; keep error_rate low accordingly.
+
+    The cache is safe to share between threads.
+    """
+
+    def __init__(self, api, available_ttl: float = 60,
+                 taken_ttl: float = 3600, taken_filter: TakenFilter = None,
+                 max_entries: int = 100000) -> None:
+        """Cache initialization.
+
+        Arguments:
+            api -- DomainAPI instance used for cache misses.
+            available_ttl -- seconds to keep 'available' results.
+            taken_ttl -- seconds to keep 'taken' results.
+            taken_filter -- optional TakenFilter shared between
+                processes. Its ttl is lowered to taken_ttl if it is
+                longer, so it never answers for older results.
+            max_entries -- maximum number of locally cached results.
+        """
+        self.api = api
+        self.available_ttl = available_ttl
+        self.taken_ttl = taken_ttl
+        self.taken_filter = taken_filter
+        if taken_filter is not None and (taken_filter.ttl is None or
+                                         taken_filter.ttl > taken_ttl):
+            taken_filter.ttl = taken_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def check(self, domains: typing.Union[str, list, tuple,
+              set]) -> typing.Dict[str, bool]:
+        """Check domain availability, using cached results if possible.
+
+        Arguments:
+            domains -- any iterable (str for single domain; list, set,
+                tuple for multiple domains)
+
+        Returns:
+            Dict with boolean values for domain availability, same as
+            DomainAPI.check().
+        """
+        if isinstance(domains, str):
+            domains = [domains, ]
+
+        result = {}
+        missing = []
+        now = time.monotonic()
+
+        with self._lock:
+            for domain in domains:
+                entry = self._entries.get(domain.lower())
+                # Invalidated names hold (None, expiry); see invalidate().
+                if entry is not None and entry[0] is not None and (
+                        entry[1] > now):
+                    result[domain] = entry[0]
+                elif entry is None and self.taken_filter is not None and (
+                        domain in self.taken_filter):
+                    result[domain] = False
+                else:
+                    missing.append(domain)
+            self.hits += len(result)
+            self.misses += len(missing)
+
+        if not missing:
+            return result
+
+        unique = list({domain.lower(): domain for domain in missing}.values())
+        response = {domain.lower(): available for domain, available in
+                    self.api.check(unique).items()}
+        now = time.monotonic()
+
+        with self._lock:
+            for domain in missing:
+                available = response.get(domain.lower())
+                if available is None:
+                    continue
+                result[domain] = available
+                ttl = self.available_ttl if available else self.taken_ttl
+                self._entries.pop(domain.lower(), None)
+                self._entries[domain.lower()] = (available, now + ttl)
+                if not available and self.taken_filter is not None:
+                    self.taken_filter.add(domain)
+            self._prune(now)
+
+        return result
+
+    def invalidate(self, domains: typing.Iterable[str] = None) -> None:
+        """Drop locally cached results.
+
+        The given names are checked with the API on their next lookup,
+        even if the TakenFilter has them: for taken_ttl seconds, as long
+        as the filter may still answer from before the invalidation,
+        they are held as entries without a result, which override it.
+        Emptying the whole cache leaves the filter as it is.
+
+        Arguments:
+            domains -- domain names to forget. None (default) empties
+                the whole cache.
+        """
+        with self._lock:
+            if domains is None:
+                self._entries.clear()
+                return
+            if isinstance(domains, str):
+                domains = [domains, ]
+            expires = time.monotonic() + self.taken_ttl
+            for domain in domains:
+                self._entries.pop(domain.lower(), None)
+                self._entries[domain.lower()] = (None, expires)
+
+    def _prune(self, now: float) -> None:
+        if len(self._entries) <= self.max_entries:
+            return
+
+        for domain in [domain for domain, (_, expires) in
+                       self._entries.items() if expires <= now]:
+            del self._entries[domain]
+
+        # Entries are kept in insertion order, so the oldest go first.
+        overflow = len(self._entries) - self.max_entries
+        for domain in list(self._entries)[:max(overflow, 0)]:
+            del self._entries[domain]
@@ -16,3 +16,41 @@ DOMAINS_SET_CUSTOM_NS = 'namecheap.domains.dns.setCustom'
 DOMAINS_REGISTER = 'namecheap.domains.create'
 DOMAINS_GET_CONTACTS = 'namecheap.domains.getContacts'
 DOMAINS_SET_CONTACTS = 'namecheap.domains.setContacts'
+DOMAINS_GET_EMAIL_FORWARDING = 'namecheap.domains.dns.getEmailForwarding'
+DOMAINS_SET_EMAIL_FORWARDING = 'namecheap.domains.dns.setEmailForwarding'
+
+# Child nameserver (glue record) commands.
+DOMAINS_NS_CREATE = 'namecheap.domains.ns.create'
+DOMAINS_NS_DELETE = 'namecheap.domains.ns.delete'
+DOMAINS_NS_GET_INFO = 'namecheap.domains.ns.getInfo'
+DOMAINS_NS_UPDATE = 'namecheap.domains.ns.update'
+
+# SSL-related commands.
+SSL_GET_LIST = 'namecheap.ssl.getList'
+SSL_GET_INFO = 'namecheap.ssl.getInfo'
+
+# WhoisGuard-related commands.
+WHOISGUARD_GET_LIST = 'namecheap.whoisguard.getList'
+WHOISGUARD_ENABLE = 'namecheap.whoisguard.enable'
+WHOISGUARD_DISABLE = 'namecheap.whoisguard.disable'
+WHOISGUARD_ALLOT = 'namecheap.whoisguard.allot'
+WHOISGUARD_RENEW = 'namecheap.whoisguard.renew'
+
+# Domain transfer commands.
+DOMAINS_TRANSFER_CREATE = 'namecheap.domains.transfer.create'
+DOMAINS_TRANSFER_GET_STATUS = 'namecheap.domains.transfer.getStatus'
+DOMAINS_TRANSFER_UPDATE_STATUS = 'namecheap.domains.transfer.updateStatus'
+DOMAINS_TRANSFER_GET_LIST = 'namecheap.domains.transfer.getList'
+
+# User-related commands.
+USERS_GET_PRICING = 'namecheap.users.getPricing'
+USERS_GET_BALANCES = 'namecheap.users.getBalances'
+
+# Read-only commands: sending one twice has no side effects.
+READ_COMMANDS = {
+    DOMAINS_GET_INFO, DOMAINS_GET_TLD_LIST, DOMAINS_CHECK, DOMAINS_GET_LIST,
+    DOMAINS_GET_LOCK, DOMAINS_GET_NAMESERVERS, DOMAINS_GET_CONTACTS,
+    DOMAINS_GET_EMAIL_FORWARDING, DOMAINS_NS_GET_INFO, SSL_GET_LIST,
+    SSL_GET_INFO, WHOISGUARD_GET_LIST, DOMAINS_TRANSFER_GET_STATUS,
+    DOMAINS_TRANSFER_GET_LIST, USERS_GET_PRICING, USERS_GET_BALANCES,
+}
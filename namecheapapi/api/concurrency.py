@@ -0,0 +1,244 @@
+"""Concurrency control for API calls.
+
+AdaptiveLimiter caps the number of API calls in flight and tunes that
+cap with AIMD (additive increase, multiplicative decrease): it grows by
+about one slot per round of calls while latency stays flat and halves
+as soon as Namecheap starts throttling or failing.
+
+Hedger decides when a slow read call gets a duplicate request, so the
+first of the two replies can be used (see Session._call).
+"""
+import collections
+import contextlib
+import socket
+import threading
+import time
+import typing
+from urllib.error import HTTPError
+from urllib.error import URLError
+
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+
+# NC API error numbers signalling that too many requests are being sent.
+THROTTLE_ERRORS = {'500000'}
+
+# Read-only commands, safe to send twice.
+HEDGED_COMMANDS = {
+    DOMAINS_GET_INFO, DOMAINS_CHECK, DOMAINS_GET_LOCK,
+    DOMAINS_GET_NAMESERVERS, DOMAINS_GET_CONTACTS,
+    DOMAINS_GET_EMAIL_FORWARDING, DOMAINS_NS_GET_INFO,
+    DOMAINS_TRANSFER_GET_STATUS,
+}
+
+
+def is_throttle(error: BaseException) -> bool:
+    """Tell whether an exception raised by an API call means back off.
+
+    True for rate-limit errors returned in the Errors block, HTTP 429
+    and 5xx statuses, timeouts and connection failures.
+    """
+    if isinstance(error, NCApiError):
+        return any(item['Number'] in THROTTLE_ERRORS
+                   for item in error.errors)
+    if isinstance(error, HTTPError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, (URLError, socket.timeout, ConnectionError))
+
+
+class Unlimited:
+    """A limiter that never waits.
+    """
+    maximum = None
+
+    @contextlib.contextmanager
+    def slot(self) -> typing.Iterator[None]:
+        yield
+
+
+class AdaptiveLimiter:
+    """AIMD limit on the number of concurrent API calls.
+
+    Wrap every call in `with limiter.slot():`. The limiter keeps a
+    baseline of the lowest recent latencies; while completed calls stay
+    within tolerance times that baseline, the limit grows by 1/limit
+    per call (one slot per round of calls). Slower calls hold the limit
+    where it is. Throttling (see is_throttle) multiplies it by backoff,
+    at most once per baseline latency (or per call latency until a
+    baseline is known), so a burst of rejected calls only counts as one
+    congestion signal.
+
+    Thread-safe; share one limiter between everything that talks to the
+    same account.
+    """
+
+    def __init__(self, initial: float = 4, minimum: float = 1,
+                 maximum: float = 32, backoff: float = 0.5,
+                 tolerance: float = 2.0) -> None:
+        """Limiter initialization.
+
+        Arguments:
+            initial -- initial number of concurrent calls.
+            minimum -- the limit never drops below this value.
+            maximum -- the limit never grows above this value. Also
+                the number of worker threads used by bulk helpers.
+            backoff -- factor applied to the limit on throttling.
+            tolerance -- latency (relative to the baseline) above which
+                the limit stops growing.
+        """
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self.throttled = 0
+        self._baseline = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def slot(self) -> typing.Iterator[None]:
+        """Wait for a free slot and hold it for the enclosed call.
+        """
+        self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.release(time.monotonic() - start, throttled=is_throttle(e))
+            raise
+        else:
+            self.release(time.monotonic() - start)
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, throttled: bool = False) -> None:
+        """Free a slot and adjust the limit.
+
+        Arguments:
+            latency -- duration of the call in seconds.
+            throttled -- whether the call was throttled or failed in a
+                way that calls for backing off.
+        """
+        with self._condition:
+            self.in_flight -= 1
+
+            if throttled:
+                self.throttled += 1
+                now = time.monotonic()
+                if now - self._last_decrease > (self._baseline or latency):
+                    self._last_decrease = now
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+            else:
+                if self._baseline is None or latency < self._baseline:
+                    self._baseline = latency
+                else:
+                    # Let the baseline drift up slowly, so a permanent
+                    # slowdown on the server side is eventually accepted.
+                    self._baseline += (latency - self._baseline) * 0.01
+                if latency <= self._baseline * self.tolerance:
+                    self.limit = min(self.maximum,
+                                     self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+
+class Hedger:
+    """Hedging policy for idempotent read calls.
+
+    A call gets a duplicate (hedge) request when it has not been
+    answered after the percentile-th percentile of the recent
+    latencies of its command, i.e. only the slowest calls are hedged.
+    Commands without min_samples latencies yet are not hedged.
+
+    Hedges are paid for from a budget: every call adds budget tokens,
+    up to burst, and a hedge takes one, so at most about budget times
+    the number of calls are sent as hedges.
+
+    Counters: calls (hedgeable calls), hedged (hedges sent), won
+    (hedges answered before the original request), over_budget (hedges
+    not sent for lack of budget).
+
+    Thread-safe; share one hedger between sessions to share its budget.
+    """
+
+    def __init__(self, percentile: float = 95, budget: float = 0.05,
+                 burst: float = 10, min_delay: float = 0.05,
+                 min_samples: int = 20, window: int = 200,
+                 commands: typing.Iterable[str] = HEDGED_COMMANDS) -> None:
+        """Hedger initialization.
+
+        Arguments:
+            percentile -- latency percentile after which a call is
+                hedged.
+            budget -- hedges allowed per call, on average.
+            burst -- largest number of hedges sent back to back.
+            min_delay -- shortest wait (seconds) before hedging.
+            min_samples -- latencies a command needs before its calls
+                are hedged.
+            window -- number of recent latencies kept per command.
+            commands -- commands that may be hedged.
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.burst = burst
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.commands = {command.lower() for command in commands}
+        self.calls = 0
+        self.hedged = 0
+        self.won = 0
+        self.over_budget = 0
+        self._tokens = float(burst)
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def delay(self, command: str) -> typing.Optional[float]:
+        """Return how long (seconds) a call of command waits before it
+        is hedged, or None if it is not to be hedged (yet).
+        """
+        command = command.lower()
+        if command not in self.commands:
+            return None
+        with self._lock:
+            self.calls += 1
+            self._tokens = min(self.burst, self._tokens + self.budget)
+            latencies = sorted(self._latencies.get(command, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        index = min(len(latencies) - 1,
+                    int(len(latencies) * self.percentile / 100))
+        return max(self.min_delay, latencies[index])
+
+    def record(self, command: str, latency: float) -> None:
+        """Add the latency (seconds) of a successful request; for a
+        hedged call, that of the original request.
+        """
+        command = command.lower()
+        with self._lock:
+            latencies = self._latencies.get(command)
+            if latencies is None:
+                latencies = self._latencies[command] = collections.deque(
+                    maxlen=self.window)
+            latencies.append(latency)
+
+    def spend(self) -> bool:
+        """Take a hedge from the budget; False if there is none left.
+        """
+        with self._lock:
+            if self._tokens < 1:
+                self.over_budget += 1
+                return False
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+
+    def hedge_won(self) -> None:
+        with self._lock:
+            self.won += 1
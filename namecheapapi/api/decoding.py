@@ -0,0 +1,83 @@
+"""Response decoding that can run in worker processes.
+
+Parsing a getList page and running strptime on every row is pure Python
+work, serialised by the GIL however many pages are fetched at once. A
+session created with decode_processes hands the raw bytes of each page
+to a process pool instead, so a large sweep decodes on several cores.
+
+Functions here are top-level and take and return picklable values only.
+"""
+import typing
+from datetime import datetime
+from xml.etree.ElementTree import Element
+
+from namecheapapi.api.parsers import get_parser
+from namecheapapi.api.session import NAMESPACE
+
+# Parser backends of the current (worker) process, by name.
+_parsers = {}
+
+
+def _tag(tag: str) -> str:
+    return '{{{}}}{}'.format(NAMESPACE, tag)
+
+
+def list_domain(domain: Element) -> dict:
+    """Decode a Domain element of a getList response.
+    """
+    return {
+        'Domain': domain.get('Name'),
+        'ID': domain.get('ID'),
+        'Owner': domain.get('User'),
+        'Creation': datetime.strptime(domain.get('Created'), '%m/%d/%Y'),
+        'Expiration': datetime.strptime(domain.get('Expires'), '%m/%d/%Y'),
+        'WhoisGuard': domain.get('WhoisGuard'),
+        'Expired': domain.get('IsExpired').lower() == 'true',
+        'Locked': domain.get('IsLocked').lower() == 'true',
+        'Auto-renew': domain.get('AutoRenew').lower() == 'true',
+    }
+
+
+def decode_list_page(data: bytes, parser: str = 'etree') -> dict:
+    """Decode a raw getList response.
+
+    Arguments:
+        data -- response bytes.
+        parser -- XML parser backend name (see parsers.get_parser).
+
+    Returns:
+        A dict with the GMTTimeDifference text, the 'Errors' and
+        'Warnings' of the response (lists of {'Number', 'Text'}), and
+        for a successful response the 'Total' number of domains and the
+        decoded 'Domains'. The domain dicts share their key strings, so
+        they pickle compactly.
+    """
+    if parser not in _parsers:
+        _parsers[parser] = get_parser(parser)
+    xml = _parsers[parser].fromstring(data)
+
+    result = {
+        'GMTTimeDifference': xml.findtext(_tag('GMTTimeDifference')),
+        'Errors': _messages(xml, 'Errors', 'Error'),
+        'Warnings': _messages(xml, 'Warnings', 'Warning'),
+        'Total': 0,
+        'Domains': [],
+    }
+    if xml.get('Status') == 'ERROR':
+        return result
+
+    response = xml.find(_tag('CommandResponse'))
+    result['Total'] = int(response.find(_tag('Paging')).find(
+        _tag('TotalItems')).text)
+    result['Domains'] = [list_domain(domain) for domain in response.find(
+        _tag('DomainGetListResult')).findall(_tag('Domain'))]
+
+    return result
+
+
+def _messages(xml: Element, block: str, tag: str) -> typing.List[dict]:
+    element = xml.find(_tag(block))
+    if element is None:
+        return []
+    return [{'Number': item.get('Number'), 'Text': item.text}
+            for item in element.findall(_tag(tag))]
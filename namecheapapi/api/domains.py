@@ -1,11 +1,21 @@
 import collections
+import collections.abc
+import functools
+import re
+import time
 import typing
 from datetime import datetime
 from datetime import timedelta
 from math import ceil
-from xml.etree.ElementTree import fromstring
+from xml.etree.ElementTree import Element
 
+from namecheapapi.api.decoding import decode_list_page
+from namecheapapi.api.decoding import list_domain
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.query import QueryTemplate
 from namecheapapi.api.session import Session
+from namecheapapi.api.users import UserAPI
+from namecheapapi.api.users import total_price
 from namecheapapi.api.commands import *
 
 ADDRESS_TYPES = ['Registrant', 'Tech', 'Admin', 'AuxBilling']
@@ -17,10 +27,25 @@ OPTIONAL_ADDRESS_PARAMS = [
     'OrganizationName', 'JobTitle', 'Address2', 'StateProvinceChoice',
     'PhoneExt', 'Fax'
 ]
+LIST_PAGE_SIZE = 100
+TRANSFER_LIST_PAGE_SIZE = 100
+CHECK_BATCH_SIZE = 50
+# getInfo errors meaning the child nameserver does not exist, by number
+# and text. The API reports every registry failure, an unknown host
+# among them, under 3031510, so only its text tells them apart.
+NAMESERVER_NOT_FOUND_ERRORS = {
+    '3031510': re.compile(r'\b(host|nameserver|object)\b.*'
+                          r'\b(does not exist|not found)\b', re.I),
+}
+# Seconds the TLD list is cached for.
+TLD_LIST_MAX_AGE = 24 * 3600
 
 
 class DomainAPI(Session):
 
+    # (time.monotonic() of the fetch, get_tld_list() result)
+    _tld_list = None
+
     def register(self, domain: str, years: int = 1, address: dict = {},
                  nameservers: typing.Union[list, set, tuple] = None,
                  coupon: str = None, add_whoisguard: bool = True,
@@ -85,11 +110,8 @@ class DomainAPI(Session):
         if nameservers:
             query['Nameservers'] = ','.join(nameservers)
 
-        address = self._build_address_dict(address)
-
-        query = {**query, **address}
-
-        xml = self._call(DOMAINS_REGISTER, query, post=True).find(
+        xml = self._call(self._contact_template(DOMAINS_REGISTER, address),
+                         query, post=True).find(
             self._tag('DomainCreateResult'))
 
         return {
@@ -127,6 +149,8 @@ class DomainAPI(Session):
 
         *check_status_first is experimental, use with caution.
         """
+        query = {'DomainName': domain, 'Years': years}
+
         if coupon:
             query['PromotionCode'] = coupon
         elif self.coupon:
@@ -134,14 +158,11 @@ class DomainAPI(Session):
             query['PromotionCode'] = coupon
 
         if check_status_first:
-            self._get_gmt_offset()
-            domain_info = self.get_info(domain)
-            if (domain_info['Expiration'] - timedelta(hours=self.gmt_offset) <
+            expiration = self.get_info(domain, lazy=True)['Expiration']
+            if (expiration - timedelta(hours=self._get_gmt_offset()) <
                     datetime.utcnow()):
                 return self.reactivate(domain, coupon=coupon)
 
-        query = {'DomainName': domain, 'Years': years}
-
         xml = self._call(DOMAINS_RENEW, query).find(
             self._tag('DomainRenewResult'))
 
@@ -198,7 +219,126 @@ class DomainAPI(Session):
             'ChargedAmount': float(xml.get('ChargedAmount')),
         }
 
-    def get_info(self, domain: str) -> dict:
+    def renew_many(self, domains: typing.Iterable[str], years: int = 1,
+                   coupon: str = None) -> typing.Dict[str, dict]:
+        """Renew many domains concurrently.
+
+        NOTE: this method will charge your Namecheap account!
+
+        Arguments:
+            domains -- iterable with domain names
+            years -- renewal years (default: 1)
+            coupon -- coupon code. If provided, overrides the
+                session-specified coupon.
+
+        Returns:
+            A dict mapping every domain to what renew() returned for
+            it, or to the NCApiError raised by it.
+        """
+        domains = list(domains)
+        return dict(zip(domains, self._map(
+            lambda domain: self.renew(domain, years, coupon), domains,
+            return_exceptions=True)))
+
+    def register_many(self, domains: typing.Iterable[str], years: int = 1,
+                      address: dict = {},
+                      nameservers: typing.Union[list, set, tuple] = None,
+                      coupon: str = None, add_whoisguard: bool = True,
+                      enable_whoisguard: bool = True
+                      ) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        """Register many domain names concurrently.
+
+        Availability (in CHECK_BATCH_SIZE batches), pricing of every TLD
+        and the account balance are fetched up front, concurrently. The
+        cost of the available domains is computed from the prices and
+        checked against the available balance once, before anything is
+        registered. All domains share one encoded contact payload.
+
+        NOTE: this method will charge your Namecheap account!
+
+        Arguments:
+            domains -- iterable with domain names
+            other arguments -- see register(); they apply to every
+                domain.
+
+        Returns:
+            An iterator of (domain, result) tuples, in the order of
+            domains, as registrations finish; a domain given more than
+            once (in any case) is registered once. result is what
+            register() returned for the domain, or the NCApiError
+            raised for it (also for domains that are not available, are
+            premium names or have no price). Registrations start when
+            the iterator is first advanced.
+
+        Raises:
+            NCApiError if the available balance does not cover the cost,
+                before any domain is registered.
+        """
+        domains = list(collections.OrderedDict(
+            (domain.lower(), domain) for domain in domains).values())
+        users = UserAPI(self)
+        tlds = sorted({domain.rsplit('.', 1)[-1].lower()
+                       for domain in domains})
+        coupon = coupon or self.coupon
+
+        def pricing(tld: str) -> dict:
+            return users.get_pricing('DOMAIN', 'REGISTER', 'REGISTER', tld,
+                                     coupon).get('register', {}).get(tld, {})
+
+        steps = [lambda: self._check_results(domains), users.get_balances]
+        steps += [functools.partial(pricing, tld) for tld in tlds]
+        checked, balances, *prices = self._map(lambda step: step(), steps)
+        checked = {item.get('Domain').lower(): item for item in checked}
+        prices = dict(zip(tlds, prices))
+
+        errors, cost = {}, 0.0
+        for domain in domains:
+            price = prices[domain.rsplit('.', 1)[-1].lower()].get(years)
+            item = checked.get(domain.lower())
+            if item is None or item.get('Available').lower() != 'true':
+                errors[domain] = NCApiError(
+                    '{} is not available'.format(domain))
+            elif (item.get('IsPremiumName') or '').lower() == 'true':
+                # Premium prices are per name and register() does not
+                # send the premium parameters.
+                errors[domain] = NCApiError(
+                    '{} is a premium name ({} {})'.format(
+                        domain, item.get('PremiumRegistrationPrice'),
+                        balances['Currency']))
+            elif price is None:
+                errors[domain] = NCApiError(
+                    'No {}-year registration price for {}'.format(
+                        years, domain))
+            else:
+                cost += total_price(price, years)
+
+        if cost > balances['AvailableBalance']:
+            raise NCApiError(
+                'Registering costs {:.2f} {}, the available balance is '
+                '{:.2f}'.format(cost, balances['Currency'],
+                                balances['AvailableBalance']))
+
+        # Warm the shared contact payload before the workers need it.
+        self._contact_template(DOMAINS_REGISTER, address)
+
+        def register(domain: str) -> typing.Any:
+            if domain in errors:
+                return errors[domain]
+            return self._run(lambda domain: self.register(
+                domain, years, address, nameservers, coupon,
+                add_whoisguard, enable_whoisguard), domain, True)
+
+        def registrations() -> typing.Iterator[tuple]:
+            results = self._prefetch(register, domains)
+            try:
+                yield from zip(domains, results)
+            finally:
+                results.close()
+
+        return registrations()
+
+    def get_info(self, domain: str,
+                 lazy: bool = False) -> typing.Union[dict, 'DomainInfo']:
         """Get domain information.
 
         https://www.namecheap.com/support/api/methods/domains/get-info.aspx
@@ -207,6 +347,10 @@ class DomainAPI(Session):
 
         Arguments:
             domain -- domain name (e.g. 'google.com')
+            lazy -- if set to True, a DomainInfo mapping is returned
+                instead of a dict. Each of its keys is decoded from the
+                response on first access, which is cheaper when only a
+                few fields are needed (e.g. info['Expiration']).
 
         Returns:
             Dict with domain information
@@ -214,74 +358,9 @@ class DomainAPI(Session):
         xml = self._call(DOMAINS_GET_INFO, {'DomainName': domain}).find(
             self._tag('DomainGetInfoResult'))
 
-        # Basic information
-        result = {
-            'Domain': xml.get('DomainName'),
-            'Owner': xml.get('OwnerName'),
-            'Status': xml.get('Status'),
-            'ID': xml.get('ID'),
-            'IsOwner': xml.get('IsOwner').lower() == 'true',
-            'Full modification rights':
-                xml.find(self._tag('Modificationrights')).
-                get('All').lower() == 'true'
-        }
+        info = DomainInfo(self._info_decoders(xml))
 
-        result['Creation'] = datetime.strptime(xml.find(
-            self._tag('DomainDetails')).find(self._tag('CreatedDate')).text,
-            '%m/%d/%Y')
-        result['Expiration'] = datetime.strptime(xml.find(
-            self._tag('DomainDetails')).find(self._tag('ExpiredDate')).text,
-            '%m/%d/%Y')
-
-        # WhoisGuard details
-        wg = xml.find(self._tag('Whoisguard'))
-        result['WhoisGuard'] = {
-            'Enabled': wg.get('Enabled').lower() == 'true'}
-
-        if result['WhoisGuard']['Enabled']:
-            result['WhoisGuard'].update({
-                'Expiration':
-                    datetime.strptime(wg.find(self._tag('ExpiredDate')).text,
-                                      '%m/%d/%Y'),
-                'ID': wg.find(self._tag('ID')).text,
-                'Email':
-                    wg.find(self._tag('EmailDetails')).get('WhoisGuardEmail'),
-                'Forwarded to':
-                    wg.find(self._tag('EmailDetails')).get('ForwardedTo'),
-                'Last email auto-change date':
-                    wg.find(self._tag('EmailDetails')).get(
-                    'LastAutoEmailChangeDate') or None,
-                'Email auto-change frequency':
-                    wg.find(self._tag('EmailDetails')).get(
-                        'AutoEmailChangeFrequencyDays')
-            })
-
-        # Premium DNS details
-        pdns = xml.find(self._tag('PremiumDnsSubscription'))
-
-        result['PremiumDNS'] = {
-            'Creation': pdns.find(self._tag('CreatedDate')).text,
-            'Expiration': pdns.find(self._tag('ExpirationDate')).text,
-            'ID': pdns.find(self._tag('SubscriptionId')).text,
-            'Auto-renew': pdns.find(
-                self._tag('UseAutoRenew')).text.lower() == 'true',
-            'Active': pdns.find(self._tag('IsActive')).text.lower() == 'true'
-        }
-
-        # DNS details
-        dns = xml.find(self._tag('DnsDetails'))
-        result['DNS'] = {
-            'Type': dns.get('ProviderType'),
-            'Using NC DNS': dns.get('IsUsingOurDNS').lower() == 'true',
-            'Host records count': dns.get('HostCount'),
-            'Email type': dns.get('EmailType'),
-            'Dynamic DNS': dns.get('DynamicDNSStatus').lower() == 'true',
-            'Failover DNS': dns.get('IsFailover').lower() == 'true',
-            'Nameservers': [ns.text for ns in
-                            dns.findall(self._tag('Nameserver'))]
-        }
-
-        return result
+        return info if lazy else info.to_dict()
 
     def get_list(self, _type: str = 'ALL',
                  search_term: str = None) -> typing.List[dict]:
@@ -296,58 +375,120 @@ class DomainAPI(Session):
         Returns:
             A list containing dicts with domain information.
         """
-        domains = []
+        return list(self.iter_list(_type, search_term))
 
-        # A check on the total domain number (minimal PageSize is 10)
-        query = {'ListType': _type, 'PageSize': 10}
-        if search_term:
-            query['SearchTerm'] = search_term
+    def iter_list(self, _type: str = 'ALL',
+                  search_term: str = None) -> typing.Iterator[dict]:
+        """Iterate over the list of domains page by page.
 
-        xml = self._call(DOMAINS_GET_LIST, query).find(self._tag('Paging'))
-        total_domains = int(xml.find(self._tag('TotalItems')).text)
+        Same as get_list(), but domains are yielded as their page
+        arrives, and only the few pages being prefetched are held in
+        memory at a time.
 
-        # A call is sent for every 100-item page
-        # TODO: check performance on big accounts
-        for page in range(1, ceil(total_domains / 100) + 1):
+        Arguments:
+            _type -- possible values: 'ALL', 'EXPIRING', 'EXPIRED'
+            search_term -- keyword to look for in the domain list.
 
-            query = {
-                'ListType': _type,
-                'Page': page,
-                'PageSize': 100
-            }
-            if search_term:
-                query['SearchTerm'] = search_term
+        Returns:
+            An iterator over dicts with domain information.
+        """
+        for _, domains in self._iter_list_pages(_type, search_term):
+            yield from domains
 
-            xml = self._call(
-                DOMAINS_GET_LIST, query).find(self._tag('DomainGetListResult'))
-
-            for domain in xml.findall(self._tag('Domain')):
-                domains.append({
-                    'Domain': domain.get('Name'),
-                    'ID': domain.get('ID'),
-                    'Owner': domain.get('User'),
-                    'Creation': datetime.strptime(domain.get('Created'),
-                                                  '%m/%d/%Y'),
-                    'Expiration': datetime.strptime(domain.get('Expires'),
-                                                    '%m/%d/%Y'),
-                    'WhoisGuard': domain.get('WhoisGuard'),
-                    'Expired': domain.get('IsExpired').lower() == 'true',
-                    'Locked': domain.get('IsLocked').lower() == 'true',
-                    'Auto-renew': domain.get('AutoRenew').lower() == 'true',
-                })
-
-        return domains
-
-    def get_tld_list(self) -> typing.Dict[str, dict]:
+    def get_lock_many(self, domains: typing.Iterable[str],
+                      verbose: bool = False) -> typing.Dict[str, bool]:
+        """Get registrar lock status for many domains.
+
+        The lock status is read from get_list() pages when that takes
+        fewer API calls than one get_lock() call per domain. Verbose
+        lock details are not part of the domain list, so verbose=True
+        always sends a getRegistrarLock call per domain.
+
+        Arguments:
+            domains -- iterable with domain names
+            verbose -- (bool) see get_lock()
+
+        Returns:
+            A dict mapping every domain to what get_lock() would have
+            returned for it.
+        """
+        if verbose:
+            domains = list(domains)
+            return dict(zip(domains, self._map(
+                lambda domain: self.get_lock(domain, verbose=True), domains)))
+
+        rows, missing = self._list_rows(domains)
+        result = {domain: row['Locked'] for domain, row in rows.items()}
+        result.update(zip(missing, self._map(self.get_lock, missing)))
+
+        return result
+
+    def get_expiration_many(
+            self, domains: typing.Iterable[str]) -> typing.Dict[str, datetime]:
+        """Get expiration dates for many domains.
+
+        Dates are read from get_list() pages when that takes fewer API
+        calls than one get_info() call per domain.
+
+        Arguments:
+            domains -- iterable with domain names
+
+        Returns:
+            A dict mapping every domain to its expiration datetime.
+        """
+        rows, missing = self._list_rows(domains)
+        result = {domain: row['Expiration'] for domain, row in rows.items()}
+        result.update(zip(missing, self._map(
+            lambda domain: self.get_info(domain, lazy=True)['Expiration'],
+            missing)))
+
+        return result
+
+    def get_whoisguard_many(self, domains: typing.Iterable[str],
+                            verbose: bool = False) -> typing.Dict[str, bool]:
+        """Get WhoisGuard state for many domains.
+
+        The state is read from get_list() pages when that takes fewer
+        API calls than one get_info() call per domain. WhoisGuard
+        details (ID, emails, expiration) are not part of the domain
+        list, so verbose=True always sends a getinfo call per domain.
+
+        Arguments:
+            domains -- iterable with domain names
+            verbose -- (bool) set to True to get the 'WhoisGuard' dict
+                of get_info() instead of a boolean.
+
+        Returns:
+            A dict mapping every domain to a boolean indicating whether
+            WhoisGuard is enabled (or to a dict, if verbose is True).
+        """
+        if verbose:
+            domains = list(domains)
+            return dict(zip(domains, self._map(
+                lambda domain: self.get_info(domain, lazy=True)['WhoisGuard'],
+                domains)))
+
+        rows, missing = self._list_rows(domains)
+        result = {domain: row['WhoisGuard'] == 'ENABLED'
+                  for domain, row in rows.items()}
+        result.update(zip(missing, self._map(
+            lambda domain: self.get_info(
+                domain, lazy=True)['WhoisGuard']['Enabled'], missing)))
+
+        return result
+
+    def get_tld_list(self, max_age: float = TLD_LIST_MAX_AGE
+                     ) -> typing.Dict[str, dict]:
         """Get TLD list
 
         https://www.namecheap.com/support/api/methods/domains/get-tld-list.aspx
 
         NOTE: Namecheap strongly recommend that you cache this API
-        response to avoid repeated calls.
+        response to avoid repeated calls, so the session does.
 
         Arguments:
-            None
+            max_age -- maximum age of the cached list, in seconds. Set
+                to 0 to fetch a fresh one.
 
         Returns:
             A dict:
@@ -355,33 +496,11 @@ class DomainAPI(Session):
              'tld2': {details...}
             }
         """
-        xml = self._call(DOMAINS_GET_TLD_LIST).find(self._tag('Tlds'))
-
-        result = {}
+        cached = self._tld_list
+        if cached is None or time.monotonic() - cached[0] > max_age:
+            cached = self._single_flight('tld_list', self._fetch_tld_list)
 
-        for tld in xml.findall(self._tag('Tld')):
-            tld_name = tld.get('Name')
-            result[tld_name] = tld.attrib
-            result[tld_name]['Description'] = tld.text
-            del result[tld_name]['Name']
-
-            # Normalize dict values
-            for key in result[tld_name]:
-                if result[tld_name][key].lower() == 'false':
-                    result[tld_name][key] = False
-                elif result[tld_name][key].lower() == 'true':
-                    result[tld_name][key] = True
-                elif result[tld_name][key].lower() == '':
-                    result[tld_name][key] = None
-                else:
-                    try:
-                        int(result[tld_name][key])
-                    except ValueError:
-                        continue
-                    else:
-                        result[tld_name][key] = int(result[tld_name][key])
-
-        return result
+        return {tld: dict(details) for tld, details in cached[1].items()}
 
     def check(self, domains: typing.Union[str, list, tuple,
               set]) -> typing.Dict[str, bool]:
@@ -391,7 +510,9 @@ class DomainAPI(Session):
 
         Arguments:
             domains -- any iterable (str for single domain; list, set,
-                tuple for multiple domains)
+                tuple for multiple domains). Long lists are split into
+                batches of CHECK_BATCH_SIZE domains, checked
+                concurrently.
 
         Returns:
             Dict with boolean values for domain availability.
@@ -402,14 +523,9 @@ class DomainAPI(Session):
         """
         if isinstance(domains, str):
             domains = [domains, ]
-        xml = self._call(DOMAINS_CHECK, {'DomainList': ','.join(domains)})
 
-        result = {}
-        for item in xml.findall(self._tag('DomainCheckResult')):
-            result[item.get('Domain')] = (
-                item.get('Available').lower() == 'true')
-
-        return result
+        return {item.get('Domain'): item.get('Available').lower() == 'true'
+                for item in self._check_results(domains)}
 
     def get_contacts(self, domain: str) -> dict:
         """Obtain contact details for a domain.
@@ -490,14 +606,56 @@ class DomainAPI(Session):
             boolean value indicating success/failure of the operation
         """
 
-        address = self._build_address_dict(address)
-        query = {'DomainName': domain, **address}
-
-        xml = self._call(DOMAINS_SET_CONTACTS, query, post=True).find(
+        xml = self._call(
+            self._contact_template(DOMAINS_SET_CONTACTS, address),
+            {'DomainName': domain}, post=True).find(
             self._tag('DomainSetContactResult'))
 
         return xml.get('IsSuccess').lower() == 'true'
 
+    def sync_contacts(self, domains: typing.Iterable[str], address: dict,
+                      dry_run: bool = False) -> typing.Dict[str, dict]:
+        """Bring contact details of many domains in line with address.
+
+        Contacts are fetched concurrently and compared field by field
+        with the target; setContacts is only sent for domains whose
+        writable contacts differ. Contact types flagged ReadOnly are
+        not compared, since they cannot be changed.
+
+        Arguments:
+            domains -- iterable with domain names
+            address -- a dict with the address values (see
+                set_contacts)
+            dry_run -- setting to True only reports the differences.
+
+        Returns:
+            A dict mapping every domain to
+            {'Changed': [differing fields, e.g. 'RegistrantCity'],
+             'Updated': True if setContacts was sent,
+             'Success': False if setContacts reported a failure}
+            or to the NCApiError raised for it.
+        """
+        target = self._build_address_dict(address)
+        # Values come back as text, so compare them as text.
+        target = {field: str(value) for field, value in target.items()}
+        template = self._contact_template(DOMAINS_SET_CONTACTS, address)
+
+        def sync(domain: str) -> dict:
+            changed = self._contact_differences(self.get_contacts(domain),
+                                                target)
+            result = {'Changed': changed, 'Updated': False, 'Success': True}
+            if changed and not dry_run:
+                xml = self._call(template, {'DomainName': domain},
+                                 post=True).find(
+                    self._tag('DomainSetContactResult'))
+                result['Updated'] = True
+                result['Success'] = xml.get('IsSuccess').lower() == 'true'
+            return result
+
+        domains = list(domains)
+        return dict(zip(domains, self._map(sync, domains,
+                                           return_exceptions=True)))
+
     def get_lock(self, domain: str, verbose: bool = False) -> bool:
         """Get registrar lock status
 
@@ -557,17 +715,201 @@ class DomainAPI(Session):
 
         return xml.get('IsSuccess').lower() == 'true'
 
-    def create_nameserver(self):
-        pass
+    def create_nameserver(self, domain: typing.Sequence, nameserver: str,
+                          ip: str) -> bool:
+        """Create a child nameserver (glue record) of a domain.
 
-    def delete_nameserver(self):
-        pass
+        https://www.namecheap.com/support/api/methods/domains-ns/create.aspx
 
-    def update_nameserver(self):
-        pass
+        Arguments:
+            domain -- domain name. Can be a string ('domain.tld') or a
+                list/tuple of two elements: ('domain', 'tld').
+            nameserver -- nameserver host name, e.g. 'ns1.domain.tld'
+            ip -- nameserver IP address
 
-    def get_nameserver_info(self):
-        pass
+        Returns:
+            True if the nameserver was created, False otherwise.
+        """
+        host_name, tld = self._normalize_domain(domain)
+
+        xml = self._call(DOMAINS_NS_CREATE, {
+            'SLD': host_name,
+            'TLD': tld,
+            'Nameserver': nameserver,
+            'IP': ip
+        }).find(self._tag('DomainNSCreateResult'))
+
+        return xml.get('IsSuccess').lower() == 'true'
+
+    def delete_nameserver(self, domain: typing.Sequence,
+                          nameserver: str) -> bool:
+        """Delete a child nameserver of a domain.
+
+        https://www.namecheap.com/support/api/methods/domains-ns/delete.aspx
+
+        Arguments:
+            domain -- domain name (see create_nameserver)
+            nameserver -- nameserver host name
+
+        Returns:
+            True if the nameserver was deleted, False otherwise.
+        """
+        host_name, tld = self._normalize_domain(domain)
+
+        xml = self._call(DOMAINS_NS_DELETE, {
+            'SLD': host_name,
+            'TLD': tld,
+            'Nameserver': nameserver
+        }).find(self._tag('DomainNSDeleteResult'))
+
+        return xml.get('IsSuccess').lower() == 'true'
+
+    def update_nameserver(self, domain: typing.Sequence, nameserver: str,
+                          ip: str, old_ip: str) -> bool:
+        """Change the IP address of a child nameserver.
+
+        https://www.namecheap.com/support/api/methods/domains-ns/update.aspx
+
+        Arguments:
+            domain -- domain name (see create_nameserver)
+            nameserver -- nameserver host name
+            ip -- new IP address
+            old_ip -- current IP address
+
+        Returns:
+            True if the nameserver was updated, False otherwise.
+        """
+        host_name, tld = self._normalize_domain(domain)
+
+        xml = self._call(DOMAINS_NS_UPDATE, {
+            'SLD': host_name,
+            'TLD': tld,
+            'Nameserver': nameserver,
+            'OldIP': old_ip,
+            'IP': ip
+        }).find(self._tag('DomainNSUpdateResult'))
+
+        return xml.get('IsSuccess').lower() == 'true'
+
+    def get_nameserver_info(self, domain: typing.Sequence,
+                            nameserver: str) -> dict:
+        """Get information about a child nameserver.
+
+        https://www.namecheap.com/support/api/methods/domains-ns/get-info.aspx
+
+        Arguments:
+            domain -- domain name (see create_nameserver)
+            nameserver -- nameserver host name
+
+        Returns:
+            {'Domain': domain,
+             'Nameserver': nameserver,
+             'IP': IP address,
+             'Statuses': ['ok', ...]}
+        """
+        host_name, tld = self._normalize_domain(domain)
+
+        xml = self._call(DOMAINS_NS_GET_INFO, {
+            'SLD': host_name,
+            'TLD': tld,
+            'Nameserver': nameserver
+        }).find(self._tag('DomainNSInfoResult'))
+
+        return {
+            'Domain': xml.get('Domain'),
+            'Nameserver': xml.get('Nameserver'),
+            'IP': xml.get('IP'),
+            'Statuses': [status.text for status in xml.iter(
+                self._tag('Status'))]
+        }
+
+    def sync_child_nameservers(
+            self, desired: typing.Mapping[str, typing.Mapping[str, str]],
+            dry_run: bool = False) -> typing.Dict[str, dict]:
+        """Bring child nameservers of many domains in line with a map.
+
+        The current IP of every listed nameserver is read concurrently;
+        then only the creates, updates and deletes needed are sent,
+        also concurrently. There is no API call listing the child
+        nameservers of a domain, so nameservers not in desired are left
+        alone; map a nameserver to None to have it deleted.
+
+        A nameserver whose getInfo call fails with one of the
+        NAMESERVER_NOT_FOUND_ERRORS is taken as absent. Any other error
+        leaves the nameserver's state unknown: it is reported as the
+        domain's error and none of the domain's creates, updates and
+        deletes are sent.
+
+        Arguments:
+            desired -- {domain: {nameserver: IP address or None}}, e.g.
+                {'domain.tld': {'ns1.domain.tld': '192.0.2.1',
+                                'ns3.domain.tld': None}}
+            dry_run -- setting to True only reports the operations.
+
+        Returns:
+            A dict mapping every domain to
+            {'Create': [nameservers], 'Update': [nameservers],
+             'Delete': [nameservers],
+             'Errors': {nameserver: error of its failed operation}}
+            or to the error raised while reading its nameservers.
+        """
+        def absent(error: dict) -> bool:
+            text = NAMESERVER_NOT_FOUND_ERRORS.get(error.get('Number'))
+            return bool(text and text.search(error.get('Text') or ''))
+
+        def read(item: tuple) -> typing.Optional[str]:
+            try:
+                return self.get_nameserver_info(*item)['IP']
+            except NCApiError as e:
+                if any(absent(error) for error in e.errors):
+                    return None
+                raise
+
+        hosts = [(domain, nameserver) for domain, nameservers
+                 in desired.items() for nameserver in nameservers]
+        current = dict(zip(hosts, self._map(read, hosts,
+                                            return_exceptions=True)))
+
+        result, operations = {}, []
+        for domain, nameservers in desired.items():
+            errors = [current[domain, nameserver]
+                      for nameserver in nameservers
+                      if isinstance(current[domain, nameserver], Exception)]
+            if errors:
+                result[domain] = errors[0]
+                continue
+
+            plan = {'Create': [], 'Update': [], 'Delete': [], 'Errors': {}}
+            for nameserver, ip in nameservers.items():
+                old_ip = current[domain, nameserver]
+                if ip is None and old_ip is not None:
+                    plan['Delete'].append(nameserver)
+                    operations.append((plan, functools.partial(
+                        self.delete_nameserver, domain, nameserver)))
+                elif ip is not None and old_ip is None:
+                    plan['Create'].append(nameserver)
+                    operations.append((plan, functools.partial(
+                        self.create_nameserver, domain, nameserver, ip)))
+                elif ip is not None and ip != old_ip:
+                    plan['Update'].append(nameserver)
+                    operations.append((plan, functools.partial(
+                        self.update_nameserver, domain, nameserver, ip,
+                        old_ip)))
+            result[domain] = plan
+
+        if dry_run:
+            return result
+
+        outcomes = self._map(lambda operation: operation[1](), operations,
+                             return_exceptions=True)
+        for (plan, operation), outcome in zip(operations, outcomes):
+            if outcome is False:
+                outcome = NCApiError('{} of {} failed'.format(
+                    operation.func.__name__, operation.args[1]))
+            if isinstance(outcome, Exception):
+                plan['Errors'][operation.args[1]] = outcome
+
+        return result
 
     def set_nameservers(self, domain: typing.Sequence,
                         nameservers: typing.Iterable = None,
@@ -643,34 +985,242 @@ class DomainAPI(Session):
                 [ns.text for ns in xml.findall(self._tag('Nameserver'))]
         }
 
+    def set_nameservers_many(self, domains: typing.Iterable,
+                             nameservers: typing.Iterable = None,
+                             set_default: bool = False) -> dict:
+        """Set the same nameservers for many domains concurrently.
+
+        Arguments:
+            domains -- iterable with domain names (see set_nameservers)
+            nameservers -- iterable with nameserver strings
+            set_default -- setting to True will set Namecheap DNS
+
+        Returns:
+            A dict mapping every domain to the update status, or to the
+            NCApiError raised for it.
+        """
+        domains = list(domains)
+        nameservers = list(nameservers or [])
+        return dict(zip(
+            [self._join_domain(domain) for domain in domains],
+            self._map(lambda domain: self.set_nameservers(
+                domain, nameservers, set_default), domains,
+                return_exceptions=True)))
+
     def get_host_records(self):
         pass
 
     def set_host_records(self):
         pass
 
-    def get_email_forwarding(self):
-        pass
+    def get_email_forwarding(self, domain: str) -> typing.Dict[str, str]:
+        """Get email forwarding settings.
 
-    def set_email_forwarding(self):
-        pass
+        https://www.namecheap.com/support/api/methods/domains-dns/get-email-forwarding.aspx
 
-    def create_transfer(self):
-        pass
+        Arguments:
+            domain -- domain name
 
-    def get_transfer_status(self):
-        pass
+        Returns:
+            A dict mapping every mailbox to the address it forwards to
+            {'info': 'peter@griffin.tv', ...}
+        """
+        xml = self._call(DOMAINS_GET_EMAIL_FORWARDING, {
+            'DomainName': domain
+        }).find(self._tag('DomainDNSGetEmailForwardingResult'))
 
-    def update_transfer_status(self):
-        pass
+        return collections.OrderedDict(
+            (forward.get('mailbox'), forward.text)
+            for forward in xml.findall(self._tag('Forward')))
 
-    def get_transfer_list(self):
-        pass
+    def set_email_forwarding(self, domain: str,
+                             forwards: typing.Dict[str, str]) -> bool:
+        """Set email forwarding.
+
+        https://www.namecheap.com/support/api/methods/domains-dns/set-email-forwarding.aspx
+
+        NOTE: the forwarding table of the domain is replaced as a
+        whole; mailboxes left out of forwards are removed.
+
+        Arguments:
+            domain -- domain name
+            forwards -- a dict mapping mailboxes to the addresses they
+                forward to (see get_email_forwarding)
+
+        Returns:
+            True if the settings were saved, False otherwise
+        """
+        query = {'DomainName': domain}
+        for number, (mailbox, address) in enumerate(forwards.items(), 1):
+            query['MailBox{}'.format(number)] = mailbox
+            query['ForwardTo{}'.format(number)] = address
+
+        xml = self._call(DOMAINS_SET_EMAIL_FORWARDING, query,
+                         post=True).find(
+            self._tag('DomainDNSSetEmailForwardingResult'))
+
+        return xml.get('IsSuccess').lower() == 'true'
+
+    def create_transfer(self, domain: str, epp_code: str, years: int = 1,
+                        coupon: str = None, add_whoisguard: bool = True,
+                        enable_whoisguard: bool = False) -> dict:
+        """Transfer a domain to Namecheap.
+
+        https://www.namecheap.com/support/api/methods/domains-transfer/create.aspx
+
+        NOTE: this method will charge your Namecheap account!
+
+        Arguments:
+            domain -- domain name to transfer
+            epp_code -- EPP (authorization) code of the domain
+            years -- years to renew the domain for with the transfer
+            coupon -- coupon code. If provided, overrides the
+                session-specified coupon.
+            add_whoisguard -- add a free WhoisGuard with the domain
+            enable_whoisguard -- enable the free WhoisGuard
+
+        Returns:
+            A dict with order-related information.
+        """
+        query = {
+            'DomainName': domain,
+            'Years': years,
+            'EPPCode': epp_code,
+            'AddFreeWhoisguard': 'yes' if add_whoisguard else 'no',
+            'WGenable': 'yes' if enable_whoisguard else 'no',
+        }
+
+        if coupon:
+            query['PromotionCode'] = coupon
+        elif self.coupon:
+            query['PromotionCode'] = self.coupon
+
+        xml = self._call(DOMAINS_TRANSFER_CREATE, query).find(
+            self._tag('DomainTransferCreateResult'))
+
+        return {
+            'Domain': xml.get('DomainName'),
+            'Success': xml.get('Transfer').lower() == 'true',
+            'ID': int(xml.get('TransferID')),
+            'StatusID': int(xml.get('StatusID')),
+            'OrderID': int(xml.get('OrderID')),
+            'TransactionID': int(xml.get('TransactionID')),
+            'ChargedAmount': float(xml.get('ChargedAmount')),
+        }
+
+    def get_transfer_status(self, transfer_id: int) -> dict:
+        """Get the status of a domain transfer.
+
+        https://www.namecheap.com/support/api/methods/domains-transfer/get-status.aspx
+
+        Arguments:
+            transfer_id -- transfer ID
+
+        Returns:
+            A dict with the transfer 'ID', 'Status' and 'StatusID'.
+        """
+        xml = self._call(DOMAINS_TRANSFER_GET_STATUS, {
+            'TransferID': transfer_id
+        }).find(self._tag('DomainTransferGetStatusResult'))
+
+        return {
+            'ID': int(xml.get('TransferID')),
+            'Status': xml.get('Status'),
+            'StatusID': int(xml.get('StatusID')),
+        }
+
+    def update_transfer_status(self, transfer_id: int,
+                               resubmit: bool = True) -> bool:
+        """Resubmit a transfer after releasing the registry lock.
+
+        https://www.namecheap.com/support/api/methods/domains-transfer/update-status.aspx
+
+        Arguments:
+            transfer_id -- transfer ID
+            resubmit -- resubmit the transfer
+
+        Returns:
+            True if the transfer was resubmitted, False otherwise
+        """
+        xml = self._call(DOMAINS_TRANSFER_UPDATE_STATUS, {
+            'TransferID': transfer_id,
+            'Resubmit': 'true' if resubmit else 'false'
+        }).find(self._tag('DomainTransferUpdateStatusResult'))
+
+        return xml.get('Resubmit').lower() == 'true'
+
+    def get_transfer_list(self, _type: str = 'ALL',
+                          search_term: str = None) -> typing.List[dict]:
+        """Get the list of domain transfers.
+
+        https://www.namecheap.com/support/api/methods/domains-transfer/get-list.aspx
+
+        Arguments:
+            _type -- possible values: 'ALL', 'INPROGRESS', 'CANCELLED',
+                'COMPLETED'
+            search_term -- keyword to look for in the transfer list.
+
+        Returns:
+            A list containing dicts with transfer information.
+        """
+        return list(self.iter_transfer_list(_type, search_term))
+
+    def iter_transfer_list(self, _type: str = 'ALL',
+                           search_term: str = None) -> typing.Iterator[dict]:
+        """Iterate over the list of domain transfers.
+
+        Same as get_transfer_list(), but transfers are yielded as their
+        page arrives. The first page tells the total number of
+        transfers; the remaining pages are fetched concurrently.
+        """
+        def fetch(page: int) -> Element:
+            query = {
+                'ListType': _type,
+                'Page': page,
+                'PageSize': TRANSFER_LIST_PAGE_SIZE
+            }
+            if search_term:
+                query['SearchTerm'] = search_term
+
+            return self._call(DOMAINS_TRANSFER_GET_LIST, query)
+
+        def parse(xml: Element) -> list:
+            return [self._parse_list_transfer(transfer) for transfer in
+                    xml.find(self._tag('TransferGetListResult')).findall(
+                        self._tag('Transfer'))]
+
+        xml = fetch(1)
+        total = int(xml.find(self._tag('Paging')).find(
+            self._tag('TotalItems')).text)
+        yield from parse(xml)
+
+        pages = self._prefetch(
+            fetch, range(2, ceil(total / TRANSFER_LIST_PAGE_SIZE) + 1))
+        try:
+            for xml in pages:
+                yield from parse(xml)
+        finally:
+            pages.close()
+
+    def _check_results(self, domains: typing.Iterable[str]
+                       ) -> typing.List[Element]:
+        """DomainCheckResult elements for domains, checked in batches of
+        CHECK_BATCH_SIZE concurrently.
+        """
+        domains = list(domains)
+
+        def check_batch(batch: list) -> Element:
+            return self._call(DOMAINS_CHECK, {'DomainList': ','.join(batch)})
+
+        return [item for xml in self._map(check_batch, [
+                    domains[i:i + CHECK_BATCH_SIZE]
+                    for i in range(0, len(domains), CHECK_BATCH_SIZE)])
+                for item in xml.findall(self._tag('DomainCheckResult'))]
 
     def _normalize_domain(self, domain: typing.Sequence) -> tuple:
         if isinstance(domain, str):
             host_name, _, tld = domain.partition('.')
-        elif isinstance(domain, collections.Sequence):
+        elif isinstance(domain, collections.abc.Sequence):
             host_name, tld = domain
         else:
             raise TypeError('Argument "domain" must either be a string or '
@@ -678,20 +1228,315 @@ class DomainAPI(Session):
 
         return host_name, tld
 
-    def _build_address_dict(self, address: dict) -> dict:
+    def _warm_up_steps(self) -> typing.List[tuple]:
+        return super()._warm_up_steps() + [
+            ('tld_list', self._fetch_tld_list)]
+
+    def _fetch_tld_list(self) -> tuple:
+        xml = self._call(DOMAINS_GET_TLD_LIST).find(self._tag('Tlds'))
 
         result = {}
 
-        # Creates entries like 'RegistrantFirstName' with their values.
-        for address_type in ADDRESS_TYPES:
+        for tld in xml.findall(self._tag('Tld')):
+            tld_name = tld.get('Name')
+            result[tld_name] = dict(tld.attrib)
+            result[tld_name]['Description'] = tld.text
+            del result[tld_name]['Name']
 
-            # Optional parameters
-            for param in OPTIONAL_ADDRESS_PARAMS:
-                if address.get(param):
-                    result[address_type + param] = address.get(param)
+            # Normalize dict values
+            for key in result[tld_name]:
+                if result[tld_name][key].lower() == 'false':
+                    result[tld_name][key] = False
+                elif result[tld_name][key].lower() == 'true':
+                    result[tld_name][key] = True
+                elif result[tld_name][key].lower() == '':
+                    result[tld_name][key] = None
+                else:
+                    try:
+                        int(result[tld_name][key])
+                    except ValueError:
+                        continue
+                    else:
+                        result[tld_name][key] = int(result[tld_name][key])
 
-            # Required parameters
-            for param in REQUIRED_ADDRESS_PARAMS:
-                result[address_type + param] = address[param]
+        self._tld_list = (time.monotonic(), result)
+        return self._tld_list
+
+    def _iter_list_pages(self, _type: str = 'ALL',
+                         search_term: str = None,
+                         window: typing.Callable[[], int] = None
+                         ) -> typing.Iterator[tuple]:
+        """Iterate over get_list() pages.
+
+        Yields (total number of domains, list of domain dicts) for each
+        page. The first page doubles as the check on the total domain
+        number, so no extra call is needed; the remaining pages are
+        fetched concurrently, a few pages ahead of the consumer (see
+        _prefetch() for window). With decode_processes, pages are
+        decoded in worker processes.
+        """
+        def fetch(page: int) -> tuple:
+            query = {
+                'ListType': _type,
+                'Page': page,
+                'PageSize': LIST_PAGE_SIZE
+            }
+            if search_term:
+                query['SearchTerm'] = search_term
+
+            if self.decode_processes:
+                decoded = self._call(
+                    DOMAINS_GET_LIST, query, decode=lambda raw_xml:
+                    self._decode(decode_list_page, raw_xml, self.parser.name))
+                return decoded['Total'], decoded['Domains']
+
+            xml = self._call(DOMAINS_GET_LIST, query)
+            total = int(xml.find(self._tag('Paging')).find(
+                self._tag('TotalItems')).text)
+            return total, [self._parse_list_domain(domain) for domain in
+                           xml.find(self._tag('DomainGetListResult')).findall(
+                               self._tag('Domain'))]
+
+        total, domains = fetch(1)
+        yield total, domains
+
+        pages = self._prefetch(
+            fetch, range(2, ceil(total / LIST_PAGE_SIZE) + 1), window)
+        try:
+            for _, domains in pages:
+                yield total, domains
+        finally:
+            pages.close()
+
+    def _parse_list_domain(self, domain: Element) -> dict:
+        return list_domain(domain)
+
+    def _parse_list_transfer(self, transfer: Element) -> dict:
+
+        def date(value: str) -> typing.Optional[datetime]:
+            return datetime.strptime(value, '%m/%d/%Y') if value else None
+
+        return {
+            'ID': int(transfer.get('ID')),
+            'Domain': transfer.get('DomainName'),
+            'Owner': transfer.get('User'),
+            'Transfer date': date(transfer.get('TransferDate')),
+            'OrderID': int(transfer.get('OrderID') or 0),
+            'Status': transfer.get('Status'),
+            'StatusID': int(transfer.get('StatusID')),
+            'Status date': date(transfer.get('StatusDate')),
+            'Status description': transfer.get('StatusDescription'),
+        }
+
+    def _list_rows(self, domains: typing.Iterable[str]) -> tuple:
+        """Plan a bulk read of per-domain fields carried by get_list().
+
+        Sweeps get_list() pages for as long as the remaining pages are
+        fewer than the domains still to be found; after that, one call
+        per domain is cheaper. A single domain is never swept for.
+
+        Returns:
+            A tuple of a dict with get_list() rows keyed by the
+            requested domain names, and a list of the domains that
+            were not found and need per-domain calls.
+        """
+        wanted = collections.OrderedDict(
+            (domain.lower(), domain) for domain in domains)
+        rows = {}
+
+        if len(wanted) < 2:
+            return rows, list(wanted.values())
+
+        # Pages left to read.
+        left = [0]
+
+        def window() -> int:
+            # Pages sure to be read even if each of them held
+            # LIST_PAGE_SIZE wanted domains; prefetching more could
+            # fetch pages the sweep stops before.
+            return 1 + max(0, len(wanted) - left[0] - 1) // max(
+                1, LIST_PAGE_SIZE - 1)
+
+        pages = self._iter_list_pages(window=window)
+        for page, (total, page_rows) in enumerate(pages, 1):
+            for row in page_rows:
+                domain = wanted.pop(row['Domain'].lower(), None)
+                if domain is not None:
+                    rows[domain] = row
+
+            left[0] = ceil(total / LIST_PAGE_SIZE) - page
+            if not wanted or left[0] >= len(wanted):
+                pages.close()
+                break
+
+        return rows, list(wanted.values())
+
+    def _info_decoders(self, xml: Element) -> collections.OrderedDict:
+        """Map every get_info() key to a function decoding its value.
+        """
+        def details() -> Element:
+            return xml.find(self._tag('DomainDetails'))
+
+        return collections.OrderedDict([
+            # Basic information
+            ('Domain', lambda: xml.get('DomainName')),
+            ('Owner', lambda: xml.get('OwnerName')),
+            ('Status', lambda: xml.get('Status')),
+            ('ID', lambda: xml.get('ID')),
+            ('IsOwner', lambda: xml.get('IsOwner').lower() == 'true'),
+            ('Full modification rights',
+             lambda: xml.find(self._tag('Modificationrights')).
+             get('All').lower() == 'true'),
+            ('Creation', lambda: datetime.strptime(
+                details().find(self._tag('CreatedDate')).text, '%m/%d/%Y')),
+            ('Expiration', lambda: datetime.strptime(
+                details().find(self._tag('ExpiredDate')).text, '%m/%d/%Y')),
+            ('WhoisGuard',
+             lambda: self._info_whoisguard(xml.find(self._tag('Whoisguard')))),
+            ('PremiumDNS', lambda: self._info_premium_dns(
+                xml.find(self._tag('PremiumDnsSubscription')))),
+            ('DNS', lambda: self._info_dns(xml.find(self._tag('DnsDetails')))),
+        ])
+
+    def _info_whoisguard(self, wg: Element) -> dict:
+
+        result = {'Enabled': wg.get('Enabled').lower() == 'true'}
+
+        if result['Enabled']:
+            email = wg.find(self._tag('EmailDetails'))
+            result.update({
+                'Expiration':
+                    datetime.strptime(wg.find(self._tag('ExpiredDate')).text,
+                                      '%m/%d/%Y'),
+                'ID': wg.find(self._tag('ID')).text,
+                'Email': email.get('WhoisGuardEmail'),
+                'Forwarded to': email.get('ForwardedTo'),
+                'Last email auto-change date':
+                    email.get('LastAutoEmailChangeDate') or None,
+                'Email auto-change frequency':
+                    email.get('AutoEmailChangeFrequencyDays')
+            })
 
         return result
+
+    def _info_premium_dns(self, pdns: Element) -> dict:
+
+        return {
+            'Creation': pdns.find(self._tag('CreatedDate')).text,
+            'Expiration': pdns.find(self._tag('ExpirationDate')).text,
+            'ID': pdns.find(self._tag('SubscriptionId')).text,
+            'Auto-renew': pdns.find(
+                self._tag('UseAutoRenew')).text.lower() == 'true',
+            'Active': pdns.find(self._tag('IsActive')).text.lower() == 'true'
+        }
+
+    def _info_dns(self, dns: Element) -> dict:
+
+        return {
+            'Type': dns.get('ProviderType'),
+            'Using NC DNS': dns.get('IsUsingOurDNS').lower() == 'true',
+            'Host records count': dns.get('HostCount'),
+            'Email type': dns.get('EmailType'),
+            'Dynamic DNS': dns.get('DynamicDNSStatus').lower() == 'true',
+            'Failover DNS': dns.get('IsFailover').lower() == 'true',
+            'Nameservers': [ns.text for ns in
+                            dns.findall(self._tag('Nameserver'))]
+        }
+
+    def _join_domain(self, domain: typing.Sequence) -> str:
+        return '.'.join(self._normalize_domain(domain))
+
+    def _build_address_dict(self, address: dict) -> dict:
+
+        return build_address_dict(address)
+
+    def _contact_differences(self, contacts: dict,
+                             target: dict) -> typing.List[str]:
+        """List the prefixed fields where contacts differ from target.
+
+        contacts is a get_contacts() result and target a
+        _build_address_dict() result.
+        """
+        changed = []
+        for address_type in ADDRESS_TYPES:
+            current = contacts[address_type]
+            if current['ReadOnly']:
+                continue
+            for param in REQUIRED_ADDRESS_PARAMS + OPTIONAL_ADDRESS_PARAMS:
+                field = address_type + param
+                if current.get(param) != target.get(field):
+                    changed.append(field)
+        return changed
+
+    def _contact_template(self, command: str,
+                          address: dict) -> QueryTemplate:
+        """Return a query template with the encoded contact payload.
+
+        Templates are memoized per command and contact details, so a
+        contact shared by many domains is expanded and urlencoded once.
+        """
+        try:
+            return _contact_template(command,
+                                     tuple(sorted(address.items())))
+        except TypeError:
+            # Unhashable values; build the payload without caching it.
+            return QueryTemplate(command, build_address_dict(address))
+
+
+def build_address_dict(address: dict) -> dict:
+
+    result = {}
+
+    # Creates entries like 'RegistrantFirstName' with their values.
+    for address_type in ADDRESS_TYPES:
+
+        # Optional parameters
+        for param in OPTIONAL_ADDRESS_PARAMS:
+            if address.get(param):
+                result[address_type + param] = address.get(param)
+
+        # Required parameters
+        for param in REQUIRED_ADDRESS_PARAMS:
+            result[address_type + param] = address[param]
+
+    return result
+
+
+@functools.lru_cache(maxsize=256)
+def _contact_template(command: str, address: tuple) -> QueryTemplate:
+    return QueryTemplate(command, build_address_dict(dict(address)))
+
+
+class DomainInfo(collections.abc.Mapping):
+    """Lazily decoded get_info() result.
+
+    Keeps the parsed response and decodes each key on first access,
+    caching the value. Behaves like a read-only dict; use to_dict() to
+    get the same dict that get_info() returns by default.
+    """
+
+    def __init__(self,
+                 decoders: typing.Mapping[str, typing.Callable]) -> None:
+        self._decoders = decoders
+        self._values = {}
+
+    def __getitem__(self, key: str) -> typing.Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = self._decoders[key]()
+            return value
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._decoders)
+
+    def __len__(self) -> int:
+        return len(self._decoders)
+
+    def __repr__(self) -> str:
+        return '<DomainInfo {!r}>'.format(self.get('Domain'))
+
+    def to_dict(self) -> dict:
+        """Decode every key and return the result as a dict.
+        """
+        return {key: self[key] for key in self}
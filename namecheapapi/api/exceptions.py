@@ -1,2 +1,6 @@
 class NCApiError(Exception):
-    pass
+
+    def __init__(self, message: str = '', errors: list = None) -> None:
+        super().__init__(message)
+        # [{'Number': '2019166', 'Text': 'Domain not found'}, ...]
+        self.errors = errors or []
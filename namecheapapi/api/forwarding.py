@@ -0,0 +1,169 @@
+"""Cached email forwarding tables.
+
+setEmailForwarding replaces the whole forwarding table of a domain, so
+every change is a read-modify-write. EmailForwarding keeps the last
+known table of every domain it has seen, so updates that change
+nothing cost no call at all. A real write is always computed from a
+freshly read table, so mailboxes added elsewhere are never dropped.
+"""
+import threading
+import time
+import typing
+
+ForwardingTable = typing.Dict[str, str]
+
+
+class EmailForwarding:
+    """Email forwarding tables of many domains.
+
+    Tables are cached after every read and successful write, and only
+    used to skip writes that would change nothing. The cache is safe
+    to share between threads.
+
+    Example:
+        forwarding = EmailForwarding(api)
+        forwarding.apply_many(domains, lambda table: dict(
+            table, catchall='postmaster@example.com'))
+    """
+
+    def __init__(self, api, ttl: float = 300) -> None:
+        """Cache initialization.
+
+        Arguments:
+            api -- DomainAPI instance.
+            ttl -- seconds to keep a table. None keeps tables until
+                they are invalidated.
+        """
+        self.api = api
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def get(self, domain: str, refresh: bool = False) -> ForwardingTable:
+        """Return the forwarding table of a domain.
+
+        Arguments:
+            domain -- domain name
+            refresh -- setting to True ignores the cached table.
+        """
+        return self._get(domain, refresh)[0]
+
+    def set(self, domain: str, forwards: ForwardingTable,
+            dry_run: bool = False) -> dict:
+        """Replace the forwarding table of a domain, if it differs.
+
+        Arguments:
+            domain -- domain name
+            forwards -- the new table (see get_email_forwarding)
+            dry_run -- setting to True only reports the differences.
+
+        Returns:
+            {'Changed': [mailboxes added, removed or redirected],
+             'Updated': True if setEmailForwarding was sent,
+             'Success': False if setEmailForwarding reported a failure}
+        """
+        return self._update(domain, lambda table: forwards, dry_run)
+
+    def apply_many(self, domains: typing.Iterable[str],
+                   update: typing.Union[ForwardingTable, typing.Callable[
+                       [ForwardingTable], ForwardingTable]],
+                   dry_run: bool = False) -> typing.Dict[str, dict]:
+        """Update the forwarding tables of many domains concurrently.
+
+        Tables that are not cached are read first, one call per domain;
+        setEmailForwarding is only sent where the table changes.
+
+        Arguments:
+            domains -- iterable with domain names
+            update -- the new table, or a function taking the current
+                table of a domain and returning its new table.
+            dry_run -- setting to True only reports the differences.
+
+        Returns:
+            A dict mapping every domain to what set() returned for it,
+            or to the error raised for it.
+        """
+        if not callable(update):
+            table = dict(update)
+
+            def update(current: ForwardingTable) -> ForwardingTable:
+                return table
+
+        def apply(domain: str) -> dict:
+            return self._update(domain, update, dry_run)
+
+        domains = list(domains)
+        return dict(zip(domains, self.api._map(apply, domains,
+                                               return_exceptions=True)))
+
+    def invalidate(self, domains: typing.Iterable[str] = None) -> None:
+        """Drop cached tables (all of them by default).
+        """
+        with self._lock:
+            if domains is None:
+                self._tables.clear()
+            else:
+                for domain in domains:
+                    self._tables.pop(domain.lower(), None)
+
+    def _get(self, domain: str,
+             refresh: bool) -> typing.Tuple[ForwardingTable, bool]:
+        """Return the table of a domain, and whether it was just read.
+        """
+        key = domain.lower()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._tables.get(key)
+            if (entry is not None and not refresh and
+                    (self.ttl is None or now - entry[0] <= self.ttl)):
+                self.hits += 1
+                return dict(entry[1]), False
+            self.misses += 1
+
+        table = self.api.get_email_forwarding(domain)
+        self._store(key, table, now)
+        return dict(table), True
+
+    def _update(self, domain: str,
+                update: typing.Callable[[ForwardingTable], ForwardingTable],
+                dry_run: bool) -> dict:
+        current, fresh = self._get(domain, False)
+        forwards = update(current)
+        changed = self._differences(current, forwards)
+        if changed and not dry_run and not fresh:
+            # The cached table may be stale: recompute from the current
+            # one, since the write replaces the whole table.
+            current = self.get(domain, refresh=True)
+            forwards = update(current)
+            changed = self._differences(current, forwards)
+        result = {'Changed': changed, 'Updated': False, 'Success': True}
+
+        if changed and not dry_run:
+            result['Updated'] = True
+            try:
+                result['Success'] = self.api.set_email_forwarding(
+                    domain, forwards)
+            except Exception:
+                # The table may or may not have been written.
+                self.invalidate([domain])
+                raise
+            if result['Success']:
+                self._store(domain.lower(), forwards, time.monotonic())
+            else:
+                self.invalidate([domain])
+
+        return result
+
+    def _store(self, key: str, table: ForwardingTable, now: float) -> None:
+        with self._lock:
+            self._tables[key] = (now, dict(table))
+
+    def _differences(self, old: ForwardingTable,
+                     new: ForwardingTable) -> typing.List[str]:
+        # Mailboxes are case-insensitive, addresses are compared as is.
+        old = {mailbox.lower(): address for mailbox, address in old.items()}
+        new = {mailbox.lower(): address for mailbox, address in new.items()}
+        return sorted(mailbox for mailbox in set(old) | set(new)
+                      if old.get(mailbox) != new.get(mailbox))
@@ -0,0 +1,299 @@
+"""Idempotency journal for charging calls.
+
+register(), renew() and reactivate() charge the account. When such a
+call fails without an API answer (a timeout, a dropped connection), the
+charge may or may not have happened, and retrying blindly can charge
+twice. ChargeJournal writes the intent of every charging call to a
+local append-only file before making it, and the OrderID/TransactionID
+after it. An intent left without an outcome is reconciled against the
+account (the domain's expiration date, or its presence for
+registrations) before the call is retried, so charging jobs can run
+concurrently and be retried safely, even across process restarts.
+"""
+import json
+import os
+import threading
+import typing
+from datetime import datetime
+
+from namecheapapi.api.exceptions import NCApiError
+
+INTENT = 'intent'
+DONE = 'done'
+FAILED = 'failed'
+
+# Journal fields holding datetimes.
+DATE_FIELDS = ('Before', 'Expiration')
+
+
+class ChargeJournal:
+    """Journaled register(), renew() and reactivate().
+
+    Every call is identified by a key. A key that already completed
+    returns its journaled result without calling the API again, and a
+    key whose previous attempt ended ambiguously is reconciled first.
+    Default keys are 'register:<domain>', and
+    '<command>:<domain>:<expiration date>' for renewals. A renewal
+    without a key first settles the journaled renewals of the domain
+    that started before its current expiration date; if one of them
+    charged and led to that date, its result is returned instead of
+    charging again, so rerunning a job renews every domain once. Pass a
+    new key to renew a domain again on purpose.
+
+    Example:
+        journal = ChargeJournal(api, 'charges.journal')
+        journal.renew_many(domains)
+    """
+
+    def __init__(self, api, path: str, retries: int = 1) -> None:
+        """Journal initialization.
+
+        Arguments:
+            api -- DomainAPI instance.
+            path -- journal file. Created if it does not exist; entries
+                from previous runs are loaded.
+            retries -- how many times a call that failed ambiguously
+                and was found not to have charged is retried.
+        """
+        self.api = api
+        self.path = path
+        self.retries = retries
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._load()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'ChargeJournal':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def register(self, domain: str, *args, key: str = None,
+                 **kwargs) -> dict:
+        """Journaled DomainAPI.register(), same arguments.
+
+        Arguments:
+            key -- idempotency key (default: 'register:<domain>')
+        """
+        return self._charge(
+            key or 'register:{}'.format(domain.lower()), 'register', domain,
+            None, lambda: self.api.register(domain, *args, **kwargs))
+
+    def renew(self, domain: str, years: int = 1, coupon: str = None,
+              key: str = None, expiration: datetime = None) -> dict:
+        """Journaled DomainAPI.renew().
+
+        Arguments:
+            key -- idempotency key (default:
+                'renew:<domain>:<expiration date>')
+            expiration -- current expiration of the domain. Fetched with
+                get_info() if not provided.
+        """
+        return self._renewal('renew', domain, years, coupon, key,
+                             expiration)
+
+    def reactivate(self, domain: str, years: int = 1, coupon: str = None,
+                   key: str = None, expiration: datetime = None) -> dict:
+        """Journaled DomainAPI.reactivate(), see renew().
+        """
+        return self._renewal('reactivate', domain, years, coupon, key,
+                             expiration)
+
+    def renew_many(self, domains: typing.Iterable[str], years: int = 1,
+                   coupon: str = None) -> typing.Dict[str, dict]:
+        """Journaled DomainAPI.renew_many().
+
+        Current expiration dates are fetched in bulk with
+        get_expiration_many() before renewing.
+
+        Returns:
+            A dict mapping every domain to what renew() returned for
+            it, or to the error raised by it.
+        """
+        domains = list(domains)
+        expirations = self.api.get_expiration_many(domains)
+        return dict(zip(domains, self.api._map(
+            lambda domain: self.renew(domain, years, coupon,
+                                      expiration=expirations[domain]),
+            domains, return_exceptions=True)))
+
+    def pending(self) -> typing.List[dict]:
+        """Return the entries whose outcome is unknown.
+        """
+        with self._lock:
+            return [dict(entry) for entry in self.entries.values()
+                    if entry['State'] == INTENT]
+
+    def reconcile(self) -> typing.Dict[str, bool]:
+        """Settle every pending entry against the account.
+
+        Returns:
+            A dict mapping every pending key to True if the charge
+            happened and False if it did not, or to the error raised
+            while checking.
+        """
+        keys = [entry['Key'] for entry in self.pending()]
+        return dict(zip(keys, self.api._map(self._settle, keys,
+                                            return_exceptions=True)))
+
+    def _renewal(self, command: str, domain: str, years: int, coupon: str,
+                 key: str, expiration: datetime) -> dict:
+        if expiration is None:
+            expiration = self.api.get_info(domain, lazy=True)['Expiration']
+        if key is None:
+            previous = self._previous(command, domain, expiration)
+            if previous is not None:
+                return previous
+            key = '{}:{}:{}'.format(command, domain.lower(),
+                                    expiration.date().isoformat())
+        call = getattr(self.api, command)
+
+        return self._charge(key, command, domain, expiration,
+                            lambda: call(domain, years, coupon))
+
+    def _previous(self, command: str, domain: str,
+                  expiration: datetime) -> typing.Optional[dict]:
+        """Find the journaled renewal the current expiration came from.
+
+        Entries of the same command and domain that started before
+        expiration are settled if pending. A charged one whose new
+        expiration date is not older than expiration was already done
+        by the job being rerun.
+
+        Returns:
+            The result of that renewal, or None if there is none.
+        """
+        with self._lock:
+            keys = [entry['Key'] for entry in self.entries.values()
+                    if entry['Command'] == command
+                    and entry['Domain'].lower() == domain.lower()
+                    and entry['State'] in (INTENT, DONE)
+                    and entry['Before'] < expiration]
+
+        found = None
+        for key in keys:
+            with self._key_lock(key):
+                entry = self.entries[key]
+                if entry['State'] == INTENT:
+                    self._settle(key)
+                    entry = self.entries[key]
+            if entry['State'] != DONE:
+                continue
+            after = entry['Result'].get('Expiration')
+            if after is not None and after < expiration:
+                continue
+            if found is None or entry['Before'] > found['Before']:
+                found = entry
+        return found['Result'] if found else None
+
+    def _charge(self, key: str, command: str, domain: str,
+                before: typing.Optional[datetime],
+                call: typing.Callable[[], dict]) -> dict:
+        with self._key_lock(key):
+            for attempt in range(self.retries + 1):
+                entry = self.entries.get(key)
+                if entry and entry['State'] == INTENT:
+                    entry = self.entries[key] if self._settle(key) else None
+                if entry and entry['State'] == DONE:
+                    return entry['Result']
+
+                self._write({'Key': key, 'State': INTENT,
+                             'Command': command, 'Domain': domain,
+                             'Before': before})
+                try:
+                    result = call()
+                except NCApiError as e:
+                    # The API answered: nothing was charged.
+                    self._write({'Key': key, 'State': FAILED,
+                                 'Errors': e.errors})
+                    raise
+                except Exception:
+                    # No answer: the charge may have happened. The next
+                    # iteration settles the intent before retrying.
+                    if attempt == self.retries:
+                        raise
+                    continue
+
+                self._write({'Key': key, 'State': DONE, 'Result': result})
+                return result
+
+    def _settle(self, key: str) -> bool:
+        """Find out whether a pending charge happened and journal it.
+
+        Raises whatever the account lookup raises if the question can't
+        be answered; the entry then stays pending.
+        """
+        entry = self.entries[key]
+        domain = entry['Domain']
+
+        try:
+            expiration = self.api.get_info(domain, lazy=True)['Expiration']
+        except NCApiError:
+            # Not in the account (yet): a registration did not happen.
+            if entry['Command'] != 'register':
+                raise
+            expiration = None
+
+        if entry['Command'] == 'register':
+            charged = expiration is not None
+        else:
+            charged = expiration > entry['Before']
+
+        if charged:
+            self._write({'Key': key, 'State': DONE, 'Reconciled': True,
+                         'Result': {'Domain': domain, 'Success': True,
+                                    'OrderID': None, 'TransactionID': None,
+                                    'Expiration': expiration}})
+        else:
+            self._write({'Key': key, 'State': FAILED, 'Reconciled': True})
+
+        return charged
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _write(self, record: dict) -> None:
+        line = json.dumps(record, default=_encode, sort_keys=True)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._apply(record)
+
+    def _apply(self, record: dict) -> None:
+        entry = self.entries.setdefault(record['Key'], {})
+        for field in ('Result', 'Reconciled', 'Errors'):
+            entry.pop(field, None)
+        entry.update(record)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line, object_hook=_decode)
+                except ValueError:
+                    # A record cut short by a crash was never followed
+                    # by the call it announced.
+                    continue
+                self._apply(record)
+
+
+def _encode(value: datetime) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(repr(value))
+
+
+def _decode(record: dict) -> dict:
+    for field in DATE_FIELDS:
+        if isinstance(record.get(field), str):
+            record[field] = datetime.fromisoformat(record[field])
+    return record
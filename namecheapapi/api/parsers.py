@@ -0,0 +1,77 @@
+"""XML parser backends.
+
+Responses are parsed with the standard library's ElementTree by
+default. lxml can be used instead, either explicitly or with 'auto',
+which picks the first importable backend from PARSERS. Both backends
+return elements with the same find(), findall(), get() and text
+interface, and handle the response namespace the same way.
+
+Measure before switching: on CPython 3.11 the stdlib parser is as fast
+as lxml on large getlist and getTldlist responses, and ElementTree
+elements are cheaper to decode (see benchmarks/bench_parsers.py).
+"""
+import xml.etree.ElementTree as ElementTree
+
+
+class ElementTreeParser:
+    """Standard library parser (xml.etree.ElementTree).
+    """
+    name = 'etree'
+
+    def fromstring(self, data: bytes) -> ElementTree.Element:
+        return ElementTree.fromstring(data)
+
+    def tostring(self, element: ElementTree.Element) -> str:
+        return ElementTree.tostring(element, encoding='unicode')
+
+
+class LxmlParser:
+    """lxml parser. Raises ImportError if lxml is not installed.
+    """
+    name = 'lxml'
+
+    def __init__(self) -> None:
+        from lxml import etree
+
+        self._etree = etree
+        # Responses come from the API only, but there is no reason to
+        # resolve entities or fetch anything over the network anyway.
+        self._parser = etree.XMLParser(resolve_entities=False,
+                                       no_network=True)
+
+    def fromstring(self, data: bytes):
+        return self._etree.fromstring(data, self._parser)
+
+    def tostring(self, element) -> str:
+        return self._etree.tostring(element, encoding='unicode')
+
+
+# Preferred backends first, for parser='auto'.
+PARSERS = {
+    'lxml': LxmlParser,
+    'etree': ElementTreeParser,
+}
+
+
+def get_parser(name: str = 'etree'):
+    """Return a parser backend instance.
+
+    Arguments:
+        name -- 'etree' (default), 'lxml', or 'auto' to select the
+            first importable backend from PARSERS.
+
+    Raises:
+        ValueError if the backend name is unknown.
+        ImportError if the requested backend is not installed.
+    """
+    if name == 'auto':
+        for parser in PARSERS.values():
+            try:
+                return parser()
+            except ImportError:
+                continue
+
+    if name not in PARSERS:
+        raise ValueError('Unknown XML parser backend: {}'.format(name))
+
+    return PARSERS[name]()
@@ -0,0 +1,49 @@
+"""Pre-encoded query building.
+
+Most of an API query never changes between calls: the credentials are
+fixed per session, the command per method, and bulk jobs often send the
+same contact details for thousands of domains. QueryTemplate encodes
+such constant parts once, so each call only urlencodes its own fields.
+"""
+import functools
+from urllib.parse import urlencode
+
+
+class QueryTemplate:
+    """Command with pre-encoded constant query parameters.
+
+    Templates can be passed to Session._call() in place of a command
+    name.
+    """
+
+    def __init__(self, command: str, constant: dict = None,
+                 encoded: str = '') -> None:
+        """Template initialization.
+
+        Arguments:
+            command -- NC API command
+            constant -- key/value pairs sent with every query
+            encoded -- already urlencoded key/value pairs sent with
+                every query
+        """
+        self.command = command
+        self.encoded = '&'.join(part for part in (
+            urlencode({'Command': command, **(constant or {})}), encoded)
+            if part)
+
+    def __repr__(self) -> str:
+        return '<QueryTemplate {}>'.format(self.command)
+
+    def render(self, query: dict = None) -> str:
+        """Return the urlencoded query with the per-call fields added.
+        """
+        if not query:
+            return self.encoded
+        return self.encoded + '&' + urlencode(query)
+
+
+@functools.lru_cache(maxsize=1024)
+def command_template(command: str) -> QueryTemplate:
+    """Return a shared template for a command without constant fields.
+    """
+    return QueryTemplate(command)
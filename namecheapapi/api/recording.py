@@ -0,0 +1,165 @@
+"""Traffic recording and replay.
+
+RecordingTransport wraps a real transport and writes every exchange
+(command, query without credentials, response bytes, latency) to a
+gzip-compressed file. ReplayTransport serves a recording back, with the
+recorded latencies scaled or distorted, so bulk jobs, caches and
+limiter settings can be load-tested offline and repeatably.
+
+Example:
+    api = DomainAPI(..., transport=RecordingTransport(
+        HTTPTransport(URLS['production']), 'traffic.rec'))
+    ...
+    api = DomainAPI(..., transport=ReplayTransport('traffic.rec', speed=10))
+"""
+import collections
+import gzip
+import struct
+import threading
+import time
+import typing
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+
+# Query parameters left out of recordings.
+REDACTED_PARAMS = ('ApiUser', 'ApiKey', 'Username', 'ClientIp')
+
+# latency, then the byte lengths of command, query and response
+RECORD = struct.Struct('<dIII')
+
+Exchange = collections.namedtuple(
+    'Exchange', ['command', 'query', 'response', 'latency'])
+
+
+def redact(query: str) -> typing.Tuple[str, str]:
+    """Split an urlencoded API query into its command and the rest of
+    the query without credentials.
+    """
+    params = parse_qsl(query, keep_blank_values=True)
+    command = next((value for key, value in params if key == 'Command'), '')
+    return command, urlencode([
+        (key, value) for key, value in params
+        if key != 'Command' and key not in REDACTED_PARAMS])
+
+
+def read_recording(path: str) -> typing.Iterator[Exchange]:
+    """Iterate over the exchanges of a recording file.
+    """
+    with gzip.open(path, 'rb') as recording:
+        while True:
+            header = recording.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            latency, *lengths = RECORD.unpack(header)
+            command, query, response = (recording.read(length)
+                                        for length in lengths)
+            yield Exchange(command.decode('utf-8'), query.decode('utf-8'),
+                           response, latency)
+
+
+class RecordingTransport:
+    """Transport recording the exchanges of another transport.
+
+    Only answered requests are recorded; errors raised by the wrapped
+    transport pass through. Other attributes (prepare(), connect())
+    are the wrapped transport's.
+    """
+
+    def __init__(self, transport, path: str) -> None:
+        """Recorder initialization.
+
+        Arguments:
+            transport -- transport sending the requests, e.g.
+                HTTPTransport.
+            path -- recording file. Appended to if it exists.
+        """
+        self.transport = transport
+        self.path = path
+        self._file = gzip.open(path, 'ab')
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> typing.Any:
+        if name == 'transport':
+            raise AttributeError(name)
+        return getattr(self.transport, name)
+
+    def request(self, query: str, post: bool = False) -> bytes:
+        start = time.perf_counter()
+        response = self.transport.request(query, post)
+        latency = time.perf_counter() - start
+
+        command, redacted = redact(query)
+        command, redacted = command.encode('utf-8'), redacted.encode('utf-8')
+        with self._lock:
+            self._file.write(RECORD.pack(latency, len(command),
+                                         len(redacted), len(response)))
+            self._file.write(command + redacted + response)
+
+        return response
+
+    def close(self) -> None:
+        """Finish the recording and close the wrapped transport.
+        """
+        with self._lock:
+            self._file.close()
+        close = getattr(self.transport, 'close', None)
+        if close is not None:
+            close()
+
+
+class ReplayTransport:
+    """Transport answering from a recording.
+
+    A query is answered with the responses recorded for the same
+    command and query, in turn; a query that was never recorded gets
+    the responses recorded for its command.
+    """
+
+    def __init__(self, path: str, speed: float = 1,
+                 latency: typing.Callable[[float], float] = None) -> None:
+        """Replay initialization.
+
+        Arguments:
+            path -- recording file.
+            speed -- replay speed: 1 waits the recorded latency before
+                answering, 10 a tenth of it. None answers right away.
+            latency -- function mapping a recorded latency (seconds) to
+                the one to replay, e.g. to add jitter or a slow tail.
+                Applied before speed.
+        """
+        self.speed = speed
+        self.latency = latency
+        self.exchanges = {}
+        self.by_command = {}
+        self._turns = collections.Counter()
+        self._lock = threading.Lock()
+
+        for exchange in read_recording(path):
+            self.exchanges.setdefault(
+                (exchange.command, exchange.query), []).append(exchange)
+            self.by_command.setdefault(exchange.command, []).append(exchange)
+
+    def request(self, query: str, post: bool = False) -> bytes:
+        """Raises:
+            LookupError if the command was never recorded.
+        """
+        key = redact(query)
+        if key in self.exchanges:
+            candidates = self.exchanges[key]
+        elif key[0] in self.by_command:
+            candidates, key = self.by_command[key[0]], key[0]
+        else:
+            raise LookupError('No recorded response for {!r}'.format(
+                key[0]))
+
+        with self._lock:
+            exchange = candidates[self._turns[key] % len(candidates)]
+            self._turns[key] += 1
+
+        delay = exchange.latency
+        if self.latency is not None:
+            delay = self.latency(delay)
+        if self.speed:
+            time.sleep(max(delay, 0) / self.speed)
+
+        return exchange.response
@@ -0,0 +1,177 @@
+"""Expiry-driven renewal scheduling.
+
+RenewalScheduler keeps the domains it manages in a heap keyed by the
+time their renewal window opens (in UTC, adjusted for the API server's
+clock offset), sleeps until the earliest one opens and renews every
+domain whose window opens within the same batching window in one
+concurrent wave.
+"""
+import heapq
+import logging
+import threading
+import typing
+from datetime import datetime
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+
+def manual_renewal(row: dict) -> bool:
+    """Default domain filter: live domains without auto-renew.
+    """
+    return not row['Expired'] and not row['Auto-renew']
+
+
+class RenewalScheduler:
+    """Renew domains a fixed time before they expire.
+
+    Example:
+        scheduler = RenewalScheduler(api, renew_before=timedelta(days=14),
+                                     on_result=print)
+        scheduler.run()
+    """
+
+    def __init__(self, api, renew_before: timedelta = timedelta(days=30),
+                 batch_window: timedelta = timedelta(hours=1),
+                 years: int = 1,
+                 select: typing.Callable[[dict], bool] = manual_renewal,
+                 on_result: typing.Callable[[str, typing.Any], None] = None,
+                 clock_sync_interval: timedelta = timedelta(hours=1),
+                 reseed_interval: timedelta = timedelta(days=1),
+                 retry_delay: timedelta = timedelta(minutes=30)) -> None:
+        """Scheduler initialization.
+
+        Arguments:
+            api -- DomainAPI instance.
+            renew_before -- how long before expiration to renew.
+            batch_window -- domains whose renewal time falls within this
+                period of the earliest one are renewed in the same wave.
+            years -- renewal years.
+            select -- function taking a get_list() row and telling
+                whether the domain should be renewed by the scheduler.
+            on_result -- called with (domain, result) for every renewal;
+                result is what renew() returned or the error it raised.
+            clock_sync_interval -- maximum age of the server clock
+                offset used to compute renewal times.
+            reseed_interval -- how often the heap is rebuilt from
+                get_list(), to pick up new and externally renewed
+                domains.
+            retry_delay -- how long a domain whose renewal failed waits
+                before it is tried again. run() also waits this long
+                (doubling with every further failure) after a wave that
+                could not be run at all.
+        """
+        self.api = api
+        self.renew_before = renew_before
+        self.batch_window = batch_window
+        self.years = years
+        self.select = select
+        self.on_result = on_result
+        self.clock_sync_interval = clock_sync_interval
+        self.reseed_interval = reseed_interval
+        self.retry_delay = retry_delay
+        self._heap = []
+        self._seeded = None
+        self._stopped = threading.Event()
+
+    def seed(self, now: datetime = None) -> None:
+        """Rebuild the heap from one get_list() sweep.
+        """
+        self._heap = [(self._renew_at(row['Expiration']), row['Domain'])
+                      for row in self.api.iter_list() if self.select(row)]
+        heapq.heapify(self._heap)
+        self._seeded = now or datetime.utcnow()
+
+    def next_wave(self) -> typing.Optional[datetime]:
+        """Return the UTC time when the next renewal window opens.
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def run_pending(self, now: datetime = None) -> typing.Dict[str, object]:
+        """Renew every domain whose renewal window is open.
+
+        Domains are re-checked with get_expiration_many() first, so one
+        that was renewed elsewhere is rescheduled instead of being
+        charged again.
+
+        Arguments:
+            now -- current UTC time (datetime.utcnow() by default).
+
+        Returns:
+            A dict mapping renewed domains to renew() results or errors.
+        """
+        now = now or datetime.utcnow()
+        if self._seeded is None or now - self._seeded >= self.reseed_interval:
+            self.seed(now)
+
+        if not self._heap or self._heap[0][0] > now:
+            return {}
+
+        cutoff = self._heap[0][0] + self.batch_window
+        wave = {}
+        while self._heap and self._heap[0][0] <= max(cutoff, now):
+            renew_at, domain = heapq.heappop(self._heap)
+            wave[domain] = renew_at
+
+        try:
+            for domain, expiration in self.api.get_expiration_many(
+                    list(wave)).items():
+                renew_at = self._renew_at(expiration)
+                if renew_at > wave[domain] + self.batch_window:
+                    del wave[domain]
+                    heapq.heappush(self._heap, (renew_at, domain))
+
+            results = self.api.renew_many(list(wave), self.years)
+        except Exception:
+            # Nothing was renewed: keep the wave for the next run.
+            for domain, renew_at in wave.items():
+                heapq.heappush(self._heap, (renew_at, domain))
+            raise
+
+        for domain, result in results.items():
+            if isinstance(result, dict):
+                heapq.heappush(self._heap, (
+                    self._renew_at(result['Expiration']), domain))
+            else:
+                heapq.heappush(self._heap, (now + self.retry_delay, domain))
+
+        if self.on_result is not None:
+            for domain, result in results.items():
+                self.on_result(domain, result)
+
+        return results
+
+    def run(self) -> None:
+        """Renew domains as their windows open until stop() is called.
+
+        Errors raised by a run are logged and the run is repeated after
+        retry_delay, backing off while they persist.
+        """
+        self._stopped.clear()
+        failures = 0
+        while not self._stopped.is_set():
+            try:
+                self.run_pending()
+            except Exception:
+                failures += 1
+                delay = min(self.retry_delay * 2 ** (failures - 1),
+                            self.reseed_interval)
+                logger.exception('Renewal run failed, retrying in %s',
+                                 delay)
+                self._stopped.wait(delay.total_seconds())
+                continue
+            failures = 0
+
+            now = datetime.utcnow()
+            wake = self._seeded + self.reseed_interval
+            if self._heap:
+                wake = min(wake, self._heap[0][0])
+            self._stopped.wait(max((wake - now).total_seconds(), 0))
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _renew_at(self, expiration: datetime) -> datetime:
+        offset = self.api._get_gmt_offset(
+            self.clock_sync_interval.total_seconds())
+        return expiration - timedelta(hours=offset) - self.renew_before
@@ -1,13 +1,25 @@
 """
 """
+import collections
 import re
+import threading
+import time
+import typing
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from datetime import datetime
 from urllib.parse import urlencode
-from urllib.request import urlopen, Request
-from xml.etree.ElementTree import fromstring
-from xml.etree.ElementTree import tostring
 from xml.etree.ElementTree import Element
+from namecheapapi.api.batch import Batch
+from namecheapapi.api.concurrency import Unlimited
 from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.parsers import get_parser
+from namecheapapi.api.query import QueryTemplate
+from namecheapapi.api.query import command_template
+from namecheapapi.api.transport import HTTPTransport
 
 
 URLS = {
@@ -17,17 +29,28 @@ URLS = {
 
 NAMESPACE = 'http://api.namecheap.com/xml.response'
 
+# Worker threads used by bulk helpers when no limiter is set.
+DEFAULT_WORKERS = 8
+
 
 class Session:
     """Session class.
 
     Defines the basic connection parameters and has several methods to
     process the information received via API.
+
+    A session can be shared by several threads: each thread talks to
+    the API over its own keep-alive connection, and the error/warning
+    logs and the cached GMT offset are updated under a lock.
     """
 
     def __init__(self, api_user: str, api_key: str, username: str,
                  client_ip: str, sandbox: bool = True,
-                 coupon: str = None) -> None:
+                 coupon: str = None, transport=None,
+                 limiter=None, parser: str = 'etree',
+                 warm_up: bool = False,
+                 decode_processes: int = None,
+                 hedger=None) -> None:
         """API initialization.
 
         Arguments:
@@ -40,6 +63,22 @@ class Session:
                 testing and False on production.
             coupon -- coupon code, if you wish to use one. None by
                 default.
+            transport -- object sending the queries, with a
+                request(query, post) method returning the response
+                bytes. A keep-alive HTTPTransport by default.
+            limiter -- optional concurrency.AdaptiveLimiter. Every API
+                call waits for one of its slots; bulk helpers run as
+                many worker threads as its maximum allows.
+            parser -- XML parser backend: 'etree' (default), 'lxml', or
+                'auto' to use lxml when it is installed (see
+                parsers.py).
+            warm_up -- setting to True calls warm_up() right away.
+            decode_processes -- number of worker processes decoding
+                large responses (getList pages), see decoding.py. By
+                default responses are decoded in the calling thread.
+            hedger -- optional concurrency.Hedger. Slow calls of the
+                read commands it lists get a duplicate request, and
+                the first reply is used.
 
         """
         self.api_user = api_user
@@ -51,6 +90,23 @@ class Session:
         self.warnings = []
         self.coupon = coupon
         self.gmt_offset = None
+        self._gmt_offset_synced = None
+        self.transport = transport or HTTPTransport(self.url)
+        self.limiter = limiter or Unlimited()
+        self.parser = get_parser(parser)
+        self.decode_processes = decode_processes
+        self.hedger = hedger
+        self._executor = None
+        self._hedge_executor = None
+        self._process_pool = None
+        self._worker = threading.local()
+        self._encoded_base_cache = None
+        self._lock = threading.Lock()
+        # key -> (Future, task running it in the background or None)
+        self._flights = {}
+
+        if warm_up:
+            self.warm_up()
 
     @property
     def _base_params(self) -> dict:
@@ -62,80 +118,430 @@ class Session:
             'ClientIp': self.client_ip,
         }
 
-    def _get_gmt_offset(self) -> None:
-        if not self.gmt_offset:
-            xml = fromstring(self.raw_query())
-            self.gmt_offset = int(re.findall(
-                r'-?\d+', xml.find(self._tag('GMTTimeDifference')).text)[0])
-        return self.gmt_offset
+    def _get_gmt_offset(self, max_age: float = None) -> int:
+        """Return the API server's offset from GMT, in hours.
 
-    def _form_query(self, command: str, query: dict) -> str:
+        Every API response carries the offset and _call() records it,
+        so a dedicated request is only sent when no response has been
+        seen yet, or the last one is older than max_age seconds.
+        """
+        with self._lock:
+            synced = self._gmt_offset_synced
+        if synced is None or (max_age is not None and
+                              time.monotonic() - synced > max_age):
+            self._single_flight('gmt_offset', self._sync_gmt_offset)
+        return self.gmt_offset
 
-        return urlencode({
-            **self._base_params,
-            "Command": command,
-            **query
-        })
+    def _sync_gmt_offset(self) -> None:
+        try:
+            # An empty command is answered with an error, but the
+            # response still carries GMTTimeDifference.
+            self.raw_query()
+        except NCApiError:
+            pass
+
+    def _record_gmt_offset(self, xml: Element) -> None:
+        difference = xml.find(self._tag('GMTTimeDifference'))
+        if difference is not None:
+            self._record_gmt_difference(difference.text)
+
+    def _record_gmt_difference(self, difference: str) -> None:
+        if not difference:
+            return
+        gmt_offset = int(re.findall(r'-?\d+', difference)[0])
+        with self._lock:
+            self.gmt_offset = gmt_offset
+            self._gmt_offset_synced = time.monotonic()
 
-    def _call(self, command: str, query: dict = {},
-              raw: bool = False, post: bool = False) -> Element:
+    @property
+    def _encoded_base(self) -> str:
+        """_base_params, urlencoded once per set of credentials.
+        """
+        params = self._base_params
+        key = tuple(params.values())
+        cached = self._encoded_base_cache
+        if cached is None or cached[0] != key:
+            cached = self._encoded_base_cache = (key, urlencode(params))
+        return cached[1]
+
+    def _form_query(self, command: typing.Union[str, QueryTemplate],
+                    query: dict) -> str:
+
+        if isinstance(command, str):
+            command = command_template(command)
+
+        return self._encoded_base + '&' + command.render(query)
+
+    def _call(self, command: typing.Union[str, QueryTemplate],
+              query: dict = None,
+              raw: bool = False, post: bool = False,
+              decode: typing.Callable[[bytes], dict] = None
+              ) -> typing.Union[Element, str, dict]:
         """Send GET or POST request with the API call
 
         Arguments:
-            command -- NC API command
+            command -- NC API command, or a query.QueryTemplate with
+                the command and pre-encoded constant parameters
             query -- key/value pairs for GET request
             raw -- used in raw_query method. Makes the method return a
                 raw XML string
             post -- setting to True sends a POST requests instead of GET
+            decode -- function decoding the response bytes instead of
+                the parser (a decoding.py function, possibly run in a
+                worker process by _decode()). Its result is checked
+                with _check_decoded() before the call gives up its
+                limiter slot, so errors count as throttling just like
+                parsed ones.
 
         Returns:
             raw=False -- ElementTree.Element object in CommandResponse
                 namespace
             raw=True -- full XML response string
+            decode -- what decode returned
 
         Raises:
             NCApiError if response Status equals to 'ERROR'.
         """
 
-        if post:
-            url = self.url
-            data = self._form_query(command, query).encode('ascii')
-            raw_xml = urlopen(Request(url, data)).read().decode('utf-8')
-        else:
-            url = self.url + self._form_query(command, query)
-            raw_xml = urlopen(url).read().decode('utf-8')
+        encoded_query = self._form_query(command, query or {})
+        url = self.url if post else self.url + encoded_query
 
-        xml = fromstring(raw_xml)
+        with self.limiter.slot():
+            if self.hedger is not None and not post:
+                raw_xml = self._hedged_request(
+                    getattr(command, 'command', command), encoded_query)
+            else:
+                raw_xml = self.transport.request(encoded_query, post)
+            if decode is not None:
+                decoded = decode(raw_xml)
+                self._check_decoded(raw_xml, decoded, command, query)
+                return decoded
 
-        if xml.get('Status') == 'ERROR':
-            self._log_error(xml, url)
-            error_message = ', '.join(
-                ["Error {}: '{}'".format(item['Number'], item['Text'])
-                 for item in self.errors[-1]['Errors']])
-            raise NCApiError(error_message)
+            xml = self.parser.fromstring(raw_xml)
+            self._record_gmt_offset(xml)
+
+            if xml.get('Status') == 'ERROR':
+                self._raise_error(xml, url)
 
         if xml.find(self._tag('Warnings')).findall(self._tag('Warning')):
             self._log_warning(xml, url)
 
         if raw:
-            return raw_xml
+            return raw_xml.decode('utf-8')
 
         return xml.find(self._tag('CommandResponse'))
 
+    def _check_decoded(self, raw_xml: bytes, decoded: dict,
+                       command: typing.Union[str, QueryTemplate],
+                       query: dict = None) -> None:
+        """Finish a _call(decode=...): record the GMT offset, then
+        raise and log errors and log warnings the same way _call()
+        does.
+
+        Arguments:
+            raw_xml -- the response bytes.
+            decoded -- what the decoding.py function returned for them:
+                a dict with 'GMTTimeDifference', 'Errors' and
+                'Warnings'.
+            command, query -- the call's command and query.
+        """
+        self._record_gmt_difference(decoded['GMTTimeDifference'])
+        if not decoded['Errors'] and not decoded['Warnings']:
+            return
+
+        # Rare: parse the response here for the error/warning log.
+        xml = self.parser.fromstring(raw_xml)
+        url = self.url + self._form_query(command, query or {})
+        if xml.get('Status') == 'ERROR':
+            self._raise_error(xml, url)
+        self._log_warning(xml, url)
+
+    def _raise_error(self, xml: Element, url: str) -> None:
+        error = self._log_error(xml, url)
+        error_message = ', '.join(
+            ["Error {}: '{}'".format(item['Number'], item['Text'])
+             for item in error['Errors']])
+        raise NCApiError(error_message, error['Errors'])
+
+    def _hedged_request(self, command: str, encoded_query: str) -> bytes:
+        """Send a GET query; if it is slow, send it once more and
+        return the first reply.
+
+        Both requests run on the hedging threads, each over its own
+        connection. The loser is cancelled if it has not been sent yet;
+        a request already on the wire cannot be aborted without closing
+        its keep-alive connection, so its reply is just discarded.
+        """
+        if command.lower() not in self.hedger.commands:
+            return self.transport.request(encoded_query)
+
+        start = time.monotonic()
+        delay = self.hedger.delay(command)
+        if delay is None:
+            raw_xml = self.transport.request(encoded_query)
+            self.hedger.record(command, time.monotonic() - start)
+            return raw_xml
+
+        executor = self._get_hedge_executor()
+
+        def request() -> bytes:
+            return self.transport.request(encoded_query)
+
+        def record(future: Future) -> None:
+            if not future.cancelled() and future.exception() is None:
+                self.hedger.record(command, time.monotonic() - start)
+
+        primary = executor.submit(request)
+        primary.add_done_callback(record)
+        if not wait([primary], timeout=delay).done and self.hedger.spend():
+            hedge = executor.submit(request)
+            done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+            first = hedge if primary not in done else primary
+            second = primary if first is hedge else hedge
+            if first.exception() is None:
+                second.cancel()
+                if first is hedge:
+                    self.hedger.hedge_won()
+                return first.result()
+            # The first reply is a failure: use the other one if it
+            # succeeds, else raise the original request's error.
+            if second.exception() is None:
+                if second is hedge:
+                    self.hedger.hedge_won()
+                return second.result()
+        return primary.result()
+
+    def _map(self, function: typing.Callable, items: typing.Iterable,
+             return_exceptions: bool = False) -> list:
+        """Call function for every item concurrently.
+
+        Runs on the session's worker threads; the limiter decides how
+        many of the resulting API calls are actually in flight.
+
+        Arguments:
+            function -- callable taking one item.
+            items -- iterable with items.
+            return_exceptions -- setting to True puts exceptions raised
+                by function into the result list instead of raising the
+                first one.
+
+        Returns:
+            A list with the results, in the order of items.
+        """
+        items = list(items)
+        if len(items) < 2 or getattr(self._worker, 'active', False):
+            return [self._run(function, item, return_exceptions)
+                    for item in items]
+
+        futures = [self._get_executor().submit(
+            self._work, function, item, return_exceptions) for item in items]
+        return [future.result() for future in futures]
+
+    def _prefetch(self, function: typing.Callable,
+                  items: typing.Iterable,
+                  window: typing.Callable[[], int] = None) -> typing.Iterator:
+        """Lazily map function over items, running a few calls ahead.
+
+        Like _map(), but results are yielded in order as soon as they
+        are ready and at most as many calls as there are worker threads
+        are started before their results are consumed. Closing the
+        iterator cancels the calls that have not started yet.
+
+        Arguments:
+            window -- optional function returning how many calls may be
+                started ahead of the consumer (at least 1), asked again
+                after every result; for consumers that know they will
+                stop early. Never more than the worker threads.
+        """
+        items = iter(items)
+        if getattr(self._worker, 'active', False):
+            yield from map(function, items)
+            return
+
+        workers = int(self.limiter.maximum or DEFAULT_WORKERS)
+
+        def ahead() -> int:
+            if window is None:
+                return workers
+            return max(1, min(workers, window()))
+
+        pending = collections.deque()
+        try:
+            for item in items:
+                pending.append(self._get_executor().submit(
+                    self._work, function, item, False))
+                while pending and len(pending) >= ahead():
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _work(self, function: typing.Callable, item: typing.Any,
+              return_exceptions: bool) -> typing.Any:
+        # Bulk helpers nested in a worker run inline, so a busy pool
+        # never waits for itself.
+        self._worker.active = True
+        return self._run(function, item, return_exceptions)
+
+    def _run(self, function: typing.Callable, item: typing.Any,
+             return_exceptions: bool) -> typing.Any:
+        try:
+            return function(item)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+
+    def warm_up(self, connections: int = None) -> Future:
+        """Prepare the session for its first calls, in the background.
+
+        Opens connections ahead of time and fetches the server's clock
+        offset (and, for DomainAPI, the TLD list), all concurrently on
+        the worker threads. Calls made in the meantime wait for the step
+        they depend on instead of repeating it. A step that fails is
+        done again by the first call that needs it.
+
+        Arguments:
+            connections -- how many connections to open. Defaults to
+                the limiter's current limit, or DEFAULT_WORKERS.
+
+        Returns:
+            A concurrent.futures.Future done when every step finished.
+        """
+        if connections is None:
+            connections = int(getattr(self.limiter, 'limit', None) or
+                              DEFAULT_WORKERS)
+        prepare = getattr(self.transport, 'prepare', None)
+
+        # Steps first: their own connections open meanwhile.
+        tasks = [self._single_flight(key, function, background=True)
+                 for key, function in self._warm_up_steps()]
+        if prepare is not None:
+            tasks += [self._get_executor().submit(prepare)
+                      for _ in range(connections)]
+
+        done = Future()
+        remaining = [len(tasks)]
+
+        def finished(task: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                last = not remaining[0]
+            if last:
+                done.set_result(None)
+
+        for task in tasks:
+            task.add_done_callback(finished)
+        if not tasks:
+            done.set_result(None)
+
+        return done
+
+    def _warm_up_steps(self) -> typing.List[tuple]:
+        """(single-flight key, function) pairs run by warm_up().
+        """
+        return [('gmt_offset', self._sync_gmt_offset)]
+
+    def _single_flight(self, key: str, function: typing.Callable,
+                       background: bool = False) -> typing.Any:
+        """Call function, unless a call made for the same key is in
+        progress: then wait for that one and return its result.
+
+        Arguments:
+            key -- what the call computes.
+            function -- callable without arguments.
+            background -- setting to True runs the call on a worker
+                thread and returns its Future right away.
+        """
+        executor = self._get_executor() if background else None
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                future = Future()
+                task = (executor.submit(self._fly, key, future, function)
+                        if background else None)
+                self._flights[key] = (future, task)
+
+        if flight is None:
+            return future if background else self._fly(key, future,
+                                                       function)
+
+        future, task = flight
+        if background:
+            return future
+        if task is not None and task.cancel():
+            # Not started yet: run it here rather than have a worker
+            # wait for a call queued behind it.
+            return self._fly(key, future, function)
+        try:
+            return future.result()
+        except Exception:
+            return function()
+
+    def _fly(self, key: str, future: Future,
+             function: typing.Callable) -> typing.Any:
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+
+    def _decode(self, function: typing.Callable, data: bytes,
+                *args) -> typing.Any:
+        """Call a decoding.py function on response bytes, in a worker
+        process if the session has decode_processes.
+        """
+        if not self.decode_processes:
+            return function(data, *args)
+        if self._process_pool is None:
+            with self._lock:
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.decode_processes)
+        return self._process_pool.submit(function, data, *args).result()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=int(self.limiter.maximum or
+                                        DEFAULT_WORKERS))
+        return self._executor
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        # Separate from the bulk helpers' pool, so a hedged call made on
+        # a worker thread never waits for a worker.
+        if self._hedge_executor is None:
+            with self._lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=2 * int(self.limiter.maximum or
+                                            DEFAULT_WORKERS))
+        return self._hedge_executor
+
     def _tag(self, tag: str) -> str:
         """Create tag to navigate through ElementTree.Element object.
         """
         return '{{{}}}{}'.format(NAMESPACE, tag)
 
-    def _log_error(self, xml: Element, url: str) -> None:
+    def _log_error(self, xml: Element, url: str) -> dict:
         """Log an API error.
 
-        Adds errors to session.errors list.
+        Adds errors to session.errors list and returns the entry.
         """
 
         data = {
             'URL': url,
-            'XML': tostring(xml, encoding='unicode'),
+            'XML': self.parser.tostring(xml),
             'Time': datetime.now(),
             'Errors': [],
         }
@@ -155,7 +561,10 @@ class Session:
         exectime = xml.find(self._tag('ExecutionTime'))
         data['ExecutionTime'] = float(exectime.text)
 
-        self.errors.append(data)
+        with self._lock:
+            self.errors.append(data)
+
+        return data
 
     def _log_warning(self, xml: Element, url: str) -> None:
         """Log an API warning.
@@ -165,7 +574,7 @@ class Session:
 
         data = {
             'URL': url,
-            'XML': tostring(xml, encoding='unicode'),
+            'XML': self.parser.tostring(xml),
             'Time': datetime.now(),
             'Warnings': []
         }
@@ -186,9 +595,26 @@ class Session:
         exectime = xml.find(self._tag('ExecutionTime'))
         data['ExecutionTime'] = float(exectime.text)
 
-        self.warnings.append(data)
+        with self._lock:
+            self.warnings.append(data)
+
+    def batch(self, concurrency: int = None) -> Batch:
+        """Queue calls of the session's methods to run together.
 
-    def raw_query(self, command: str = '', query: dict = {}) -> str:
+        Use as a context manager: calls made on the batch return
+        Futures right away and are sent when the with block exits,
+        identical read calls only once and higher priorities first (see
+        batch.py).
+
+        Arguments:
+            concurrency -- most calls in flight at once. Defaults to
+                the limiter's maximum, or DEFAULT_WORKERS; the limiter
+                still applies.
+        """
+        return Batch(self, concurrency or int(self.limiter.maximum or
+                                              DEFAULT_WORKERS))
+
+    def raw_query(self, command: str = '', query: dict = None) -> str:
         """Create a custom query.
 
         Base parameters (API key, API user, etc.) are included by
@@ -203,3 +629,23 @@ class Session:
             raw XML string.
         """
         return self._call(command, query, raw=True)
+
+    def close(self) -> None:
+        """Stop the worker threads and close the connections opened by
+        the session.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown()
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+        close = getattr(self.transport, 'close', None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> 'Session':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
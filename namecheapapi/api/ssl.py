@@ -1,4 +1,15 @@
+import bisect
+import collections
+import typing
+from datetime import datetime
+from datetime import timedelta
+from math import ceil
+from xml.etree.ElementTree import Element
+
 from namecheapapi.api.session import Session
+from namecheapapi.api.commands import *
+
+SSL_LIST_PAGE_SIZE = 100
 
 
 class SslAPI:
@@ -9,8 +20,59 @@ class SslAPI:
     def activate(self):
         pass
 
-    def get_info(self):
-        pass
+    def get_info(self, certificate_id: int) -> dict:
+        """Get information about an SSL certificate.
+
+        https://www.namecheap.com/support/api/methods/ssl/get-info.aspx
+
+        Arguments:
+            certificate_id -- certificate ID
+
+        Returns:
+            A dict with certificate information.
+        """
+        session = self.session
+        xml = session._call(SSL_GET_INFO, {
+            'CertificateID': certificate_id
+        }).find(session._tag('SSLGetInfoResult'))
+
+        details = xml.find(session._tag('CertificateDetails'))
+        provider = xml.find(session._tag('Provider'))
+
+        def text(parent: Element, tag: str) -> typing.Optional[str]:
+            if parent is None:
+                return None
+            element = parent.find(session._tag(tag))
+            return element.text if element is not None else None
+
+        return {
+            'ID': int(certificate_id),
+            'Status': xml.get('Status'),
+            'Status description': xml.get('StatusDescription'),
+            'Type': xml.get('Type'),
+            'Issued': self._parse_date(xml.get('IssuedOn')),
+            'Expiration': self._parse_date(xml.get('Expires')),
+            'Activation expiration':
+                self._parse_date(xml.get('ActivationExpireDate')),
+            'OrderID': xml.get('OrderId'),
+            'Replaced by': xml.get('ReplacedBy') or None,
+            'SANs count': int(xml.get('SANSCount') or 0),
+            'Common name': text(details, 'CommonName'),
+            'Approver email': text(details, 'ApproverEmail'),
+            'Provider': text(provider, 'Name'),
+            'Provider order ID': text(provider, 'OrderID'),
+        }
+
+    def get_info_many(self, certificate_ids: typing.Iterable[int]) -> dict:
+        """Get information about many SSL certificates concurrently.
+
+        Returns:
+            A dict mapping every certificate ID to what get_info()
+            returned for it, or to the NCApiError raised by it.
+        """
+        certificate_ids = list(certificate_ids)
+        return dict(zip(certificate_ids, self.session._map(
+            self.get_info, certificate_ids, return_exceptions=True)))
 
     def parse_csr(self):
         pass
@@ -18,8 +80,62 @@ class SslAPI:
     def get_approver_email_list(self):
         pass
 
-    def get_list(self):
-        pass
+    def get_list(self, list_type: str = 'ALL',
+                 search_term: str = None) -> typing.List[dict]:
+        """Get the list of SSL certificates.
+
+        https://www.namecheap.com/support/api/methods/ssl/get-list.aspx
+
+        Arguments:
+            list_type -- possible values: 'ALL', 'Processing',
+                'EmailSent', 'TechnicalProblem', 'InProgress',
+                'Completed', 'Deactivated', 'Active', 'Cancelled',
+                'NewPurchase', 'NewRenewal'
+            search_term -- keyword to look for in the certificate list.
+
+        Returns:
+            A list containing dicts with certificate information.
+        """
+        return list(self.iter_list(list_type, search_term))
+
+    def iter_list(self, list_type: str = 'ALL',
+                  search_term: str = None) -> typing.Iterator[dict]:
+        """Iterate over the list of SSL certificates.
+
+        Same as get_list(), but certificates are yielded as their page
+        arrives. The first page tells the total number of certificates;
+        the remaining pages are fetched concurrently.
+        """
+        session = self.session
+
+        def fetch(page: int) -> Element:
+            query = {
+                'ListType': list_type,
+                'Page': page,
+                'PageSize': SSL_LIST_PAGE_SIZE
+            }
+            if search_term:
+                query['SearchTerm'] = search_term
+
+            return session._call(SSL_GET_LIST, query)
+
+        def parse(xml: Element) -> list:
+            return [self._parse_list_certificate(certificate)
+                    for certificate in xml.find(session._tag(
+                        'SSLListResult')).findall(session._tag('SSL'))]
+
+        xml = fetch(1)
+        total = int(xml.find(session._tag('Paging')).find(
+            session._tag('TotalItems')).text)
+        yield from parse(xml)
+
+        pages = session._prefetch(
+            fetch, range(2, ceil(total / SSL_LIST_PAGE_SIZE) + 1))
+        try:
+            for xml in pages:
+                yield from parse(xml)
+        finally:
+            pages.close()
 
     def purchase(self):
         pass
@@ -41,3 +157,133 @@ class SslAPI:
 
     def revoke(self):
         pass
+
+    def _parse_list_certificate(self, certificate: Element) -> dict:
+
+        return {
+            'ID': int(certificate.get('CertificateID')),
+            'Host': certificate.get('HostName') or None,
+            'Type': certificate.get('SSLType'),
+            'Purchase': self._parse_date(certificate.get('PurchaseDate')),
+            'Expiration': self._parse_date(certificate.get('ExpireDate')),
+            'Activation expiration':
+                self._parse_date(certificate.get('ActivationExpireDate')),
+            'Expired': certificate.get('IsExpiredYN', '').lower() == 'true',
+            'Status': certificate.get('Status'),
+            'Years': int(certificate.get('Years') or 0),
+        }
+
+    def _parse_date(self, value: str) -> typing.Optional[datetime]:
+        return datetime.strptime(value, '%m/%d/%Y') if value else None
+
+
+class SslInventory:
+    """Local certificate inventory indexed by expiration, status and host.
+
+    refresh() sweeps the certificate list and fetches details with
+    getInfo only for certificates that are new or whose list entry
+    changed since the previous sweep. Queries are answered locally.
+
+    Example:
+        inventory = SslInventory(SslAPI(api))
+        inventory.refresh()
+        inventory.expiring(timedelta(days=14))
+    """
+
+    def __init__(self, api: SslAPI, fetch_info: bool = True) -> None:
+        """Inventory initialization.
+
+        Arguments:
+            api -- SslAPI instance.
+            fetch_info -- setting to False keeps list entries only and
+                skips the getInfo calls.
+        """
+        self.api = api
+        self.fetch_info = fetch_info
+        # certificate ID -> {**list entry, 'Info': get_info() result}
+        self.certificates = {}
+        self._by_expiration = []
+        self._by_status = collections.defaultdict(set)
+        self._by_host = collections.defaultdict(set)
+
+    def refresh(self) -> typing.Dict[str, list]:
+        """Sync the inventory with the certificate list.
+
+        Certificates whose getInfo call failed last time count as
+        changed, so their details are fetched again.
+
+        Returns:
+            A dict with lists of 'Added', 'Changed' and 'Removed'
+            certificate IDs.
+        """
+        entries = {entry['ID']: entry for entry in self.api.iter_list()}
+
+        added = [cid for cid in entries if cid not in self.certificates]
+        changed = [cid for cid in entries if cid in self.certificates and (
+                   self._list_entry(self.certificates[cid]) != entries[cid]
+                   or self._missing_info(self.certificates[cid]))]
+        removed = [cid for cid in self.certificates if cid not in entries]
+
+        info = {}
+        if self.fetch_info:
+            info = self.api.get_info_many(added + changed)
+
+        for cid in removed + changed:
+            self._unindex(self.certificates.pop(cid))
+        for cid in added + changed:
+            certificate = dict(entries[cid])
+            certificate['Info'] = info.get(cid)
+            self.certificates[cid] = certificate
+            self._index(certificate)
+
+        return {'Added': added, 'Changed': changed, 'Removed': removed}
+
+    def expiring(self, within: timedelta,
+                 now: datetime = None) -> typing.List[dict]:
+        """Return certificates expiring within the given period, soonest
+        first. Already expired certificates are not included.
+        """
+        now = now or datetime.now()
+        start = bisect.bisect_left(self._by_expiration, (now, ))
+        end = bisect.bisect_right(self._by_expiration,
+                                  (now + within, float('inf')))
+        return [self.certificates[cid]
+                for _, cid in self._by_expiration[start:end]]
+
+    def by_status(self, status: str) -> typing.List[dict]:
+        return [self.certificates[cid]
+                for cid in sorted(self._by_status.get(status.lower(), ()))]
+
+    def by_host(self, host: str) -> typing.List[dict]:
+        return [self.certificates[cid]
+                for cid in sorted(self._by_host.get(host.lower(), ()))]
+
+    def _missing_info(self, certificate: dict) -> bool:
+        info = certificate['Info']
+        return isinstance(info, Exception) or (self.fetch_info and
+                                               info is None)
+
+    def _list_entry(self, certificate: dict) -> dict:
+        return {key: value for key, value in certificate.items()
+                if key != 'Info'}
+
+    def _index(self, certificate: dict) -> None:
+        if certificate['Expiration'] is not None:
+            bisect.insort(self._by_expiration,
+                          (certificate['Expiration'], certificate['ID']))
+        self._by_status[(certificate['Status'] or '').lower()].add(
+            certificate['ID'])
+        if certificate['Host']:
+            self._by_host[certificate['Host'].lower()].add(certificate['ID'])
+
+    def _unindex(self, certificate: dict) -> None:
+        if certificate['Expiration'] is not None:
+            key = (certificate['Expiration'], certificate['ID'])
+            index = bisect.bisect_left(self._by_expiration, key)
+            if self._by_expiration[index:index + 1] == [key]:
+                del self._by_expiration[index]
+        self._by_status[(certificate['Status'] or '').lower()].discard(
+            certificate['ID'])
+        if certificate['Host']:
+            self._by_host[certificate['Host'].lower()].discard(
+                certificate['ID'])
@@ -0,0 +1,243 @@
+"""Tracking of inbound domain transfers.
+
+TransferTracker follows transfers until they complete or fail. Changes
+are found with sweeps of the in-progress transfer list rather than one
+getStatus call per transfer; getStatus is only sent for the few
+transfers that are due between sweeps, and for transfers that left the
+in-progress list, to learn how they ended.
+"""
+import collections
+import logging
+import threading
+import typing
+from datetime import datetime
+from datetime import timedelta
+from math import ceil
+
+from namecheapapi.api.domains import TRANSFER_LIST_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Transfer statuses that end tracking.
+COMPLETED_STATUSES = {'COMPLETED'}
+FAILED_STATUSES = {'CANCELLED', 'FAILED'}
+
+
+TransferEvent = collections.namedtuple(
+    'TransferEvent', ['transfer', 'domain', 'old', 'new'])
+
+
+class TransferChanged(TransferEvent):
+    """A transfer moved to another in-progress status."""
+    __slots__ = ()
+
+
+class TransferCompleted(TransferEvent):
+    """A transfer completed (new is the final status)."""
+    __slots__ = ()
+
+
+class TransferFailed(TransferEvent):
+    """A transfer was cancelled or failed (new is the final status)."""
+    __slots__ = ()
+
+
+class TransferTracker:
+    """Poll transfers and publish their status changes.
+
+    Every transfer has its own polling interval. It starts at
+    min_interval whenever the status changes and doubles with every
+    poll that finds the same status, up to max_interval, so transfers
+    that just moved are watched closely and transfers waiting for days
+    (e.g. for the losing registrar) cost almost nothing. intervals can
+    pin the interval of specific statuses instead.
+
+    All in-progress transfers of the account are tracked; track() adds
+    others, e.g. transfers just created.
+
+    Example:
+        tracker = TransferTracker(api)
+        tracker.subscribe(print, TransferCompleted, TransferFailed)
+        tracker.watch()
+    """
+
+    def __init__(self, api,
+                 min_interval: timedelta = timedelta(minutes=15),
+                 max_interval: timedelta = timedelta(hours=12),
+                 intervals: typing.Dict[str, timedelta] = None,
+                 sweep_interval: timedelta = timedelta(hours=6),
+                 retry_delay: timedelta = timedelta(minutes=5)) -> None:
+        """Tracker initialization.
+
+        Arguments:
+            api -- DomainAPI instance.
+            min_interval -- polling interval right after a change.
+            max_interval -- longest polling interval.
+            intervals -- fixed polling intervals by transfer status.
+            sweep_interval -- maximum time between in-progress list
+                sweeps, which pick up transfers started elsewhere.
+            retry_delay -- how long watch() waits after a failed
+                poll before it polls again.
+        """
+        self.api = api
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.intervals = {status.upper(): interval for status, interval
+                          in (intervals or {}).items()}
+        self.sweep_interval = sweep_interval
+        self.retry_delay = retry_delay
+        # transfer ID -> {'ID', 'Domain', 'Status', 'StatusID'}
+        self.transfers = {}
+        self._due = {}
+        self._interval = {}
+        self._last_sweep = None
+        self._subscribers = []
+        self._stopped = threading.Event()
+
+    def track(self, transfer_id: int, domain: str = None) -> None:
+        """Start tracking a transfer; it is polled on the next poll().
+        """
+        self.transfers.setdefault(transfer_id, {
+            'ID': transfer_id, 'Domain': domain, 'Status': None,
+            'StatusID': None})
+        self._due[transfer_id] = datetime.min
+
+    def subscribe(self, callback: typing.Callable, *kinds: type) -> None:
+        """Register a callback for transfer events.
+
+        Arguments:
+            callback -- called with every matching event. Exceptions it
+                raises are logged; the tracked state already holds the
+                change, so the event is not sent again.
+            kinds -- event classes to subscribe to. All events are
+                sent if none are given.
+        """
+        self._subscribers.append((callback, kinds or (TransferEvent, )))
+
+    def poll(self, now: datetime = None) -> typing.List[TransferEvent]:
+        """Check the transfers that are due and publish the changes.
+
+        Arguments:
+            now -- current time (datetime.now() by default).
+
+        Returns:
+            A list with the published events.
+        """
+        now = now or datetime.now()
+        due = [transfer for transfer, when in self._due.items()
+               if when <= now]
+        # The very first sweep only establishes the tracked set.
+        initial = self._last_sweep is None
+
+        if (initial or now - self._last_sweep >= self.sweep_interval or
+                len(due) > ceil(len(self.transfers) /
+                                TRANSFER_LIST_PAGE_SIZE)):
+            statuses = {row['ID']: row for row in
+                        self.api.iter_transfer_list('INPROGRESS')}
+            # Transfers gone from the in-progress list have ended.
+            ended = [transfer for transfer in self.transfers
+                     if transfer not in statuses]
+            statuses.update(self._get_statuses(ended))
+            self._last_sweep = now
+        else:
+            statuses = self._get_statuses(due)
+
+        events = []
+        for transfer, status in statuses.items():
+            event = self._update(transfer, status, now, initial)
+            if event is not None:
+                events.append(event)
+
+        for event in events:
+            for callback, kinds in self._subscribers:
+                if isinstance(event, kinds):
+                    try:
+                        callback(event)
+                    except Exception:
+                        logger.exception('Subscriber %r failed on %r',
+                                         callback, event)
+
+        return events
+
+    def next_poll(self, now: datetime = None) -> datetime:
+        """Return the time when the next transfer becomes due.
+        """
+        now = now or datetime.now()
+        if self._last_sweep is None:
+            return now
+        return min([self._last_sweep + self.sweep_interval] +
+                   list(self._due.values()))
+
+    def watch(self) -> None:
+        """Poll until stop() is called, sleeping between due times.
+
+        A failed poll is logged and retried after retry_delay.
+        """
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception('Transfer poll failed, retrying in %s',
+                                 self.retry_delay)
+                self._stopped.wait(self.retry_delay.total_seconds())
+                continue
+            delay = (self.next_poll() - datetime.now()).total_seconds()
+            self._stopped.wait(max(delay, 0))
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _get_statuses(self, transfers: typing.List[int]) -> dict:
+        """getStatus for transfers; those whose call failed are left
+        out and retried when they are due again.
+        """
+        results = self.api._map(self.api.get_transfer_status, transfers,
+                                return_exceptions=True)
+        return {transfer: result for transfer, result
+                in zip(transfers, results)
+                if not isinstance(result, Exception)}
+
+    def _update(self, transfer: int, status: dict, now: datetime,
+                initial: bool) -> typing.Optional[TransferEvent]:
+        known = self.transfers.get(transfer)
+        old = known['Status'] if known else None
+        new = status['Status']
+        domain = status.get('Domain') or (known and known['Domain'])
+
+        self.transfers[transfer] = {
+            'ID': transfer, 'Domain': domain, 'Status': new,
+            'StatusID': status['StatusID']}
+
+        kind = None
+        if (new or '').upper() in COMPLETED_STATUSES:
+            kind = TransferCompleted
+        elif (new or '').upper() in FAILED_STATUSES:
+            kind = TransferFailed
+        elif old is not None and old != new:
+            kind = TransferChanged
+        elif old is None and known is None and not initial:
+            kind = TransferChanged
+
+        if kind in (TransferCompleted, TransferFailed):
+            del self.transfers[transfer]
+            self._due.pop(transfer, None)
+            self._interval.pop(transfer, None)
+        else:
+            self._schedule(transfer, old != new, now)
+
+        return kind(transfer, domain, old, new) if kind else None
+
+    def _schedule(self, transfer: int, changed: bool, now: datetime) -> None:
+        if not changed and self._due.get(transfer, now) > now:
+            # Seen in a sweep before it was due: keep its schedule.
+            return
+        status = (self.transfers[transfer]['Status'] or '').upper()
+        if status in self.intervals:
+            interval = self.intervals[status]
+        elif changed or transfer not in self._interval:
+            interval = self.min_interval
+        else:
+            interval = min(self._interval[transfer] * 2, self.max_interval)
+        self._interval[transfer] = interval
+        self._due[transfer] = now + interval
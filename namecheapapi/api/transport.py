@@ -0,0 +1,238 @@
+"""Transports sending API queries over the network.
+"""
+import base64
+import collections
+import threading
+import weakref
+from http.client import HTTP_PORT
+from http.client import HTTPS_PORT
+from http.client import HTTPSConnection
+from http.client import RemoteDisconnected
+from urllib.error import HTTPError
+from urllib.parse import parse_qsl
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+from urllib.request import getproxies
+from urllib.request import proxy_bypass
+
+from namecheapapi.api.commands import READ_COMMANDS
+
+# Lowercase, since the API does not care about the case of commands.
+_READ_COMMANDS = {command.lower() for command in READ_COMMANDS}
+
+
+class HTTPTransport:
+    """Keep-alive HTTPS transport.
+
+    Every thread gets its own persistent connection, so one transport
+    (and the Session that owns it) can be shared by a thread pool
+    without locking around requests. Connections are opened lazily and
+    reopened transparently when the server drops an idle one.
+
+    prepare() opens connections ahead of time: a thread that needs a
+    connection takes a prepared one, or waits for one that is being
+    opened, instead of paying for DNS resolution and the TLS handshake
+    itself. When a thread ends, its connection is handed on the same
+    way, so threads started per task do not pile up open connections.
+
+    Like urlopen(), the transport honours the HTTPS proxy set in the
+    environment (HTTPS_PROXY, NO_PROXY) and tunnels through it.
+    """
+
+    def __init__(self, url: str, timeout: float = 60) -> None:
+        """Transport initialization.
+
+        Arguments:
+            url -- API endpoint URL (see session.URLS).
+            timeout -- socket timeout in seconds.
+        """
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.netloc
+        self.path = parts.path
+        self.timeout = timeout
+        self.proxy = None
+        proxy = getproxies().get('https')
+        if proxy and not proxy_bypass(parts.hostname):
+            self.proxy = urlsplit(proxy if '//' in proxy
+                                  else '//' + proxy)
+        self._local = threading.local()
+        self._connections = set()
+        self._lock = threading.Lock()
+        self._idle = collections.deque()
+        self._opening = 0
+        self._idle_ready = threading.Condition(self._lock)
+
+    def request(self, query: str, post: bool = False) -> bytes:
+        """Send an urlencoded query and return the response body.
+
+        Arguments:
+            query -- urlencoded query string.
+            post -- setting to True sends a POST request instead of GET.
+
+        Raises:
+            urllib.error.HTTPError if the HTTP status is 400 or above.
+        """
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = self._connect()
+            # Prepared connections are open before their first request,
+            # and may have been dropped while idle just the same.
+            reused = connection.sock is not None
+
+            sent = False
+            try:
+                self._send(connection, query, post)
+                sent = True
+                response = connection.getresponse()
+            except (RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError):
+                self._discard(connection)
+                # A kept-alive connection was closed by the server while
+                # idle. If that surfaced before the request was written,
+                # it never reached the server; otherwise the server may
+                # have processed it, so only reads are sent again.
+                if (reused and not attempt and
+                        (not sent or self._is_read(query, post))):
+                    continue
+                raise
+            except Exception:
+                self._discard(connection)
+                raise
+            break
+
+        try:
+            body = response.read()
+        except Exception:
+            self._discard(connection)
+            raise
+
+        if response.status >= 400:
+            raise HTTPError(self.url, response.status, response.reason,
+                            response.headers, None)
+
+        return body
+
+    def connect(self) -> None:
+        """Open the current thread's connection ahead of the first call.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._connect()
+        if connection.sock is None:
+            connection.connect()
+
+    def prepare(self) -> None:
+        """Open a connection for the next thread that needs one.
+
+        Errors are not raised: the thread then opens its own connection.
+        """
+        with self._lock:
+            self._opening += 1
+        connection = self._new_connection()
+        try:
+            connection.connect()
+        except OSError:
+            connection = None
+        finally:
+            with self._lock:
+                self._opening -= 1
+                if connection is not None:
+                    self._idle.append(connection)
+                    self._connections.add(connection)
+                self._idle_ready.notify()
+
+    def close(self) -> None:
+        """Close the connections of all threads.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, set()
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def _send(self, connection: HTTPSConnection, query: str,
+              post: bool) -> None:
+        if post:
+            connection.request('POST', self.path, query.encode('ascii'), {
+                'Content-Type': 'application/x-www-form-urlencoded'})
+        else:
+            connection.request('GET', '{}?{}'.format(self.path, query))
+
+    def _is_read(self, query: str, post: bool) -> bool:
+        if post:
+            return False
+        command = dict(parse_qsl(query)).get('Command', '')
+        return command.lower() in _READ_COMMANDS
+
+    def _new_connection(self) -> HTTPSConnection:
+        if self.proxy is None:
+            return HTTPSConnection(self.host, timeout=self.timeout)
+
+        # Like urllib: the port defaults to the one of the proxy URL's
+        # scheme.
+        port = self.proxy.port or (HTTP_PORT if self.proxy.scheme == 'http'
+                                   else HTTPS_PORT)
+        connection = HTTPSConnection(self.proxy.hostname, port,
+                                     timeout=self.timeout)
+        headers = {}
+        if self.proxy.username:
+            credentials = '{}:{}'.format(unquote(self.proxy.username),
+                                         unquote(self.proxy.password or ''))
+            headers['Proxy-Authorization'] = 'Basic {}'.format(
+                base64.b64encode(credentials.encode('utf-8')).decode('ascii'))
+        connection.set_tunnel(self.host, headers=headers)
+        return connection
+
+    def _connect(self) -> HTTPSConnection:
+        with self._lock:
+            while not self._idle and self._opening:
+                self._idle_ready.wait()
+            connection = self._idle.popleft() if self._idle else None
+            if connection is None:
+                connection = self._new_connection()
+                self._connections.add(connection)
+        self._local.connection = connection
+        # The owner only lives in the thread's local storage, which is
+        # freed when the thread ends.
+        self._local.owner = owner = _Owner()
+        self._local.reclaim = weakref.finalize(
+            owner, _reclaim, weakref.ref(self), connection)
+        self._local.reclaim.atexit = False
+        return connection
+
+    def _discard(self, connection: HTTPSConnection) -> None:
+        connection.close()
+        self._local.connection = None
+        self._local.reclaim.detach()
+        with self._lock:
+            self._connections.discard(connection)
+
+    def _reclaim(self, connection: HTTPSConnection) -> None:
+        """Take back the connection of a thread that ended: keep it
+        for the next thread if it is open, else forget it.
+        """
+        with self._lock:
+            if connection not in self._connections:
+                # Closed by close() in the meantime.
+                return
+            if connection.sock is not None:
+                self._idle.append(connection)
+                self._idle_ready.notify()
+                return
+            self._connections.discard(connection)
+        connection.close()
+
+
+class _Owner:
+    """Stands for a thread holding a connection; see _connect().
+    """
+
+
+def _reclaim(transport: weakref.ref, connection: HTTPSConnection) -> None:
+    transport = transport()
+    if transport is None:
+        connection.close()
+    else:
+        transport._reclaim(connection)
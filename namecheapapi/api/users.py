@@ -1,4 +1,19 @@
+import typing
+
 from namecheapapi.api.session import Session
+from namecheapapi.api.commands import *
+
+
+def total_price(price: dict, years: int) -> float:
+    """Total cost of a get_pricing() price entry for a number of years,
+    additional (e.g. ICANN) fees included.
+    """
+    def total(amount: float, _type: str) -> float:
+        # MULTIPLE prices are per year, ABSOLUTE ones for the duration.
+        return amount * years if _type == 'MULTIPLE' else amount
+
+    return (total(price['Price'], price['PriceType']) +
+            total(price['AdditionalCost'], price['AdditionalCostType']))
 
 
 class UserAPI:
@@ -6,11 +21,90 @@ class UserAPI:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def get_pricing(self):
-        pass
-
-    def get_balances(self):
-        pass
+    def get_pricing(self, product_type: str = 'DOMAIN',
+                    category: str = None, action: str = None,
+                    product: str = None, coupon: str = None
+                    ) -> typing.Dict[str, dict]:
+        """Get pricing for products.
+
+        https://www.namecheap.com/support/api/methods/users/get-pricing.aspx
+
+        Arguments:
+            product_type -- 'DOMAIN', 'SSLCERTIFICATE' or 'WHOISGUARD'
+            category -- product category, e.g. 'REGISTER', 'RENEW'
+            action -- action name, e.g. 'REGISTER'
+            product -- product name, e.g. a TLD ('com')
+            coupon -- promotional coupon code
+
+        Returns:
+            A dict: {category: {product: {duration: {price details}}}}
+            E.g. result['register']['com'][1]['Price'] is your price
+            for registering a .com domain for one year; see
+            total_price().
+        """
+        query = {'ProductType': product_type}
+        if category:
+            query['ProductCategory'] = category
+        if action:
+            query['ActionName'] = action
+        if product:
+            query['ProductName'] = product
+        if coupon:
+            query['PromotionCode'] = coupon
+
+        session = self.session
+        xml = session._call(USERS_GET_PRICING, query).find(
+            session._tag('UserGetPricingResult'))
+
+        def amount(value: str) -> float:
+            return float(value) if value else 0.0
+
+        result = {}
+        for _type in xml.findall(session._tag('ProductType')):
+            for _category in _type.findall(session._tag('ProductCategory')):
+                products = result.setdefault(
+                    _category.get('Name').lower(), {})
+                for _product in _category.findall(session._tag('Product')):
+                    prices = products.setdefault(
+                        _product.get('Name').lower(), {})
+                    for price in _product.findall(session._tag('Price')):
+                        # The API spells it "Additonal" in the Your* fields.
+                        prices[int(price.get('Duration'))] = {
+                            'DurationType': price.get('DurationType'),
+                            'Price': amount(price.get('YourPrice')),
+                            'PriceType': price.get('YourPriceType'),
+                            'AdditionalCost': amount(
+                                price.get('YourAdditonalCost') or
+                                price.get('YourAdditionalCost')),
+                            'AdditionalCostType': (
+                                price.get('YourAdditonalCostType') or
+                                price.get('YourAdditionalCostType')),
+                            'RegularPrice': amount(price.get('RegularPrice')),
+                            'Currency': price.get('Currency'),
+                        }
+
+        return result
+
+    def get_balances(self) -> dict:
+        """Get the account balances.
+
+        https://www.namecheap.com/support/api/methods/users/get-balances.aspx
+
+        Returns:
+            A dict with the 'Currency' and the balances as floats.
+        """
+        xml = self.session._call(USERS_GET_BALANCES).find(
+            self.session._tag('UserGetBalancesResult'))
+
+        return {
+            'Currency': xml.get('Currency'),
+            'AvailableBalance': float(xml.get('AvailableBalance')),
+            'AccountBalance': float(xml.get('AccountBalance')),
+            'EarnedAmount': float(xml.get('EarnedAmount')),
+            'WithdrawableAmount': float(xml.get('WithdrawableAmount')),
+            'FundsRequiredForAutoRenew':
+                float(xml.get('FundsRequiredForAutoRenew')),
+        }
 
     def change_password(self):
         pass
@@ -0,0 +1,240 @@
+"""Change feed over the domain portfolio.
+
+PortfolioWatcher keeps a snapshot of the domain list, diffs every new
+look at it against the snapshot and hands typed change events to its
+subscribers. Domains are re-read on a per-domain schedule: often when
+they are close to expiration, rarely when they are years out.
+"""
+import collections
+import logging
+import threading
+import typing
+from datetime import datetime
+from datetime import timedelta
+from math import ceil
+
+from namecheapapi.api.domains import LIST_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# (time left before expiration, polling interval), closest first.
+# Domains further out than the last entry use DEFAULT_POLL_INTERVAL.
+POLL_INTERVALS = [
+    (timedelta(days=7), timedelta(hours=1)),
+    (timedelta(days=30), timedelta(hours=6)),
+    (timedelta(days=90), timedelta(days=1)),
+    (timedelta(days=365), timedelta(days=7)),
+]
+DEFAULT_POLL_INTERVAL = timedelta(days=30)
+
+
+Change = collections.namedtuple('Change', ['domain', 'old', 'new'])
+
+
+class DomainAdded(Change):
+    """A domain appeared in the list (old is None, new is the row)."""
+    __slots__ = ()
+
+
+class DomainRemoved(Change):
+    """A domain left the list (old is the row, new is None)."""
+    __slots__ = ()
+
+
+class ExpiringSoon(Change):
+    """A domain expires within the warning period (new is the date)."""
+    __slots__ = ()
+
+
+class Expired(Change):
+    """A domain is reported as expired (new is the expiration date)."""
+    __slots__ = ()
+
+
+class LockChanged(Change):
+    """Registrar lock was switched on or off."""
+    __slots__ = ()
+
+
+class AutoRenewChanged(Change):
+    """Auto-renew was switched on or off."""
+    __slots__ = ()
+
+
+class WhoisGuardChanged(Change):
+    """WhoisGuard state changed (e.g. 'ENABLED' -> 'DISABLED')."""
+    __slots__ = ()
+
+
+class PortfolioWatcher:
+    """Poll the domain list and publish changes.
+
+    Call poll() periodically (or run watch() in a thread). Each poll
+    re-reads the domains that are due: with one full get_list() sweep
+    when that is cheaper than searching for them one by one, with
+    get_list(search_term=domain) calls otherwise. A full sweep also
+    runs every sweep_interval to pick up added and removed domains.
+
+    Example:
+        watcher = PortfolioWatcher(api)
+        watcher.subscribe(print, LockChanged, ExpiringSoon)
+        watcher.watch()
+    """
+
+    def __init__(self, api, expiring_within: timedelta = timedelta(days=30),
+                 sweep_interval: timedelta = timedelta(days=1),
+                 retry_delay: timedelta = timedelta(minutes=5)) -> None:
+        """Watcher initialization.
+
+        Arguments:
+            api -- DomainAPI instance.
+            expiring_within -- ExpiringSoon is sent once a domain has
+                less than this much time left.
+            sweep_interval -- maximum time between full sweeps.
+            retry_delay -- how long watch() waits after a failed
+                poll before it polls again.
+        """
+        self.api = api
+        self.expiring_within = expiring_within
+        self.sweep_interval = sweep_interval
+        self.retry_delay = retry_delay
+        self.snapshot = {}
+        self._due = {}
+        self._alerts = set()
+        self._last_sweep = None
+        self._subscribers = []
+        self._stopped = threading.Event()
+
+    def subscribe(self, callback: typing.Callable, *kinds: type) -> None:
+        """Register a callback for change events.
+
+        Arguments:
+            callback -- called with every matching event. Exceptions it
+                raises are logged; the snapshot already holds the
+                change, so the event is not sent again.
+            kinds -- event classes to subscribe to. All events are
+                sent if none are given.
+        """
+        self._subscribers.append((callback, kinds or (Change, )))
+
+    def poll(self, now: datetime = None) -> typing.List[Change]:
+        """Re-read the domains that are due and publish the changes.
+
+        Arguments:
+            now -- current time (datetime.now() by default).
+
+        Returns:
+            A list with the published events.
+        """
+        now = now or datetime.now()
+        due = [domain for domain, when in self._due.items() if when <= now]
+        # The very first sweep only establishes the snapshot.
+        initial = self._last_sweep is None
+
+        if (initial or now - self._last_sweep >= self.sweep_interval or
+                len(due) > ceil(len(self.snapshot) / LIST_PAGE_SIZE)):
+            rows = {row['Domain'].lower(): row
+                    for row in self.api.iter_list()}
+            gone = set(self.snapshot) - set(rows)
+            self._last_sweep = now
+        else:
+            rows = {}
+            for domain, found in zip(due, self.api._map(self._search, due)):
+                if found is not None:
+                    rows[domain] = found
+            gone = set(due) - set(rows)
+
+        events = []
+        for domain in gone:
+            events.append(DomainRemoved(domain, self.snapshot.pop(domain),
+                                        None))
+            self._due.pop(domain, None)
+            self._alerts = {alert for alert in self._alerts
+                            if alert[1] != domain}
+        for domain, row in rows.items():
+            events.extend(self._diff(domain, self.snapshot.get(domain), row,
+                                     now, initial))
+            self.snapshot[domain] = row
+            self._due[domain] = now + self._interval(row, now)
+
+        for event in events:
+            for callback, kinds in self._subscribers:
+                if isinstance(event, kinds):
+                    try:
+                        callback(event)
+                    except Exception:
+                        logger.exception('Subscriber %r failed on %r',
+                                         callback, event)
+
+        return events
+
+    def next_poll(self, now: datetime = None) -> datetime:
+        """Return the time when the next domain becomes due.
+        """
+        now = now or datetime.now()
+        if self._last_sweep is None:
+            return now
+        return min([self._last_sweep + self.sweep_interval] +
+                   list(self._due.values()))
+
+    def watch(self) -> None:
+        """Poll until stop() is called, sleeping between due times.
+
+        A failed poll is logged and retried after retry_delay.
+        """
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception('Portfolio poll failed, retrying in %s',
+                                 self.retry_delay)
+                self._stopped.wait(self.retry_delay.total_seconds())
+                continue
+            delay = (self.next_poll() - datetime.now()).total_seconds()
+            self._stopped.wait(max(delay, 0))
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _search(self, domain: str) -> typing.Optional[dict]:
+        for row in self.api.get_list(search_term=domain):
+            if row['Domain'].lower() == domain:
+                return row
+        return None
+
+    def _diff(self, domain: str, old: typing.Optional[dict], new: dict,
+              now: datetime, initial: bool) -> typing.List[Change]:
+        events = []
+
+        if old is None:
+            if not initial:
+                events.append(DomainAdded(domain, None, new))
+        else:
+            for field, kind in (('Locked', LockChanged),
+                                ('Auto-renew', AutoRenewChanged),
+                                ('WhoisGuard', WhoisGuardChanged)):
+                if old[field] != new[field]:
+                    events.append(kind(domain, old[field], new[field]))
+
+        # Expiration alerts are sent once per expiration date.
+        expiration = new['Expiration']
+        if new['Expired']:
+            alert = (Expired, domain, expiration)
+        elif expiration - now <= self.expiring_within:
+            alert = (ExpiringSoon, domain, expiration)
+        else:
+            alert = None
+        if alert is not None and alert not in self._alerts:
+            self._alerts.add(alert)
+            events.append(alert[0](
+                domain, old and old['Expiration'], expiration))
+
+        return events
+
+    def _interval(self, row: dict, now: datetime) -> timedelta:
+        left = row['Expiration'] - now
+        for threshold, interval in POLL_INTERVALS:
+            if left <= threshold:
+                return interval
+        return DEFAULT_POLL_INTERVAL
@@ -1,7 +1,22 @@
+import typing
+from datetime import datetime
+from datetime import timedelta
+from math import ceil
+from xml.etree.ElementTree import Element
+
 from namecheapapi.api.session import Session
+from namecheapapi.api.commands import *
+
+WHOISGUARD_LIST_PAGE_SIZE = 100
 
 
 class WhoisguardAPI:
+    """WhoisGuard subscriptions.
+
+    The bulk helpers (enable_many, disable_many, allot_many,
+    renew_many) join the WhoisGuard list with the domain list, so the
+    session must be a DomainAPI for them.
+    """
 
     def __init__(self, session: Session) -> None:
         self.session = session
@@ -9,11 +24,37 @@ class WhoisguardAPI:
     def change_email_address(self):
         pass
 
-    def enable(self):
-        pass
+    def enable(self, whoisguard_id: int, forwarded_to_email: str) -> bool:
+        """Enable WhoisGuard privacy protection.
 
-    def disable(self):
-        pass
+        https://www.namecheap.com/support/api/methods/whoisguard/enable.aspx
+
+        Arguments:
+            whoisguard_id -- WhoisGuard subscription ID
+            forwarded_to_email -- address the WhoisGuard email is
+                forwarded to
+
+        Returns:
+            True if WhoisGuard was enabled, False otherwise
+        """
+        return self._success(WHOISGUARD_ENABLE, 'WhoisguardEnableResult', {
+            'WhoisguardID': whoisguard_id,
+            'ForwardedToEmail': forwarded_to_email
+        })
+
+    def disable(self, whoisguard_id: int) -> bool:
+        """Disable WhoisGuard privacy protection.
+
+        https://www.namecheap.com/support/api/methods/whoisguard/disable.aspx
+
+        Arguments:
+            whoisguard_id -- WhoisGuard subscription ID
+
+        Returns:
+            True if WhoisGuard was disabled, False otherwise
+        """
+        return self._success(WHOISGUARD_DISABLE, 'WhoisguardDisableResult',
+                             {'WhoisguardID': whoisguard_id})
 
     def unallot(self):
         pass
@@ -21,11 +62,246 @@ class WhoisguardAPI:
     def discard(self):
         pass
 
-    def allot(self):
-        pass
+    def allot(self, whoisguard_id: int, domain: str,
+              forwarded_to_email: str = None, enable: bool = False) -> bool:
+        """Allot a WhoisGuard subscription to a domain.
 
-    def get_list(self):
-        pass
+        https://www.namecheap.com/support/api/methods/whoisguard/allot.aspx
 
-    def renew(self):
-        pass
+        Arguments:
+            whoisguard_id -- WhoisGuard subscription ID
+            domain -- domain name
+            forwarded_to_email -- address the WhoisGuard email is
+                forwarded to (required if enable is True)
+            enable -- enable WhoisGuard right away
+
+        Returns:
+            True if the subscription was allotted, False otherwise
+        """
+        query = {'WhoisguardID': whoisguard_id, 'DomainName': domain}
+        if forwarded_to_email:
+            query['ForwardedToEmail'] = forwarded_to_email
+        if enable:
+            query['EnableWG'] = 'true'
+
+        return self._success(WHOISGUARD_ALLOT, 'WhoisguardAllotResult',
+                             query)
+
+    def get_list(self, list_type: str = 'ALL') -> typing.List[dict]:
+        """Get the list of WhoisGuard subscriptions.
+
+        https://www.namecheap.com/support/api/methods/whoisguard/get-list.aspx
+
+        Arguments:
+            list_type -- possible values: 'ALL', 'ALLOTED', 'FREE',
+                'DISCARD'
+
+        Returns:
+            A list containing dicts with subscription information.
+        """
+        return list(self.iter_list(list_type))
+
+    def iter_list(self, list_type: str = 'ALL') -> typing.Iterator[dict]:
+        """Iterate over the list of WhoisGuard subscriptions.
+
+        Same as get_list(), but subscriptions are yielded as their page
+        arrives. The first page tells the total number of subscriptions;
+        the remaining pages are fetched concurrently.
+        """
+        session = self.session
+
+        def fetch(page: int) -> Element:
+            return session._call(WHOISGUARD_GET_LIST, {
+                'ListType': list_type,
+                'Page': page,
+                'PageSize': WHOISGUARD_LIST_PAGE_SIZE
+            })
+
+        def parse(xml: Element) -> list:
+            return [self._parse_list_item(item) for item in xml.find(
+                session._tag('WhoisguardGetListResult')).findall(
+                    session._tag('Whoisguard'))]
+
+        xml = fetch(1)
+        total = int(xml.find(session._tag('Paging')).find(
+            session._tag('TotalItems')).text)
+        yield from parse(xml)
+
+        pages = session._prefetch(
+            fetch, range(2, ceil(total / WHOISGUARD_LIST_PAGE_SIZE) + 1))
+        try:
+            for xml in pages:
+                yield from parse(xml)
+        finally:
+            pages.close()
+
+    def renew(self, whoisguard_id: int, years: int = 1,
+              coupon: str = None) -> dict:
+        """Renew a WhoisGuard subscription.
+
+        https://www.namecheap.com/support/api/methods/whoisguard/renew.aspx
+
+        NOTE: this method will charge your Namecheap account!
+
+        Arguments:
+            whoisguard_id -- WhoisGuard subscription ID
+            years -- renewal years (default: 1)
+            coupon -- coupon code. If provided, overrides the
+                session-specified coupon.
+
+        Returns:
+            A dict with order-related information.
+        """
+        query = {'WhoisguardID': whoisguard_id, 'Years': years}
+
+        if coupon:
+            query['PromotionCode'] = coupon
+        elif self.session.coupon:
+            query['PromotionCode'] = self.session.coupon
+
+        xml = self.session._call(WHOISGUARD_RENEW, query).find(
+            self.session._tag('WhoisguardRenewResult'))
+
+        return {
+            'ID': int(xml.get('WhoisguardId')),
+            'Success': xml.get('IsSuccess').lower() == 'true',
+            'Years': int(xml.get('Years')),
+            'OrderID': int(xml.get('OrderId')),
+            'TransactionID': int(xml.get('TransactionId')),
+            'ChargedAmount': float(xml.get('ChargedAmount')),
+        }
+
+    def enable_many(self, forwarded_to_email: str,
+                    domains: typing.Iterable[str] = None) -> dict:
+        """Enable WhoisGuard on every domain where it is disabled.
+
+        Domains whose WhoisGuard is already enabled, or that have no
+        WhoisGuard subscription, are left alone without any API call.
+
+        Arguments:
+            forwarded_to_email -- address the WhoisGuard email is
+                forwarded to
+            domains -- domain names to consider. All domains in the
+                account by default.
+
+        Returns:
+            A dict mapping every domain acted on to the enable() result,
+            or to the NCApiError raised for it.
+        """
+        targets = self._allotted(self._domains('DISABLED', domains))
+        return self._apply(
+            lambda item: self.enable(item[1], forwarded_to_email), targets)
+
+    def disable_many(self, domains: typing.Iterable[str] = None) -> dict:
+        """Disable WhoisGuard on every domain where it is enabled.
+
+        Arguments:
+            domains -- domain names to consider. All domains in the
+                account by default.
+
+        Returns:
+            A dict mapping every domain acted on to the disable()
+            result, or to the NCApiError raised for it.
+        """
+        targets = self._allotted(self._domains('ENABLED', domains))
+        return self._apply(lambda item: self.disable(item[1]), targets)
+
+    def allot_many(self, forwarded_to_email: str = None,
+                   domains: typing.Iterable[str] = None,
+                   enable: bool = False) -> dict:
+        """Allot free WhoisGuard subscriptions to domains without one.
+
+        Domains are matched with free subscriptions in list order; when
+        subscriptions run out, the remaining domains are left out.
+
+        Arguments:
+            forwarded_to_email -- see allot()
+            domains -- domain names to consider. All domains in the
+                account by default.
+            enable -- enable WhoisGuard right away
+
+        Returns:
+            A dict mapping every domain acted on to the allot() result,
+            or to the NCApiError raised for it.
+        """
+        needy = self._domains('NOTPRESENT', domains)
+        free = [item['ID'] for item in self.iter_list('FREE')]
+        targets = list(zip(needy, free))
+        return self._apply(lambda item: self.allot(
+            item[1], item[0], forwarded_to_email, enable), targets)
+
+    def renew_many(self, domains: typing.Iterable[str] = None,
+                   years: int = 1, expiring_within: timedelta = None,
+                   coupon: str = None) -> dict:
+        """Renew the WhoisGuard subscriptions allotted to domains.
+
+        NOTE: this method will charge your Namecheap account!
+
+        Arguments:
+            domains -- domain names to consider. All allotted
+                subscriptions by default.
+            years -- renewal years (default: 1)
+            expiring_within -- only renew subscriptions expiring within
+                this period.
+            coupon -- coupon code
+
+        Returns:
+            A dict mapping every domain acted on to the renew() result,
+            or to the NCApiError raised for it.
+        """
+        wanted = ({domain.lower() for domain in domains}
+                  if domains is not None else None)
+        cutoff = (datetime.now() + expiring_within
+                  if expiring_within is not None else None)
+
+        targets = [
+            (item['Domain'], item['ID']) for item in
+            self.iter_list('ALLOTED') if item['Domain'] and
+            (wanted is None or item['Domain'].lower() in wanted) and
+            (cutoff is None or (item['Expiration'] and
+                                item['Expiration'] <= cutoff))]
+        return self._apply(
+            lambda item: self.renew(item[1], years, coupon), targets)
+
+    def _domains(self, state: str,
+                 domains: typing.Iterable[str] = None) -> typing.List[str]:
+        """Names of the listed domains whose WhoisGuard is in state.
+        """
+        wanted = ({domain.lower() for domain in domains}
+                  if domains is not None else None)
+        return [row['Domain'] for row in self.session.iter_list()
+                if row['WhoisGuard'] == state and
+                (wanted is None or row['Domain'].lower() in wanted)]
+
+    def _allotted(self, domains: typing.List[str]) -> typing.List[tuple]:
+        """Pair domains with the IDs of their WhoisGuard subscriptions.
+        """
+        if not domains:
+            return []
+        wanted = {domain.lower(): domain for domain in domains}
+        return [(wanted[item['Domain'].lower()], item['ID'])
+                for item in self.iter_list('ALLOTED')
+                if item['Domain'] and item['Domain'].lower() in wanted]
+
+    def _apply(self, function: typing.Callable,
+               targets: typing.List[tuple]) -> dict:
+        return dict(zip([domain for domain, _ in targets], self.session._map(
+            function, targets, return_exceptions=True)))
+
+    def _success(self, command: str, result_tag: str, query: dict) -> bool:
+        xml = self.session._call(command, query).find(
+            self.session._tag(result_tag))
+        return xml.get('IsSuccess').lower() == 'true'
+
+    def _parse_list_item(self, item: Element) -> dict:
+
+        def date(value: str) -> typing.Optional[datetime]:
+            return datetime.strptime(value, '%m/%d/%Y') if value else None
+
+        return {
+            'ID': int(item.get('ID')),
+            'Domain': item.get('DomainName') or None,
+            'Creation': date(item.get('Created')),
+            'Expiration': date(item.get('Expires')),
+            'Status': item.get('Status'),
+        }
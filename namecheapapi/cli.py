@@ -0,0 +1,151 @@
+"""Command line interface.
+
+Credentials are read from the environment:
+
+- NAMECHEAP_API_USER: NC API username
+- NAMECHEAP_API_KEY: NC API key
+- NAMECHEAP_USERNAME: Namecheap username (NAMECHEAP_API_USER if unset)
+- NAMECHEAP_CLIENT_IP: whitelisted public IP address
+- NAMECHEAP_SANDBOX: set to 0 to use the production endpoint
+
+Only argparse is imported at startup; the API modules and output
+formatters are loaded by the subcommand that needs them.
+"""
+import argparse
+import os
+import sys
+
+LIST_FIELDS = ['Domain', 'ID', 'Owner', 'Creation', 'Expiration',
+               'WhoisGuard', 'Expired', 'Locked', 'Auto-renew']
+
+
+def _api():
+    from namecheapapi.api.domains import DomainAPI
+
+    try:
+        api_user = os.environ['NAMECHEAP_API_USER']
+        return DomainAPI(
+            api_user=api_user,
+            api_key=os.environ['NAMECHEAP_API_KEY'],
+            username=os.environ.get('NAMECHEAP_USERNAME', api_user),
+            client_ip=os.environ['NAMECHEAP_CLIENT_IP'],
+            sandbox=os.environ.get('NAMECHEAP_SANDBOX', '1') != '0',
+        )
+    except KeyError as e:
+        sys.exit('namecheapapi: environment variable {} is not set'.format(
+            e.args[0]))
+
+
+def _json_default(value):
+    return value.isoformat()
+
+
+def _write_json(value) -> None:
+    import json
+
+    sys.stdout.write(json.dumps(value, default=_json_default) + '\n')
+
+
+def do_list(args) -> None:
+    for domain in _api().iter_list(args.type, args.search):
+        sys.stdout.write(domain['Domain'] + '\n')
+
+
+def do_info(args) -> None:
+    api = _api()
+    for domain in args.domains:
+        _write_json(api.get_info(domain))
+
+
+def do_check(args) -> None:
+    for domain, available in _api().check(args.domains).items():
+        sys.stdout.write('{}\t{}\n'.format(
+            domain, 'available' if available else 'taken'))
+
+
+def do_export(args) -> None:
+    domains = _api().iter_list(args.type, args.search)
+
+    if args.format == 'csv':
+        import csv
+
+        writer = csv.DictWriter(sys.stdout, LIST_FIELDS)
+        writer.writeheader()
+        for domain in domains:
+            writer.writerow({
+                key: value.strftime('%Y-%m-%d')
+                if hasattr(value, 'strftime') else value
+                for key, value in domain.items()})
+    else:
+        for domain in domains:
+            _write_json(domain)
+
+
+def do_renew(args) -> None:
+    for domain, result in _api().renew_many(args.domains, args.years).items():
+        if isinstance(result, Exception):
+            _write_json({'Domain': domain, 'Error': str(result)})
+        else:
+            _write_json(result)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='namecheapapi', description='Namecheap API command line tool.')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    def list_arguments(command):
+        command.add_argument('--type', default='ALL',
+                             choices=['ALL', 'EXPIRING', 'EXPIRED'])
+        command.add_argument('--search', help='keyword to look for')
+
+    command = commands.add_parser('list', help='print domain names')
+    list_arguments(command)
+    command.set_defaults(handler=do_list)
+
+    command = commands.add_parser('info', help='print domain information')
+    command.add_argument('domains', nargs='+', metavar='domain')
+    command.set_defaults(handler=do_info)
+
+    command = commands.add_parser('check', help='check availability')
+    command.add_argument('domains', nargs='+', metavar='domain')
+    command.set_defaults(handler=do_check)
+
+    command = commands.add_parser(
+        'export', help='stream the domain list as NDJSON or CSV')
+    list_arguments(command)
+    command.add_argument('--format', default='ndjson',
+                         choices=['ndjson', 'csv'])
+    command.set_defaults(handler=do_export)
+
+    command = commands.add_parser(
+        'renew', help='renew domains (charges your account!)')
+    command.add_argument('domains', nargs='+', metavar='domain')
+    command.add_argument('--years', type=int, default=1)
+    command.set_defaults(handler=do_renew)
+
+    return parser
+
+
+def main(argv: list = None) -> None:
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Output was piped into a command that exited early (e.g. head);
+        # point stdout at devnull so the final flush does not fail too.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    except Exception as e:
+        from namecheapapi.api.exceptions import NCApiError
+
+        if not isinstance(e, NCApiError):
+            raise
+        sys.exit('namecheapapi: {}'.format(e))
+
+
+if __name__ == '__main__':
+    main()
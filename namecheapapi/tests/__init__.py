@@ -1 +0,0 @@
-from namecheapapi.tests import test_domains
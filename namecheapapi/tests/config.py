@@ -0,0 +1,5 @@
+API_USER = API_KEY = USERNAME = 'x'
+CLIENT_IP = '127.0.0.1'
+SANDBOX = True
+COUPON = ''
+DOMAIN = 'example.com'
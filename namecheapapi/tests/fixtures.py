@@ -0,0 +1,157 @@
+"""Canned API responses for offline tests.
+"""
+import threading
+from urllib.parse import parse_qsl
+from namecheapapi import DomainAPI
+
+
+ENVELOPE = '''<?xml version="1.0" encoding="utf-8"?>
+<ApiResponse Status="{status}" xmlns="http://api.namecheap.com/xml.response">
+  <Errors>{errors}</Errors>
+  <Warnings />
+  <RequestedCommand>{command}</RequestedCommand>
+  <CommandResponse Type="{command}">{body}</CommandResponse>
+  <Server>PHX01SBAPI01</Server>
+  <GMTTimeDifference>--4:00</GMTTimeDifference>
+  <ExecutionTime>0.01</ExecutionTime>
+</ApiResponse>'''
+
+GET_INFO = '''
+<DomainGetInfoResult Status="Ok" ID="117154" DomainName="{domain}"
+    OwnerName="peter" IsOwner="true" IsPremium="false">
+  <DomainDetails>
+    <CreatedDate>05/10/2016</CreatedDate>
+    <ExpiredDate>05/10/2018</ExpiredDate>
+    <NumYears>0</NumYears>
+  </DomainDetails>
+  <LockDetails />
+  <Whoisguard Enabled="True">
+    <ID>120000</ID>
+    <ExpiredDate>05/10/2018</ExpiredDate>
+    <EmailDetails WhoisGuardEmail="abc@whoisguard.com"
+        ForwardedTo="peter@griffin.tv" LastAutoEmailChangeDate=""
+        AutoEmailChangeFrequencyDays="0" />
+  </Whoisguard>
+  <PremiumDnsSubscription>
+    <UseAutoRenew>false</UseAutoRenew>
+    <SubscriptionId>-1</SubscriptionId>
+    <CreatedDate>0001-01-01T00:00:00</CreatedDate>
+    <ExpirationDate>0001-01-01T00:00:00</ExpirationDate>
+    <IsActive>false</IsActive>
+  </PremiumDnsSubscription>
+  <DnsDetails ProviderType="FREE" IsUsingOurDNS="true" HostCount="2"
+      EmailType="FWD" DynamicDNSStatus="false" IsFailover="false">
+    <Nameserver>dns1.registrar-servers.com</Nameserver>
+    <Nameserver>dns2.registrar-servers.com</Nameserver>
+  </DnsDetails>
+  <Modificationrights All="true" />
+</DomainGetInfoResult>'''
+
+
+def response(command: str, body: str = '', errors: str = '') -> str:
+    """Wrap a CommandResponse body into a full API response.
+    """
+    return ENVELOPE.format(status='ERROR' if errors else 'OK',
+                           command=command, body=body, errors=errors)
+
+
+class FixtureTransport:
+    """Transport answering every query with a canned response.
+
+    responses maps a command to a function of the query returning the
+    CommandResponse body. Any exception raised by that function is
+    turned into an error response.
+    """
+
+    def __init__(self, responses: dict) -> None:
+        self.responses = responses
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, query: str, post: bool = False) -> bytes:
+        query = dict(parse_qsl(query, keep_blank_values=True))
+        command = query.pop('Command')
+        with self._lock:
+            self.calls.append((command, query))
+        try:
+            body = self.responses[command](query)
+        except Exception as e:
+            # An NCApiError carries its error number; anything else is
+            # answered with 'Domain not found'.
+            number = (e.errors[0]['Number'] if getattr(e, 'errors', None)
+                      else '2019166')
+            return response(command, errors='<Error Number="{}">{}</Error>'
+                            .format(number, e)).encode('utf-8')
+        return response(command, body).encode('utf-8')
+
+
+class FixtureAPI(DomainAPI):
+    """DomainAPI talking to a FixtureTransport.
+    """
+
+    def __init__(self, responses: dict, **kwargs) -> None:
+        super().__init__('user', 'key', 'user', '127.0.0.1',
+                         transport=FixtureTransport(responses), **kwargs)
+
+    @property
+    def calls(self) -> list:
+        return self.transport.calls
+
+
+def get_list(domains: list, query: dict) -> str:
+    """Build a getlist response body for one page of the given domains.
+
+    domains is a list of dicts with optional 'Expires', 'IsLocked',
+    'AutoRenew', 'IsExpired' and 'WhoisGuard' overrides and a required
+    'Name'.
+    """
+    page = int(query.get('Page', 1))
+    size = int(query.get('PageSize', 20))
+    rows = []
+    for domain in domains[(page - 1) * size:page * size]:
+        attributes = {
+            'ID': '1', 'User': 'peter', 'Created': '05/10/2016',
+            'Expires': '05/10/2018', 'IsExpired': 'false',
+            'IsLocked': 'false', 'AutoRenew': 'false',
+            'WhoisGuard': 'ENABLED', **domain}
+        rows.append('<Domain {} />'.format(' '.join(
+            '{}="{}"'.format(key, value)
+            for key, value in attributes.items())))
+    return ('<DomainGetListResult>{}</DomainGetListResult>'
+            '<Paging><TotalItems>{}</TotalItems>'
+            '<CurrentPage>{}</CurrentPage><PageSize>{}</PageSize>'
+            '</Paging>').format(''.join(rows), len(domains), page, size)
+
+
+def renew(query: dict) -> str:
+    return ('<DomainRenewResult DomainName="{}" DomainID="1" Renew="true" '
+            'OrderID="1" TransactionID="1" ChargedAmount="10.87">'
+            '<DomainDetails><ExpiredDate>05/10/2019 12:00:00 AM</ExpiredDate>'
+            '</DomainDetails></DomainRenewResult>').format(
+                query['DomainName'])
+
+
+def get_tld_list(count: int) -> str:
+    return '<Tlds>{}</Tlds>'.format(''.join(
+        '<Tld Name="tld{0}" NonRealTime="false" MinRegisterYears="1" '
+        'MaxRegisterYears="10" IsApiRegisterable="true" Type="GTLD" '
+        'SequenceNumber="{0}" Category="G">Description {0}</Tld>'.format(i)
+        for i in range(count)))
+
+
+def get_contacts(domain: str, address: dict, read_only: tuple = ()) -> str:
+    """Build a getContacts response body with the same address for every
+    contact type.
+    """
+    from namecheapapi.api.domains import (
+        ADDRESS_TYPES, REQUIRED_ADDRESS_PARAMS, OPTIONAL_ADDRESS_PARAMS)
+
+    types = ''.join(
+        '<{0} ReadOnly="{1}">{2}</{0}>'.format(
+            address_type, 'true' if address_type in read_only else 'false',
+            ''.join('<{0}>{1}</{0}>'.format(field, address.get(field, ''))
+                    for field in REQUIRED_ADDRESS_PARAMS +
+                    OPTIONAL_ADDRESS_PARAMS))
+        for address_type in ADDRESS_TYPES)
+    return ('<DomainContactsResult Domain="{}">{}'
+            '</DomainContactsResult>').format(domain, types)
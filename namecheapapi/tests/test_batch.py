@@ -0,0 +1,103 @@
+import threading
+import unittest
+from concurrent.futures import CancelledError
+from namecheapapi.api.commands import *
+from namecheapapi.api.concurrency import AdaptiveLimiter
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.tests.fixtures import FixtureAPI, GET_INFO, renew
+
+
+def get_lock(query):
+    if query['DomainName'].startswith('missing'):
+        raise ValueError('Domain name not found')
+    return ('<DomainGetRegistrarLockResult Domain="{}" '
+            'RegistrarLockStatus="true" />').format(query['DomainName'])
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.in_flight = [0, 0]
+        self.lock = threading.Lock()
+
+        def counted(handler):
+            def count(query):
+                with self.lock:
+                    self.in_flight[0] += 1
+                    self.in_flight[1] = max(self.in_flight)
+                try:
+                    return handler(query)
+                finally:
+                    with self.lock:
+                        self.in_flight[0] -= 1
+            return count
+
+        self.api = FixtureAPI({
+            DOMAINS_GET_INFO: counted(
+                lambda query: GET_INFO.format(domain=query['DomainName'])),
+            DOMAINS_GET_LOCK: counted(get_lock),
+            DOMAINS_RENEW: renew,
+        }, limiter=AdaptiveLimiter(initial=16, maximum=16))
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_results_match_synchronous_calls(self):
+        with self.api.batch() as batch:
+            info = batch.get_info('domain.com')
+            lock = batch.get_lock('domain.com')
+            missing = batch.submit('get_lock', 'missing.com')
+            self.assertFalse(info.done())
+
+        self.assertEqual(info.result(), self.api.get_info('domain.com'))
+        self.assertIs(lock.result(), self.api.get_lock('domain.com'))
+        with self.assertRaises(NCApiError):
+            missing.result()
+
+    def test_identical_calls_are_sent_once(self):
+        with self.api.batch() as batch:
+            futures = [batch.get_lock('domain{}.com'.format(i % 10))
+                       for i in range(50)]
+        self.assertIs(futures[0], futures[10])
+        self.assertTrue(all(future.result() for future in futures))
+        self.assertEqual(len(self.api.calls), 10)
+
+    def test_charging_calls_are_not_deduplicated(self):
+        with self.api.batch() as batch:
+            first = batch.renew('domain.com')
+            second = batch.renew('domain.com')
+            info = batch.get_info('domain.com')
+            again = batch.submit('get_info', 'domain.com', dedupe=False)
+        self.assertIsNot(first, second)
+        self.assertIsNot(info, again)
+        self.assertEqual(len(self.api.calls), 4)
+
+    def test_priority_order(self):
+        with self.api.batch(concurrency=1) as batch:
+            for i in range(5):
+                batch.get_lock('low{}.com'.format(i))
+            batch.submit('get_info', 'high.com', priority=2)
+            batch.get_lock('low0.com', priority=1)
+
+        self.assertEqual([query['DomainName'] for _, query in
+                          self.api.calls][:2], ['high.com', 'low0.com'])
+
+    def test_bounded_concurrency(self):
+        with self.api.batch(concurrency=3) as batch:
+            futures = [batch.get_info('domain{}.com'.format(i))
+                       for i in range(30)]
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertLessEqual(self.in_flight[1], 3)
+
+    def test_error_in_block_cancels_calls(self):
+        with self.assertRaises(KeyError):
+            with self.api.batch() as batch:
+                future = batch.get_info('domain.com')
+                raise KeyError
+        with self.assertRaises(CancelledError):
+            future.result()
+        self.assertEqual(self.api.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from namecheapapi.api.cache import AvailabilityCache, TakenFilter
+
+
+class StubAPI:
+
+    def __init__(self, taken):
+        self.taken = taken
+        self.calls = []
+
+    def check(self, domains):
+        self.calls.append(list(domains))
+        return {domain: domain not in self.taken for domain in domains}
+
+
+class AvailabilityCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = StubAPI(taken={'google.com'})
+
+    def test_only_misses_reach_api(self):
+        cache = AvailabilityCache(self.api)
+        self.assertEqual(cache.check('google.com'), {'google.com': False})
+        response = cache.check(['google.com', 'asdfghjhgfdsa.com'])
+        self.assertEqual(response, {'google.com': False,
+                                    'asdfghjhgfdsa.com': True})
+        self.assertEqual(self.api.calls,
+                         [['google.com'], ['asdfghjhgfdsa.com']])
+
+    def test_ttl_expiry(self):
+        cache = AvailabilityCache(self.api, available_ttl=0)
+        cache.check('asdfghjhgfdsa.com')
+        cache.check('asdfghjhgfdsa.com')
+        self.assertEqual(len(self.api.calls), 2)
+
+    def test_invalidate(self):
+        cache = AvailabilityCache(self.api)
+        cache.check('google.com')
+        cache.invalidate('google.com')
+        cache.check('google.com')
+        self.assertEqual(len(self.api.calls), 2)
+
+    def test_duplicates_are_checked_once(self):
+        cache = AvailabilityCache(self.api)
+        response = cache.check(['Google.com', 'google.com'])
+        self.assertEqual(response, {'Google.com': False,
+                                    'google.com': False})
+        self.assertEqual(self.api.calls, [['google.com']])
+
+
+class TakenFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'taken.bf')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_membership(self):
+        taken = TakenFilter(capacity=1000)
+        taken.add('Google.com')
+        self.assertIn('google.com', taken)
+        self.assertNotIn('asdfghjhgfdsa.com', taken)
+
+    def test_shared_file(self):
+        first = TakenFilter(self.path, capacity=1000)
+        second = TakenFilter(self.path)
+        first.add('google.com')
+        self.assertIn('google.com', second)
+        self.assertEqual(first.bits, second.bits)
+        first.close()
+        second.close()
+
+    def test_filter_answers_for_other_caches(self):
+        api = StubAPI(taken={'google.com'})
+        first = AvailabilityCache(api, taken_filter=TakenFilter(self.path))
+        second = AvailabilityCache(api, taken_filter=TakenFilter(self.path))
+        first.check('google.com')
+        self.assertEqual(second.check('google.com'), {'google.com': False})
+        self.assertEqual(len(api.calls), 1)
+        self.assertEqual(second.taken_filter.ttl, 3600)
+
+    def test_expired_entry_is_checked_again(self):
+        api = StubAPI(taken={'google.com'})
+        cache = AvailabilityCache(api, taken_ttl=0,
+                                  taken_filter=TakenFilter(self.path,
+                                                           ttl=None))
+        self.assertEqual(cache.taken_filter.ttl, 0)
+        cache.check('google.com')
+        api.taken.clear()
+        self.assertEqual(cache.check('google.com'), {'google.com': True})
+        self.assertEqual(len(api.calls), 2)
+
+    def test_invalidate_overrides_filter(self):
+        api = StubAPI(taken={'google.com'})
+        cache = AvailabilityCache(api, taken_filter=TakenFilter(self.path))
+        cache.check('google.com')
+        api.taken.clear()
+        cache.invalidate(['google.com'])
+        self.assertEqual(cache.check('google.com'), {'google.com': True})
+        self.assertEqual(cache.check('google.com'), {'google.com': True})
+        self.assertEqual(len(api.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
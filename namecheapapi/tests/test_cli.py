@@ -0,0 +1,47 @@
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from namecheapapi import cli
+from namecheapapi.api.commands import *
+from namecheapapi.tests.fixtures import FixtureAPI, get_list
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        domains = [{'Name': 'domain{}.com'.format(i)} for i in range(150)]
+        self.api = FixtureAPI({
+            DOMAINS_GET_LIST: lambda query: get_list(domains, query),
+        })
+
+    def run_cli(self, *argv):
+        output = io.StringIO()
+        with mock.patch.object(cli, '_api', return_value=self.api):
+            with redirect_stdout(output):
+                cli.main(list(argv))
+        return output.getvalue().splitlines()
+
+    def test_export_ndjson(self):
+        lines = self.run_cli('export')
+        self.assertEqual(len(lines), 150)
+        self.assertEqual(json.loads(lines[0])['Expiration'],
+                         '2018-05-10T00:00:00')
+
+    def test_export_csv(self):
+        lines = self.run_cli('export', '--format', 'csv')
+        self.assertEqual(lines[0], ','.join(cli.LIST_FIELDS))
+        self.assertTrue(lines[1].startswith('domain0.com,1,peter,2016-05-10'))
+
+    def test_lazy_imports(self):
+        import subprocess
+        import sys
+        code = ('import sys, namecheapapi.cli; '
+                'print("namecheapapi.api" in sys.modules)')
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.strip(), b'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import threading
+import time
+import unittest
+from namecheapapi.api.commands import *
+from namecheapapi.api.concurrency import AdaptiveLimiter, is_throttle
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.tests.fixtures import FixtureAPI, get_list
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+
+    def test_additive_increase(self):
+        limiter = AdaptiveLimiter(initial=2, maximum=4)
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release(0.1)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_no_increase_on_slow_calls(self):
+        limiter = AdaptiveLimiter(initial=2)
+        limiter.acquire()
+        limiter.release(0.1)
+        limit = limiter.limit
+        limiter.acquire()
+        limiter.release(1.0)
+        self.assertEqual(limiter.limit, limit)
+
+    def test_multiplicative_decrease(self):
+        limiter = AdaptiveLimiter(initial=8)
+        for _ in range(3):
+            limiter.acquire()
+            limiter.release(0.1, throttled=True)
+        # A burst of throttled calls counts as one congestion signal.
+        self.assertEqual(limiter.limit, 4)
+
+    def test_slot_classifies_errors(self):
+        limiter = AdaptiveLimiter(initial=8)
+        with self.assertRaises(NCApiError):
+            with limiter.slot():
+                raise NCApiError('', [{'Number': '2019166', 'Text': ''}])
+        self.assertEqual(limiter.throttled, 0)
+        with self.assertRaises(NCApiError):
+            with limiter.slot():
+                raise NCApiError('', [{'Number': '500000', 'Text': ''}])
+        self.assertEqual(limiter.throttled, 1)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_is_throttle(self):
+        self.assertTrue(is_throttle(ConnectionResetError()))
+        self.assertFalse(is_throttle(ValueError()))
+
+    def test_limit_is_enforced(self):
+        limiter = AdaptiveLimiter(initial=3, maximum=3)
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with limiter.slot():
+                with lock:
+                    peak.append(limiter.in_flight)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(max(peak), 3)
+
+
+class BulkHelpersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.domains = [{'Name': 'domain{}.com'.format(i)}
+                        for i in range(1050)]
+        self.api = FixtureAPI({
+            DOMAINS_GET_LIST: lambda query: get_list(self.domains, query),
+            DOMAINS_CHECK: lambda query: ''.join(
+                '<DomainCheckResult Domain="{}" Available="true" />'.format(
+                    domain) for domain in query['DomainList'].split(',')),
+            DOMAINS_SET_CUSTOM_NS: lambda query: (
+                '<DomainDNSSetCustomResult Domain="{}.{}" Updated="true" />'
+                ).format(query['SLD'], query['TLD']),
+        })
+        self.api.limiter = AdaptiveLimiter(maximum=4)
+
+    def test_concurrent_paging_keeps_order(self):
+        response = [domain['Domain'] for domain in self.api.iter_list()]
+        self.assertEqual(response, [domain['Name']
+                                    for domain in self.domains])
+
+    def test_check_batches(self):
+        domains = ['domain{}.com'.format(i) for i in range(120)]
+        response = self.api.check(domains)
+        self.assertEqual(set(response), set(domains))
+        self.assertEqual(len(self.api.calls), 3)
+
+    def test_set_nameservers_many(self):
+        response = self.api.set_nameservers_many(
+            ['a.com', ('b', 'net')], ['ns1.domain.com', 'ns2.domain.com'])
+        self.assertEqual(response, {'a.com': True, 'b.net': True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,325 @@
+import time
+import unittest
+from datetime import datetime
+from namecheapapi.api.commands import *
+from namecheapapi.api.concurrency import AdaptiveLimiter
+from namecheapapi.api.domains import DomainInfo
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.tests.fixtures import (FixtureAPI, GET_INFO, get_list,
+                                         get_contacts)
+
+
+class GetInfoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FixtureAPI({
+            DOMAINS_GET_INFO:
+                lambda query: GET_INFO.format(domain=query['DomainName'])
+        })
+
+    def test_eager(self):
+        response = self.api.get_info('example.com')
+        self.assertIsInstance(response, dict)
+        self.assertEqual(response['Expiration'], datetime(2018, 5, 10))
+        self.assertEqual(response['WhoisGuard']['Forwarded to'],
+                         'peter@griffin.tv')
+        self.assertEqual(len(response['DNS']['Nameservers']), 2)
+
+    def test_lazy(self):
+        response = self.api.get_info('example.com', lazy=True)
+        self.assertIsInstance(response, DomainInfo)
+        self.assertEqual(response['Expiration'], datetime(2018, 5, 10))
+        self.assertEqual(list(response._values), ['Expiration'])
+        self.assertEqual(response.to_dict(),
+                         self.api.get_info('example.com'))
+
+
+class ListPlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.domains = [{'Name': 'domain{}.com'.format(i),
+                         'IsLocked': 'true' if i % 2 else 'false'}
+                        for i in range(250)]
+        self.api = FixtureAPI({
+            DOMAINS_GET_LIST: lambda query: get_list(self.domains, query),
+            DOMAINS_GET_LOCK: lambda query: (
+                '<DomainGetRegistrarLockResult Domain="{}" '
+                'RegistrarLockStatus="true" />').format(query['DomainName']),
+            DOMAINS_GET_INFO:
+                lambda query: GET_INFO.format(domain=query['DomainName']),
+        })
+
+    def commands(self):
+        return [command for command, _ in self.api.calls]
+
+    def test_get_list(self):
+        response = self.api.get_list()
+        self.assertEqual(len(response), 250)
+        self.assertEqual(self.commands(), [DOMAINS_GET_LIST] * 3)
+
+    def test_lock_from_sweep(self):
+        domains = ['domain{}.com'.format(i) for i in range(0, 250, 10)]
+        response = self.api.get_lock_many(domains)
+        self.assertEqual(response, {domain: int(domain[6:-4]) % 2 == 1
+                                    for domain in domains})
+        self.assertEqual(self.commands(), [DOMAINS_GET_LIST] * 3)
+
+    def test_sweep_stops_without_extra_pages(self):
+        def slow_get_list(query):
+            if query['Page'] == '2':
+                # Gives a prefetched third page time to be sent.
+                time.sleep(0.1)
+            return get_list(self.domains, query)
+
+        self.api.transport.responses[DOMAINS_GET_LIST] = slow_get_list
+        domains = ['domain{}.com'.format(i) for i in range(100, 105)]
+        self.assertEqual(len(self.api.get_lock_many(domains)), 5)
+        self.assertEqual(self.commands(), [DOMAINS_GET_LIST] * 2)
+
+    def test_lock_fallback(self):
+        response = self.api.get_lock_many(['domain1.com', 'other.com'])
+        self.assertEqual(response, {'domain1.com': True, 'other.com': True})
+        self.assertEqual(self.commands(),
+                         [DOMAINS_GET_LIST, DOMAINS_GET_LOCK])
+
+    def test_expiration_and_whoisguard(self):
+        domains = ['domain1.com', 'domain2.com', 'domain3.com']
+        self.assertEqual(set(self.api.get_expiration_many(domains)),
+                         set(domains))
+        self.assertTrue(all(self.api.get_whoisguard_many(domains).values()))
+        self.assertEqual(self.commands(), [DOMAINS_GET_LIST] * 2)
+
+    def test_process_decoding(self):
+        api = FixtureAPI(self.api.transport.responses, decode_processes=2)
+        with api:
+            self.assertEqual(api.get_list(), self.api.get_list())
+        self.assertEqual(api.gmt_offset, -4)
+
+    def test_process_decoding_errors(self):
+        api = FixtureAPI({}, decode_processes=2)
+        with api, self.assertRaises(NCApiError) as e:
+            api.get_list()
+        self.assertEqual(e.exception.errors[0]['Number'], '2019166')
+        self.assertEqual(len(api.errors), 1)
+        self.assertEqual(api.gmt_offset, -4)
+
+    def test_process_decoding_throttling(self):
+        def throttled(query):
+            raise NCApiError('Too many requests', [
+                {'Number': '500000', 'Text': ''}])
+
+        limiter = AdaptiveLimiter(initial=4)
+        api = FixtureAPI({DOMAINS_GET_LIST: throttled}, decode_processes=2,
+                         limiter=limiter)
+        with api, self.assertRaises(NCApiError):
+            api.get_list()
+        self.assertEqual(limiter.throttled, 1)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_process_decoding_warnings(self):
+        api = FixtureAPI(self.api.transport.responses, decode_processes=2)
+        request = api.transport.request
+        api.transport.request = lambda *args: request(*args).replace(
+            b'<Warnings />',
+            b'<Warnings><Warning Number="1">Slow down</Warning></Warnings>')
+        with api:
+            self.assertEqual(api.get_list(), self.api.get_list())
+        self.assertEqual(api.warnings[0]['Warnings'],
+                         [{'Number': '1', 'Text': 'Slow down'}])
+
+
+ADDRESS = {
+    'FirstName': 'Peter',
+    'LastName': 'Griffin',
+    'Address1': '31 Spooner St.',
+    'City': 'Quahog',
+    'StateProvince': 'RI',
+    'PostalCode': '00093',
+    'Country': 'US',
+    'Phone': '+1.123456789',
+    'EmailAddress': 'peter@griffin.tv'
+}
+
+
+class RequestBuildingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FixtureAPI({
+            DOMAINS_SET_CONTACTS: lambda query: (
+                '<DomainSetContactResult Domain="{}" IsSuccess="true" />'
+                ).format(query['DomainName']),
+        })
+
+    def test_set_contacts_payload(self):
+        self.assertTrue(self.api.set_contacts('example.com', ADDRESS))
+        _, query = self.api.calls[0]
+        self.assertEqual(query, {
+            'ApiUser': 'user', 'ApiKey': 'key', 'Username': 'user',
+            'ClientIp': '127.0.0.1', 'DomainName': 'example.com',
+            **self.api._build_address_dict(ADDRESS)})
+
+    def test_contact_payload_is_memoized(self):
+        template = self.api._contact_template(DOMAINS_SET_CONTACTS, ADDRESS)
+        self.assertIs(self.api._contact_template(
+            DOMAINS_SET_CONTACTS, dict(ADDRESS)), template)
+        self.assertIsNot(self.api._contact_template(
+            DOMAINS_SET_CONTACTS, {**ADDRESS, 'City': 'Boston'}), template)
+
+    def test_base_params_follow_credentials(self):
+        self.api.set_contacts('example.com', ADDRESS)
+        self.api.api_key = 'other'
+        self.api.set_contacts('example.com', ADDRESS)
+        self.assertEqual(self.api.calls[1][1]['ApiKey'], 'other')
+
+
+class SyncContactsTest(unittest.TestCase):
+
+    def setUp(self):
+        moved = {**ADDRESS, 'Address1': '1 Main St.'}
+        self.contacts = {
+            'same.com': get_contacts('same.com', ADDRESS),
+            'moved.com': get_contacts('moved.com', moved),
+            'readonly.com': get_contacts('readonly.com', moved,
+                                         read_only=('Registrant', 'Tech',
+                                                    'Admin', 'AuxBilling')),
+        }
+        self.api = FixtureAPI({
+            DOMAINS_GET_CONTACTS:
+                lambda query: self.contacts[query['DomainName']],
+            DOMAINS_SET_CONTACTS: lambda query: (
+                '<DomainSetContactResult Domain="{}" IsSuccess="true" />'
+                ).format(query['DomainName']),
+        })
+
+    def test_only_differing_domains_are_written(self):
+        response = self.api.sync_contacts(sorted(self.contacts), ADDRESS)
+        self.assertEqual(response['same.com']['Changed'], [])
+        self.assertFalse(response['same.com']['Updated'])
+        self.assertFalse(response['readonly.com']['Updated'])
+        self.assertEqual(response['moved.com'], {
+            'Changed': ['RegistrantAddress1', 'TechAddress1',
+                        'AdminAddress1', 'AuxBillingAddress1'],
+            'Updated': True, 'Success': True})
+        writes = [query['DomainName'] for command, query in self.api.calls
+                  if command == DOMAINS_SET_CONTACTS]
+        self.assertEqual(writes, ['moved.com'])
+
+    def test_dry_run_and_errors(self):
+        response = self.api.sync_contacts(['moved.com', 'missing.com'],
+                                          ADDRESS, dry_run=True)
+        self.assertFalse(response['moved.com']['Updated'])
+        self.assertIsInstance(response['missing.com'], NCApiError)
+        self.assertNotIn(DOMAINS_SET_CONTACTS,
+                         [command for command, _ in self.api.calls])
+
+
+class ChildNameserverTest(unittest.TestCase):
+
+    def setUp(self):
+        # (domain, nameserver) -> IP
+        self.glue = {
+            ('one.com', 'ns1.one.com'): '192.0.2.1',
+            ('one.com', 'ns2.one.com'): '192.0.2.2',
+            ('one.com', 'ns3.one.com'): '192.0.2.3',
+            ('two.com', 'ns1.two.com'): '192.0.2.1',
+        }
+
+        def key(query):
+            return ('{SLD}.{TLD}'.format(**query), query['Nameserver'])
+
+        def get_info(query):
+            if query['SLD'] == 'gone':
+                raise NCApiError('Domain not found')
+            if query['SLD'] == 'busy':
+                raise NCApiError('Registry is unavailable', [
+                    {'Number': '3031510', 'Text': ''}])
+            if key(query) not in self.glue:
+                raise NCApiError('Nameserver does not exist', [
+                    {'Number': '3031510', 'Text': ''}])
+            return ('<DomainNSInfoResult Domain="{}" Nameserver="{}" '
+                    'IP="{}"><NameserverStatuses><Status>OK</Status>'
+                    '</NameserverStatuses></DomainNSInfoResult>').format(
+                        *key(query), self.glue[key(query)])
+
+        def write(result):
+            def handler(query):
+                if query['Nameserver'] == 'ns9.two.com':
+                    raise NCApiError('Invalid IP')
+                if 'IP' in query:
+                    self.glue[key(query)] = query['IP']
+                else:
+                    del self.glue[key(query)]
+                return ('<{} Domain="{}" Nameserver="{}" '
+                        'IsSuccess="true" />').format(result, *key(query))
+            return handler
+
+        self.api = FixtureAPI({
+            DOMAINS_NS_GET_INFO: get_info,
+            DOMAINS_NS_CREATE: write('DomainNSCreateResult'),
+            DOMAINS_NS_UPDATE: write('DomainNSUpdateResult'),
+            DOMAINS_NS_DELETE: write('DomainNSDeleteResult'),
+        })
+        self.desired = {
+            'one.com': {'ns1.one.com': '192.0.2.1',
+                        'ns2.one.com': '198.51.100.2',
+                        'ns3.one.com': None,
+                        'ns4.one.com': '198.51.100.4'},
+            'two.com': {'ns1.two.com': '192.0.2.1',
+                        'ns9.two.com': '198.51.100.9'},
+        }
+
+    def writes(self):
+        return sorted((command, query['Nameserver'])
+                      for command, query in self.api.calls
+                      if command != DOMAINS_NS_GET_INFO)
+
+    def test_single_calls(self):
+        self.assertEqual(self.api.get_nameserver_info(
+            'one.com', 'ns1.one.com'), {
+                'Domain': 'one.com', 'Nameserver': 'ns1.one.com',
+                'IP': '192.0.2.1', 'Statuses': ['OK']})
+        self.assertTrue(self.api.update_nameserver(
+            ('one', 'com'), 'ns1.one.com', '192.0.2.9', '192.0.2.1'))
+        self.assertEqual(self.glue['one.com', 'ns1.one.com'], '192.0.2.9')
+        query = self.api.calls[-1][1]
+        self.assertEqual(query['OldIP'], '192.0.2.1')
+
+    def test_sync_only_sends_differences(self):
+        response = self.api.sync_child_nameservers(self.desired)
+        self.assertEqual(response['one.com'], {
+            'Create': ['ns4.one.com'], 'Update': ['ns2.one.com'],
+            'Delete': ['ns3.one.com'], 'Errors': {}})
+        self.assertEqual(response['two.com']['Create'], ['ns9.two.com'])
+        self.assertIsInstance(response['two.com']['Errors']['ns9.two.com'],
+                              NCApiError)
+        self.assertEqual(self.writes(), [
+            (DOMAINS_NS_CREATE, 'ns4.one.com'),
+            (DOMAINS_NS_CREATE, 'ns9.two.com'),
+            (DOMAINS_NS_DELETE, 'ns3.one.com'),
+            (DOMAINS_NS_UPDATE, 'ns2.one.com'),
+        ])
+        self.assertEqual(self.glue, {
+            ('one.com', 'ns1.one.com'): '192.0.2.1',
+            ('one.com', 'ns2.one.com'): '198.51.100.2',
+            ('one.com', 'ns4.one.com'): '198.51.100.4',
+            ('two.com', 'ns1.two.com'): '192.0.2.1',
+        })
+
+    def test_sync_dry_run(self):
+        self.desired['gone.com'] = {'ns1.gone.com': '192.0.2.1'}
+        response = self.api.sync_child_nameservers(self.desired,
+                                                   dry_run=True)
+        self.assertEqual(response['one.com']['Delete'], ['ns3.one.com'])
+        # Other errors are not mistaken for a missing nameserver.
+        self.assertIsInstance(response['gone.com'], NCApiError)
+        self.assertEqual(self.writes(), [])
+
+    def test_sync_registry_failure_is_not_absence(self):
+        response = self.api.sync_child_nameservers({
+            'busy.com': {'ns1.busy.com': None, 'ns2.busy.com': '192.0.2.2'}})
+        self.assertIsInstance(response['busy.com'], NCApiError)
+        self.assertEqual(self.writes(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.forwarding import EmailForwarding
+from namecheapapi.tests.fixtures import FixtureAPI
+
+
+class EmailForwardingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tables = {'domain{}.com'.format(i): {'info': 'peter@griffin.tv'}
+                       for i in range(30)}
+        self.tables['domain0.com']['catchall'] = 'postmaster@griffin.tv'
+
+        def get_forwarding(query):
+            domain = query['DomainName']
+            return ('<DomainDNSGetEmailForwardingResult Domain="{}">{}'
+                    '</DomainDNSGetEmailForwardingResult>').format(
+                        domain, ''.join(
+                            '<Forward mailbox="{}">{}</Forward>'.format(*item)
+                            for item in self.tables[domain].items()))
+
+        def set_forwarding(query):
+            if query['DomainName'] == 'domain13.com':
+                raise NCApiError('Invalid mailbox')
+            mailboxes = sorted(key for key in query
+                               if key.startswith('MailBox'))
+            self.tables[query['DomainName']] = {
+                query[key]: query['ForwardTo' + key[7:]] for key in mailboxes}
+            return ('<DomainDNSSetEmailForwardingResult Domain="{}" '
+                    'IsSuccess="true" />').format(query['DomainName'])
+
+        self.api = FixtureAPI({
+            DOMAINS_GET_EMAIL_FORWARDING: get_forwarding,
+            DOMAINS_SET_EMAIL_FORWARDING: set_forwarding,
+        })
+        self.forwarding = EmailForwarding(self.api)
+
+    def commands(self, command):
+        return [query['DomainName'] for name, query in self.api.calls
+                if name == command]
+
+    def test_get_and_set(self):
+        self.assertEqual(self.api.get_email_forwarding('domain0.com'), {
+            'info': 'peter@griffin.tv', 'catchall': 'postmaster@griffin.tv'})
+        self.assertTrue(self.api.set_email_forwarding(
+            'domain1.com', {'sales': 'lois@griffin.tv'}))
+        self.assertEqual(self.tables['domain1.com'],
+                         {'sales': 'lois@griffin.tv'})
+
+    def test_apply_many_skips_no_op_writes(self):
+        response = self.forwarding.apply_many(
+            self.tables, lambda table: dict(
+                table, catchall='postmaster@griffin.tv'))
+
+        self.assertEqual(response['domain0.com'], {
+            'Changed': [], 'Updated': False, 'Success': True})
+        self.assertEqual(response['domain1.com'], {
+            'Changed': ['catchall'], 'Updated': True, 'Success': True})
+        self.assertIsInstance(response['domain13.com'], NCApiError)
+        self.assertEqual(len(self.commands(DOMAINS_GET_EMAIL_FORWARDING)),
+                         30)
+        self.assertEqual(len(self.commands(DOMAINS_SET_EMAIL_FORWARDING)),
+                         29)
+        self.assertEqual(self.tables['domain5.com']['catchall'],
+                         'postmaster@griffin.tv')
+
+        # Everything is cached now: a second rollout makes no calls,
+        # except reading back the table whose write failed.
+        self.api.calls.clear()
+        response = self.forwarding.apply_many(
+            self.tables, {'info': 'peter@griffin.tv',
+                          'catchall': 'postmaster@griffin.tv'},
+            dry_run=True)
+        self.assertEqual(response['domain13.com']['Changed'], ['catchall'])
+        self.assertEqual(self.commands(DOMAINS_GET_EMAIL_FORWARDING),
+                         ['domain13.com'])
+        self.assertEqual(self.commands(DOMAINS_SET_EMAIL_FORWARDING), [])
+
+    def test_writes_start_from_the_current_table(self):
+        self.forwarding.get('domain1.com')
+        # Added elsewhere after the table was cached.
+        self.tables['domain1.com']['sales'] = 'lois@griffin.tv'
+
+        response = self.forwarding.apply_many(
+            ['domain1.com'], lambda table: dict(
+                table, catchall='postmaster@griffin.tv'))
+        self.assertEqual(response['domain1.com']['Changed'], ['catchall'])
+        self.assertEqual(self.tables['domain1.com'], {
+            'info': 'peter@griffin.tv', 'sales': 'lois@griffin.tv',
+            'catchall': 'postmaster@griffin.tv'})
+        self.assertEqual(len(self.commands(DOMAINS_GET_EMAIL_FORWARDING)),
+                         2)
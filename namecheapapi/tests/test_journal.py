@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.journal import ChargeJournal
+from namecheapapi.tests.fixtures import FixtureAPI, GET_INFO, renew
+
+
+class ChargeJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'charges.journal')
+        self.expiration = '05/10/2018'
+        self.drop = 0
+        self.unsent = 0
+        self.decline = False
+
+        def renew_domain(query):
+            if self.decline:
+                raise NCApiError('Insufficient funds')
+            self.expiration = '05/10/2019'
+            return renew(query)
+
+        self.api = FixtureAPI({
+            DOMAINS_GET_INFO: lambda query: GET_INFO.format(
+                domain=query['DomainName']).replace(
+                    '05/10/2018', self.expiration),
+            DOMAINS_RENEW: renew_domain,
+        })
+        request = self.api.transport.request
+
+        def dropping_request(query, post=False):
+            if self.unsent and 'namecheap.domains.renew' in query:
+                self.unsent -= 1
+                raise ConnectionResetError('reset')
+            data = request(query, post)
+            if self.drop and 'namecheap.domains.renew' in query:
+                self.drop -= 1
+                raise TimeoutError('timed out')
+            return data
+
+        self.api.transport.request = dropping_request
+        self.journal = ChargeJournal(self.api, self.path)
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.directory)
+
+    def renewals(self):
+        return [query for command, query in self.api.calls
+                if command == DOMAINS_RENEW]
+
+    def test_completed_key_is_not_charged_again(self):
+        response = self.journal.renew('example.com')
+        self.assertEqual(response['OrderID'], 1)
+        self.journal.close()
+
+        with ChargeJournal(self.api, self.path) as journal:
+            self.assertEqual(journal.renew('example.com'), response)
+        self.assertEqual(len(self.renewals()), 1)
+
+    def test_rerun_is_not_charged_again(self):
+        self.journal.renew_many(['example.com'])
+        self.journal.close()
+
+        with ChargeJournal(self.api, self.path) as journal:
+            journal.renew_many(['example.com'])
+        self.assertEqual(len(self.renewals()), 1)
+
+    def test_new_key_is_charged_again(self):
+        self.journal.renew('example.com')
+        self.journal.renew('example.com', key='renew:example.com:2020')
+        self.assertEqual(len(self.renewals()), 2)
+
+    def test_lost_answer_is_reconciled_instead_of_retried(self):
+        self.drop = 1
+        response = self.journal.renew('example.com')
+        self.assertEqual(len(self.renewals()), 1)
+        self.assertIsNone(response['OrderID'])
+        self.assertEqual(response['Expiration'], datetime(2019, 5, 10))
+        self.assertEqual(self.journal.pending(), [])
+
+    def test_unsent_request_is_retried(self):
+        self.unsent = 1
+        response = self.journal.renew('example.com')
+        self.assertEqual(response['OrderID'], 1)
+        self.assertEqual(len(self.renewals()), 1)
+
+    def test_pending_entry_survives_restart(self):
+        self.journal.retries = 0
+        self.drop = 1
+        with self.assertRaises(TimeoutError):
+            self.journal.renew('example.com')
+        self.journal.close()
+
+        with ChargeJournal(self.api, self.path) as journal:
+            self.assertEqual(len(journal.pending()), 1)
+            self.assertEqual(journal.reconcile(),
+                             {'renew:example.com:2018-05-10': True})
+            journal.renew('example.com')
+        self.assertEqual(len(self.renewals()), 1)
+
+    def test_pending_entry_is_settled_on_rerun(self):
+        self.journal.retries = 0
+        self.drop = 1
+        with self.assertRaises(TimeoutError):
+            self.journal.renew('example.com')
+        self.journal.close()
+
+        with ChargeJournal(self.api, self.path) as journal:
+            response = journal.renew('example.com')
+            self.assertEqual(journal.pending(), [])
+        self.assertEqual(response['Expiration'], datetime(2019, 5, 10))
+        self.assertEqual(len(self.renewals()), 1)
+
+    def test_declined_charge_can_be_retried(self):
+        self.decline = True
+        with self.assertRaises(NCApiError):
+            self.journal.renew('example.com')
+        self.decline = False
+        self.journal.renew('example.com')
+        self.assertEqual(len(self.renewals()), 2)
@@ -0,0 +1,59 @@
+import unittest
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.parsers import get_parser, PARSERS
+from namecheapapi.tests.fixtures import (FixtureAPI, GET_INFO, get_list,
+                                         get_tld_list)
+
+
+def available_parsers():
+    parsers = []
+    for name in PARSERS:
+        try:
+            get_parser(name)
+        except ImportError:
+            continue
+        parsers.append(name)
+    return parsers
+
+
+class ParserBackendTest(unittest.TestCase):
+
+    def api(self, parser):
+        domains = [{'Name': 'domain{}.com'.format(i)} for i in range(120)]
+
+        def fail(query):
+            raise ValueError('Domain name not found')
+
+        return FixtureAPI({
+            DOMAINS_GET_LIST: lambda query: get_list(domains, query),
+            DOMAINS_GET_TLD_LIST: lambda query: get_tld_list(3),
+            DOMAINS_GET_INFO:
+                lambda query: GET_INFO.format(domain=query['DomainName']),
+            DOMAINS_GET_LOCK: fail,
+        }, parser=parser)
+
+    def results(self, parser):
+        api = self.api(parser)
+        with self.assertRaises(NCApiError):
+            api.get_lock('example.com')
+        return (api.get_info('example.com'), api.get_list(),
+                api.get_tld_list(), api.gmt_offset,
+                api.errors[0]['Errors'])
+
+    def test_backends_agree(self):
+        expected = self.results('etree')
+        for name in available_parsers():
+            self.assertEqual(self.results(name), expected, name)
+
+    def test_auto_selection(self):
+        self.assertEqual(get_parser().name, 'etree')
+        self.assertEqual(get_parser('auto').name, available_parsers()[0])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_parser('sax')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from namecheapapi import DomainAPI
+from namecheapapi.api.commands import *
+from namecheapapi.api.recording import (RecordingTransport, ReplayTransport,
+                                        read_recording)
+from namecheapapi.tests.fixtures import FixtureTransport, GET_INFO
+
+
+def check(query):
+    return ''.join(
+        '<DomainCheckResult Domain="{}" Available="true" />'.format(domain)
+        for domain in query['DomainList'].split(','))
+
+
+class RecordReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'traffic.rec')
+        recorder = RecordingTransport(FixtureTransport({
+            DOMAINS_CHECK: check,
+            DOMAINS_GET_INFO:
+                lambda query: GET_INFO.format(domain=query['DomainName']),
+        }), self.path)
+        with self.api(recorder) as api:
+            self.recorded = (api.get_info('example.com'),
+                             api.check(['a.com', 'b.com']))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def api(self, transport):
+        return DomainAPI('recorder', 'secret-api-key', 'recorder',
+                         '10.9.8.7', transport=transport)
+
+    def test_recording_is_redacted(self):
+        exchanges = list(read_recording(self.path))
+        self.assertEqual([exchange.command for exchange in exchanges],
+                         [DOMAINS_GET_INFO, DOMAINS_CHECK])
+        self.assertEqual(exchanges[0].query, 'DomainName=example.com')
+        with gzip.open(self.path) as recording:
+            data = recording.read()
+        self.assertNotIn(b'secret-api-key', data)
+        self.assertNotIn(b'10.9.8.7', data)
+
+    def test_replay(self):
+        with self.api(ReplayTransport(self.path, speed=None)) as api:
+            self.assertEqual((api.get_info('example.com'),
+                              api.check(['a.com', 'b.com'])), self.recorded)
+            # Unrecorded queries get a response of the same command.
+            self.assertEqual(api.get_info('other.com')['Domain'],
+                             'example.com')
+            with self.assertRaises(LookupError):
+                api.get_lock('example.com')
+
+    def test_replay_latency(self):
+        replay = ReplayTransport(self.path, speed=2,
+                                 latency=lambda latency: 0.2)
+        start = time.monotonic()
+        replay.request('Command={}&DomainName=x.com'.format(
+            DOMAINS_GET_INFO))
+        self.assertAlmostEqual(time.monotonic() - start, 0.1, delta=0.05)
@@ -0,0 +1,91 @@
+import unittest
+from datetime import datetime
+from datetime import timedelta
+from unittest import mock
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.scheduler import RenewalScheduler
+from namecheapapi.tests.fixtures import FixtureAPI, GET_INFO, get_list, renew
+
+
+def renew_error(query):
+    raise ValueError('Insufficient funds')
+
+
+class RenewalSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.domains = [
+            {'Name': 'soon.com', 'Expires': '05/10/2018'},
+            {'Name': 'auto.com', 'Expires': '05/10/2018', 'AutoRenew': 'true'},
+            {'Name': 'later.com', 'Expires': '05/10/2021'},
+        ]
+        self.api = FixtureAPI({
+            DOMAINS_GET_LIST: lambda query: get_list(self.domains, query),
+            DOMAINS_GET_INFO:
+                lambda query: GET_INFO.format(domain=query['DomainName']),
+            DOMAINS_RENEW: renew,
+        })
+        self.results = []
+        self.scheduler = RenewalScheduler(
+            self.api, on_result=lambda *result: self.results.append(result))
+
+    def test_wave_opens_at_server_adjusted_time(self):
+        self.scheduler.seed(datetime(2018, 4, 1))
+        # 05/10/2018 in GMT-4 server time, minus 30 days.
+        self.assertEqual(self.scheduler.next_wave(),
+                         datetime(2018, 4, 10, 4))
+        self.assertEqual(self.scheduler.run_pending(datetime(2018, 4, 10, 3)),
+                         {})
+
+        response = self.scheduler.run_pending(datetime(2018, 4, 10, 5))
+        self.assertEqual(list(response), ['soon.com'])
+        self.assertEqual(response['soon.com']['Expiration'],
+                         datetime(2019, 5, 10))
+        self.assertEqual(self.results[0][0], 'soon.com')
+        self.assertEqual(self.scheduler.next_wave(),
+                         datetime(2019, 4, 10, 4))
+
+    def test_clock_offset_is_cached(self):
+        self.scheduler.seed(datetime(2018, 4, 1))
+        self.assertEqual(self.api.gmt_offset, -4)
+        self.assertEqual([command for command, _ in self.api.calls],
+                         [DOMAINS_GET_LIST])
+
+    def test_wave_is_kept_when_run_fails(self):
+        self.scheduler.seed(datetime(2018, 4, 1))
+        with mock.patch.object(self.api, 'get_expiration_many',
+                               side_effect=NCApiError('Too many requests')):
+            with self.assertRaises(NCApiError):
+                self.scheduler.run_pending(datetime(2018, 4, 10, 5))
+        self.assertEqual(self.scheduler.next_wave(),
+                         datetime(2018, 4, 10, 4))
+
+    def test_failed_renewal_is_retried(self):
+        self.scheduler.seed(datetime(2018, 4, 1))
+        self.api.transport.responses[DOMAINS_RENEW] = renew_error
+        now = datetime(2018, 4, 10, 5)
+        response = self.scheduler.run_pending(now)
+        self.assertIsInstance(response['soon.com'], NCApiError)
+        self.assertEqual(self.scheduler.next_wave(),
+                         now + self.scheduler.retry_delay)
+
+    def test_run_survives_errors(self):
+        calls = []
+
+        def run_pending():
+            calls.append(None)
+            if len(calls) == 1:
+                raise NCApiError('Too many requests')
+            self.scheduler.stop()
+
+        self.scheduler.seed()
+        self.scheduler.retry_delay = timedelta(0)
+        with mock.patch.object(self.scheduler, 'run_pending', run_pending):
+            with self.assertLogs('namecheapapi.api.scheduler'):
+                self.scheduler.run()
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from datetime import datetime, timedelta
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.ssl import SslAPI, SslInventory
+from namecheapapi.tests.fixtures import FixtureAPI
+
+
+def ssl_list(certificates, query):
+    page = int(query['Page'])
+    size = int(query['PageSize'])
+    rows = ''.join(
+        '<SSL CertificateID="{ID}" HostName="{Host}" SSLType="PositiveSSL" '
+        'PurchaseDate="01/01/2018" ExpireDate="{Expires}" '
+        'ActivationExpireDate="" IsExpiredYN="false" Status="{Status}" '
+        'Years="1" />'.format(**certificate)
+        for certificate in certificates[(page - 1) * size:page * size])
+    return ('<SSLListResult>{}</SSLListResult><Paging><TotalItems>{}'
+            '</TotalItems><CurrentPage>{}</CurrentPage><PageSize>{}'
+            '</PageSize></Paging>').format(rows, len(certificates), page,
+                                           size)
+
+
+def ssl_info(query):
+    return ('<SSLGetInfoResult Status="active" StatusDescription="" '
+            'Type="PositiveSSL" IssuedOn="01/02/2018" Expires="01/02/2019" '
+            'ActivationExpireDate="" OrderId="100" ReplacedBy="0" '
+            'SANSCount="0"><CertificateDetails><CommonName>'
+            'host{}.com</CommonName></CertificateDetails>'
+            '</SSLGetInfoResult>').format(query['CertificateID'])
+
+
+class SslInventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.certificates = [
+            {'ID': i, 'Host': 'host{}.com'.format(i),
+             'Expires': (datetime(2018, 6, 1) + timedelta(days=i)).strftime(
+                 '%m/%d/%Y'),
+             'Status': 'active' if i % 2 else 'newpurchase'}
+            for i in range(150)]
+        self.api = FixtureAPI({
+            SSL_GET_LIST: lambda query: ssl_list(self.certificates, query),
+            SSL_GET_INFO: ssl_info,
+        })
+        self.inventory = SslInventory(SslAPI(self.api))
+
+    def info_calls(self):
+        return [query['CertificateID'] for command, query in self.api.calls
+                if command == SSL_GET_INFO]
+
+    def test_get_list(self):
+        response = SslAPI(self.api).get_list()
+        self.assertEqual(len(response), 150)
+        self.assertEqual(response[3]['Expiration'], datetime(2018, 6, 4))
+
+    def test_indexed_queries(self):
+        self.inventory.refresh()
+        self.assertEqual(len(self.info_calls()), 150)
+        expiring = self.inventory.expiring(timedelta(days=14),
+                                           now=datetime(2018, 6, 10))
+        self.assertEqual([cert['ID'] for cert in expiring],
+                         list(range(9, 24)))
+        self.assertEqual(len(self.inventory.by_status('Active')), 75)
+        self.assertEqual(self.inventory.by_host('HOST7.com')[0]['Info'][
+            'Common name'], 'host7.com')
+
+    def test_incremental_refresh(self):
+        self.inventory.refresh()
+        self.api.calls.clear()
+        self.certificates[5]['Expires'] = '06/01/2020'
+        del self.certificates[7]
+
+        response = self.inventory.refresh()
+        self.assertEqual(response, {'Added': [], 'Changed': [5],
+                                    'Removed': [7]})
+        self.assertEqual(self.info_calls(), ['5'])
+        self.assertEqual(self.inventory.expiring(
+            timedelta(days=1), now=datetime(2020, 6, 1))[0]['ID'], 5)
+        self.assertEqual(self.inventory.by_host('host7.com'), [])
+
+    def test_failed_info_is_fetched_again(self):
+        def failing_info(query):
+            if query['CertificateID'] == '3':
+                raise ValueError('Too many requests')
+            return ssl_info(query)
+
+        self.api.transport.responses[SSL_GET_INFO] = failing_info
+        self.inventory.refresh()
+        self.assertIsInstance(self.inventory.certificates[3]['Info'],
+                              NCApiError)
+
+        self.api.transport.responses[SSL_GET_INFO] = ssl_info
+        self.api.calls.clear()
+        response = self.inventory.refresh()
+        self.assertEqual(response['Changed'], [3])
+        self.assertEqual(self.info_calls(), ['3'])
+        self.assertEqual(self.inventory.certificates[3]['Info'][
+            'Common name'], 'host3.com')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.transfers import (TransferChanged, TransferCompleted,
+                                        TransferFailed, TransferTracker)
+from namecheapapi.tests.fixtures import FixtureAPI
+
+
+def transfer_list(transfers, query):
+    rows = [transfer for transfer in transfers
+            if query['ListType'] == 'ALL' or
+            transfer['Status'] == query['ListType']]
+    page = int(query['Page'])
+    size = int(query['PageSize'])
+    return ('<TransferGetListResult>{}</TransferGetListResult><Paging>'
+            '<TotalItems>{}</TotalItems><CurrentPage>{}</CurrentPage>'
+            '<PageSize>{}</PageSize></Paging>').format(''.join(
+                '<Transfer ID="{ID}" DomainName="domain{ID}.com" '
+                'User="peter" TransferDate="06/01/2018" OrderID="{ID}" '
+                'StatusID="{StatusID}" Status="{Status}" '
+                'StatusDate="06/02/2018" StatusDescription="" />'.format(
+                    **transfer)
+                for transfer in rows[(page - 1) * size:page * size]),
+                len(rows), page, size)
+
+
+class TransferTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transfers = [{'ID': i, 'Status': 'INPROGRESS', 'StatusID': 1}
+                          for i in range(1, 251)]
+        self.api = FixtureAPI({
+            DOMAINS_TRANSFER_GET_LIST:
+                lambda query: transfer_list(self.transfers, query),
+            DOMAINS_TRANSFER_GET_STATUS: lambda query: (
+                '<DomainTransferGetStatusResult TransferID="{ID}" '
+                'Status="{Status}" StatusID="{StatusID}" />').format(
+                    **self.transfers[int(query['TransferID']) - 1]),
+        })
+        self.tracker = TransferTracker(self.api,
+                                       sweep_interval=timedelta(days=1))
+        self.events = []
+        self.tracker.subscribe(self.events.append)
+        self.now = datetime(2018, 6, 1)
+
+    def commands(self):
+        return [command for command, _ in self.api.calls]
+
+    def test_get_transfer_list(self):
+        response = self.api.get_transfer_list()
+        self.assertEqual(len(response), 250)
+        self.assertEqual(response[0]['Status date'], datetime(2018, 6, 2))
+
+    def test_due_transfers_use_status_calls(self):
+        self.tracker.poll(self.now)
+        self.assertEqual(self.events, [])
+        self.assertEqual(len(self.tracker.transfers), 250)
+
+        self.tracker._due[7] = self.now
+        self.transfers[6].update(Status='COMPLETED', StatusID=5)
+        self.api.calls.clear()
+        self.tracker.poll(self.now + timedelta(minutes=1))
+        self.assertEqual(self.commands(), [DOMAINS_TRANSFER_GET_STATUS])
+        self.assertEqual(self.events, [TransferCompleted(
+            7, 'domain7.com', 'INPROGRESS', 'COMPLETED')])
+        self.assertNotIn(7, self.tracker.transfers)
+
+    def test_sweep_finds_ended_transfers(self):
+        self.tracker.poll(self.now)
+        self.transfers[0].update(Status='CANCELLED', StatusID=7)
+        self.transfers[1].update(Status='WAITING', StatusID=2)
+        self.transfers.append({'ID': 251, 'Status': 'INPROGRESS',
+                               'StatusID': 1})
+        self.api.calls.clear()
+
+        self.tracker.poll(self.now + timedelta(days=1))
+        self.assertEqual(
+            self.commands(), [DOMAINS_TRANSFER_GET_LIST] * 3 +
+            [DOMAINS_TRANSFER_GET_STATUS] * 2)
+        self.assertEqual(sorted(self.events, key=lambda event: event.transfer),
+                         [TransferFailed(1, 'domain1.com', 'INPROGRESS',
+                                         'CANCELLED'),
+                          TransferChanged(2, 'domain2.com', 'INPROGRESS',
+                                          'WAITING'),
+                          TransferChanged(251, 'domain251.com', None,
+                                          'INPROGRESS')])
+
+    def test_interval_backs_off_while_unchanged(self):
+        self.tracker.poll(self.now)
+        intervals = []
+        for _ in range(8):
+            due = self.tracker._due[3]
+            intervals.append(self.tracker._interval[3])
+            self.tracker.poll(due)
+        self.assertEqual(intervals[:4], [timedelta(minutes=15 * 2 ** i)
+                                         for i in range(4)])
+        self.assertEqual(intervals[-1], timedelta(hours=12))
+
+    def test_failing_subscriber_does_not_lose_events(self):
+        def fail(event):
+            raise ValueError('subscriber bug')
+
+        self.tracker.subscribe(fail, TransferFailed)
+        self.tracker.poll(self.now)
+        self.transfers[0].update(Status='CANCELLED', StatusID=7)
+        self.transfers[1].update(Status='CANCELLED', StatusID=7)
+        with self.assertLogs('namecheapapi.api.transfers') as logs:
+            self.tracker.poll(self.now + timedelta(days=1))
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(sorted(event.transfer for event in self.events),
+                         [1, 2])
+
+    def test_watch_survives_failed_polls(self):
+        polls = []
+
+        def poll():
+            polls.append(None)
+            if len(polls) == 1:
+                raise NCApiError('Too many requests')
+            self.tracker.stop()
+
+        self.tracker.retry_delay = timedelta(0)
+        with mock.patch.object(self.tracker, 'poll', poll):
+            with self.assertLogs('namecheapapi.api.transfers'):
+                self.tracker.watch()
+        self.assertEqual(len(polls), 2)
@@ -0,0 +1,165 @@
+import unittest
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.users import UserAPI
+from namecheapapi.api.users import total_price
+from namecheapapi.tests.fixtures import FixtureAPI
+
+ADDRESS = {
+    'FirstName': 'Peter',
+    'LastName': 'Griffin',
+    'Address1': '31 Spooner St.',
+    'City': 'Quahog',
+    'StateProvince': 'RI',
+    'PostalCode': '00093',
+    'Country': 'US',
+    'Phone': '+1.123456789',
+    'EmailAddress': 'peter@griffin.tv'
+}
+
+PRICES = {
+    # TLD: (price per year, ICANN fee per year)
+    'com': (8.88, 0.18),
+    'net': (10.98, 0.18),
+}
+
+TAKEN = {'domain3.com', 'domain8.net'}
+PREMIUM = {'domain9.com'}
+
+
+class RegisterManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.balance = 1500.0
+
+        def check(query):
+            return ''.join(
+                '<DomainCheckResult Domain="{}" Available="{}" '
+                'IsPremiumName="{}" PremiumRegistrationPrice="{}" />'.format(
+                    domain, 'false' if domain in TAKEN else 'true',
+                    'true' if domain in PREMIUM else 'false',
+                    '1200.00' if domain in PREMIUM else '0')
+                for domain in query['DomainList'].split(','))
+
+        def pricing(query):
+            tld = query['ProductName']
+            if tld not in PRICES:
+                return ('<UserGetPricingResult><ProductType Name="domains">'
+                        '</ProductType></UserGetPricingResult>')
+            price, fee = PRICES[tld]
+            return (
+                '<UserGetPricingResult><ProductType Name="domains">'
+                '<ProductCategory Name="register"><Product Name="{tld}">'
+                '<Price Duration="1" DurationType="YEAR" Price="{price}" '
+                'PricingType="MULTIPLE" AdditionalCost="{fee}" '
+                'RegularPrice="{price}" RegularPriceType="MULTIPLE" '
+                'RegularAdditionalCost="{fee}" '
+                'RegularAdditionalCostType="MULTIPLE" YourPrice="{price}" '
+                'YourPriceType="MULTIPLE" YourAdditonalCost="{fee}" '
+                'YourAdditonalCostType="MULTIPLE" PromotionPrice="0.0" '
+                'Currency="USD" />'
+                '<Price Duration="2" DurationType="YEAR" Price="{price}" '
+                'PricingType="MULTIPLE" AdditionalCost="{fee}" '
+                'RegularPrice="{price}" RegularPriceType="MULTIPLE" '
+                'YourPrice="{price}" YourPriceType="MULTIPLE" '
+                'YourAdditonalCost="{fee}" YourAdditonalCostType="MULTIPLE" '
+                'PromotionPrice="0.0" Currency="USD" />'
+                '</Product></ProductCategory></ProductType>'
+                '</UserGetPricingResult>').format(tld=tld, price=price,
+                                                  fee=fee)
+
+        def balances(query):
+            return ('<UserGetBalancesResult Currency="USD" '
+                    'AvailableBalance="{0}" AccountBalance="{0}" '
+                    'EarnedAmount="0.00" WithdrawableAmount="0.00" '
+                    'FundsRequiredForAutoRenew="20.00" />').format(
+                        self.balance)
+
+        def register(query):
+            domain = query['DomainName']
+            if domain == 'domain5.com':
+                raise NCApiError('Registrant is invalid')
+            price, fee = PRICES[domain.rsplit('.', 1)[1]]
+            return ('<DomainCreateResult Domain="{}" Registered="true" '
+                    'ChargedAmount="{}" DomainID="9007" OrderID="196074" '
+                    'TransactionID="380716" WhoisguardEnable="false" '
+                    'NonRealTimeDomain="false" />').format(
+                        domain, (price + fee) * int(query['Years']))
+
+        self.api = FixtureAPI({
+            DOMAINS_CHECK: check,
+            USERS_GET_PRICING: pricing,
+            USERS_GET_BALANCES: balances,
+            DOMAINS_REGISTER: register,
+        })
+        self.domains = ['domain{}.{}'.format(i, 'com' if i % 2 else 'net')
+                        for i in range(120)]
+
+    def commands(self, command):
+        return [query for name, query in self.api.calls if name == command]
+
+    def test_get_pricing(self):
+        pricing = UserAPI(self.api).get_pricing(
+            'DOMAIN', 'REGISTER', 'REGISTER', 'com')
+        price = pricing['register']['com'][2]
+        self.assertEqual(price['Price'], 8.88)
+        self.assertEqual(price['AdditionalCost'], 0.18)
+        self.assertEqual(price['Currency'], 'USD')
+        self.assertAlmostEqual(total_price(price, 2), 18.12)
+        self.assertAlmostEqual(total_price(
+            dict(price, PriceType='ABSOLUTE'), 2), 9.24)
+
+    def test_get_balances(self):
+        balances = UserAPI(self.api).get_balances()
+        self.assertEqual(balances['Currency'], 'USD')
+        self.assertEqual(balances['AvailableBalance'], 1500.0)
+        self.assertEqual(balances['FundsRequiredForAutoRenew'], 20.0)
+
+    def test_register_many(self):
+        results = list(self.api.register_many(self.domains + ['domain.org'],
+                                              address=ADDRESS))
+
+        # Results are streamed in order, with failures in place.
+        self.assertEqual([domain for domain, _ in results],
+                         self.domains + ['domain.org'])
+        results = dict(results)
+        self.assertTrue(results['domain1.com']['Success'])
+        self.assertIsInstance(results['domain3.com'], NCApiError)
+        self.assertIsInstance(results['domain5.com'], NCApiError)
+        self.assertIsInstance(results['domain.org'], NCApiError)
+        self.assertIn('premium', str(results['domain9.com']))
+
+        # Three check batches, one price lookup per TLD, one balance.
+        self.assertEqual(len(self.commands(DOMAINS_CHECK)), 3)
+        self.assertEqual(sorted(query['ProductName'] for query in
+                                self.commands(USERS_GET_PRICING)),
+                         ['com', 'net', 'org'])
+        self.assertEqual(len(self.commands(USERS_GET_BALANCES)), 1)
+
+        registered = self.commands(DOMAINS_REGISTER)
+        self.assertEqual(len(registered), 117)
+        names = [query['DomainName'] for query in registered]
+        self.assertNotIn('domain3.com', names)
+        self.assertNotIn('domain9.com', names)
+        self.assertTrue(all(query['RegistrantFirstName'] == 'Peter'
+                            for query in registered))
+
+    def test_register_many_insufficient_balance(self):
+        # 58 .com and 59 .net domains that can be registered, for two
+        # years.
+        with self.assertRaises(NCApiError) as e:
+            self.api.register_many(self.domains, years=2, address=ADDRESS)
+        self.assertIn('2367.84', str(e.exception))
+        self.assertEqual(self.commands(DOMAINS_REGISTER), [])
+
+    def test_register_many_duplicates(self):
+        results = list(self.api.register_many(
+            ['domain1.com', 'DOMAIN1.com', 'domain2.net'], address=ADDRESS))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(sorted(query['DomainName'].lower() for query in
+                                self.commands(DOMAINS_REGISTER)),
+                         ['domain1.com', 'domain2.net'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.watcher import (PortfolioWatcher, DomainAdded,
+                                      ExpiringSoon, LockChanged)
+from namecheapapi.tests.fixtures import FixtureAPI, get_list
+
+
+class PortfolioWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.domains = [
+            {'Name': 'soon.com', 'Expires': '05/20/2018'},
+            {'Name': 'later.com', 'Expires': '05/10/2021'},
+        ]
+        self.api = FixtureAPI({DOMAINS_GET_LIST: self.get_list})
+        self.now = datetime(2018, 5, 1)
+        self.events = []
+        self.watcher = PortfolioWatcher(self.api)
+        self.watcher.subscribe(self.events.append)
+
+    def get_list(self, query):
+        term = query.get('SearchTerm')
+        return get_list([domain for domain in self.domains
+                         if not term or term in domain['Name']], query)
+
+    def test_initial_sweep(self):
+        self.watcher.poll(self.now)
+        self.assertEqual(set(self.watcher.snapshot), {'soon.com',
+                                                      'later.com'})
+        self.assertEqual([type(event) for event in self.events],
+                         [ExpiringSoon])
+
+    def test_near_expiry_domains_are_polled_more_often(self):
+        self.watcher.poll(self.now)
+        self.domains[0]['IsLocked'] = 'true'
+        self.domains[1]['IsLocked'] = 'true'
+        self.api.calls.clear()
+
+        events = self.watcher.poll(self.now + timedelta(hours=6))
+        self.assertEqual(events, [LockChanged('soon.com', False, True)])
+        self.assertEqual(self.api.calls[0][1]['SearchTerm'], 'soon.com')
+
+        self.assertEqual(self.watcher.poll(self.now + timedelta(hours=7)),
+                         [])
+
+    def test_full_sweep_finds_new_domains(self):
+        self.watcher.poll(self.now)
+        self.domains.append({'Name': 'new.com', 'Expires': '05/10/2020'})
+        events = self.watcher.poll(self.now + timedelta(days=1))
+        self.assertEqual([type(event) for event in events], [DomainAdded])
+
+    def test_failing_subscriber_does_not_lose_events(self):
+        def fail(event):
+            raise ValueError('subscriber bug')
+
+        self.watcher.subscribe(fail, DomainAdded)
+        self.watcher.poll(self.now)
+        self.domains.append({'Name': 'new.com', 'Expires': '05/10/2020'})
+        self.domains.append({'Name': 'new2.com', 'Expires': '05/10/2020'})
+        del self.events[:]
+        with self.assertLogs('namecheapapi.api.watcher') as logs:
+            self.watcher.poll(self.now + timedelta(days=1))
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(sorted(event.domain for event in self.events),
+                         ['new.com', 'new2.com'])
+
+    def test_watch_survives_failed_polls(self):
+        polls = []
+
+        def poll():
+            polls.append(None)
+            if len(polls) == 1:
+                raise NCApiError('Too many requests')
+            self.watcher.stop()
+
+        self.watcher.retry_delay = timedelta(0)
+        with mock.patch.object(self.watcher, 'poll', poll):
+            with self.assertLogs('namecheapapi.api.watcher'):
+                self.watcher.watch()
+        self.assertEqual(len(polls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from datetime import datetime, timedelta
+from namecheapapi.api.commands import *
+from namecheapapi.api.exceptions import NCApiError
+from namecheapapi.api.whoisguard import WhoisguardAPI
+from namecheapapi.tests.fixtures import FixtureAPI, get_list
+
+
+def whoisguard_list(subscriptions, query):
+    if query['ListType'] == 'FREE':
+        subscriptions = [item for item in subscriptions if not item['Domain']]
+    elif query['ListType'] == 'ALLOTED':
+        subscriptions = [item for item in subscriptions if item['Domain']]
+    page = int(query['Page'])
+    size = int(query['PageSize'])
+    rows = ''.join(
+        '<Whoisguard ID="{ID}" DomainName="{Domain}" Created="01/01/2018" '
+        'Expires="{Expires}" Status="{Status}" />'.format(**item)
+        for item in subscriptions[(page - 1) * size:page * size])
+    return ('<WhoisguardGetListResult>{}</WhoisguardGetListResult><Paging>'
+            '<TotalItems>{}</TotalItems><CurrentPage>{}</CurrentPage>'
+            '<PageSize>{}</PageSize></Paging>').format(
+                rows, len(subscriptions), page, size)
+
+
+def success(tag):
+    return lambda query: '<{} IsSuccess="true" />'.format(tag)
+
+
+class WhoisguardBulkTest(unittest.TestCase):
+
+    def setUp(self):
+        states = ['ENABLED', 'DISABLED', 'NOTPRESENT']
+        self.domains = [
+            {'Name': 'domain{}.com'.format(i), 'WhoisGuard': states[i % 3]}
+            for i in range(150)]
+        self.subscriptions = [
+            {'ID': i, 'Domain': domain['Name'] if domain['WhoisGuard'] !=
+             'NOTPRESENT' else '', 'Expires': (datetime(2018, 6, 1) +
+                                               timedelta(days=i)).strftime(
+                 '%m/%d/%Y'), 'Status': domain['WhoisGuard']}
+            for i, domain in enumerate(self.domains)]
+
+        def disable(query):
+            if query['WhoisguardID'] == '3':
+                raise NCApiError('disable failed')
+            return '<WhoisguardDisableResult IsSuccess="true" />'
+
+        self.api = FixtureAPI({
+            DOMAINS_GET_LIST: lambda query: get_list(self.domains, query),
+            WHOISGUARD_GET_LIST: lambda query: whoisguard_list(
+                self.subscriptions, query),
+            WHOISGUARD_ENABLE: success('WhoisguardEnableResult'),
+            WHOISGUARD_DISABLE: disable,
+            WHOISGUARD_ALLOT: success('WhoisguardAllotResult'),
+            WHOISGUARD_RENEW: lambda query: (
+                '<WhoisguardRenewResult WhoisguardId="{}" Years="1" '
+                'IsSuccess="true" OrderId="1" TransactionId="1" '
+                'ChargedAmount="2.88" />').format(query['WhoisguardID']),
+        })
+        self.whoisguard = WhoisguardAPI(self.api)
+
+    def calls(self, command):
+        return [query for name, query in self.api.calls if name == command]
+
+    def test_get_list(self):
+        response = self.whoisguard.get_list()
+        self.assertEqual(len(response), 150)
+        self.assertEqual(response[2], {
+            'ID': 2, 'Domain': None, 'Creation': datetime(2018, 1, 1),
+            'Expiration': datetime(2018, 6, 3), 'Status': 'NOTPRESENT'})
+
+    def test_enable_many_skips_enabled_domains(self):
+        response = self.whoisguard.enable_many('me@example.com')
+        self.assertEqual(len(response), 50)
+        self.assertTrue(all(response.values()))
+        self.assertEqual(sorted(int(query['WhoisguardID']) for query in
+                                self.calls(WHOISGUARD_ENABLE)),
+                         list(range(1, 150, 3)))
+
+    def test_disable_many_reports_errors(self):
+        response = self.whoisguard.disable_many(
+            ['DOMAIN0.com', 'domain1.com', 'domain3.com', 'domain4.com'])
+        self.assertEqual(sorted(response), ['domain0.com', 'domain3.com'])
+        self.assertIs(response['domain0.com'], True)
+        self.assertIsInstance(response['domain3.com'], NCApiError)
+        self.assertEqual(len(self.calls(WHOISGUARD_DISABLE)), 2)
+
+    def test_allot_many_pairs_free_subscriptions(self):
+        response = self.whoisguard.allot_many(
+            domains=['domain2.com', 'domain5.com', 'domain1.com'])
+        self.assertEqual(response, {'domain2.com': True,
+                                    'domain5.com': True})
+        self.assertEqual(
+            [(query['DomainName'], query['WhoisguardID'])
+             for query in sorted(self.calls(WHOISGUARD_ALLOT),
+                                 key=lambda query: query['DomainName'])],
+            [('domain2.com', '2'), ('domain5.com', '5')])
+
+    def test_renew_many_expiring(self):
+        now = datetime.now()
+        for i, item in enumerate(self.subscriptions):
+            item['Expires'] = (now + timedelta(days=i)).strftime('%m/%d/%Y')
+        response = self.whoisguard.renew_many(
+            expiring_within=timedelta(days=10))
+        self.assertEqual(sorted(response), sorted(
+            'domain{}.com'.format(i) for i in range(11) if i % 3 != 2))
+        self.assertEqual(response['domain0.com']['ChargedAmount'], 2.88)
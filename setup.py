@@ -9,14 +9,18 @@ setup(
     classifiers=[
         'License :: OSI Approved :: MIT License',
         'Intended Audience :: Developers',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3.7',
         'Environment :: Web Environment',
         'Development Status :: 3 - Alpha',
     ],
     author='Alex Sanchez',
     author_email='alex@s1ck.org',
     license='MIT',
-    packages=['namecheapapi'],
+    packages=find_packages(),
+    python_requires='>=3.7',
+    entry_points={
+        'console_scripts': ['namecheapapi = namecheapapi.cli:main'],
+    },
     url='https://github.com/yonjuuni/namecheapapi',
     keywords=['namecheap', 'domain', 'dns'],
     include_package_data=True,